@@ -1,6 +1,43 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
+from crewai.tools import BaseTool
+import json
+import os
+import re
+from typing import Optional
+from .perf_gate import check_source, strip_code_fences
+from .suite_runner import run_suite
 
+# The image crewai's safe code execution mode runs code in; generated code the tools run goes there too.
+SANDBOX_IMAGE = "code-interpreter:latest"
+
+
+class TestSuiteRunnerTool(BaseTool):
+    name: str = "run_test_suite"
+    description: str = (
+        "Runs a unittest module such as output/test_accounts.py in parallel worker processes, "
+        "with a per-test timeout, and returns JSON with each test's status, duration and failure message."
+    )
+    sandbox: Optional[str] = SANDBOX_IMAGE  # None runs the tests on the host
+
+    def _run(self, test_path: str) -> str:
+        return json.dumps(run_suite(test_path, timeout=10.0, sandbox=self.sandbox))
+
+
+class TestModuleWriterTool(BaseTool):
+    name: str = "write_test_module"
+    description: str = (
+        "Replaces a test module such as output/test_accounts.py with the given Python source, "
+        "so the next run_test_suite call runs the fixed tests."
+    )
+
+    def _run(self, test_path: str, source: str) -> str:
+        if not re.fullmatch(r"output/test_\w+\.py", test_path):
+            return "Refused: only output/test_*.py modules can be written."
+        os.makedirs("output", exist_ok=True)
+        with open(test_path, "w") as handle:
+            handle.write(source)
+        return f"Wrote {test_path}."
 
 
 @CrewBase
@@ -10,6 +47,29 @@ class EngineeringTeam():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    @before_kickoff
+    def remember_inputs(self, inputs):
+        self.module_name = inputs['module_name']
+        self.class_name = inputs['class_name']
+        self.perf_hints = inputs.get('perf_hints', {})
+        # Generated code runs in Docker unless the caller opts in to running it on the host.
+        self.sandbox = None if inputs.get('allow_host_execution') else inputs.get('sandbox_image', SANDBOX_IMAGE)
+        for tool in self.test_engineer().tools:
+            if isinstance(tool, TestSuiteRunnerTool):
+                tool.sandbox = self.sandbox
+        return inputs
+
+    def check_performance(self, output):
+        """Guardrail for code_task: send the module back with a report if a public method scales badly."""
+        # Fences are a formatting slip, not a performance problem, so they are not worth a retry.
+        source = strip_code_fences(output.raw)
+        report = check_source(source, self.class_name, module_name=self.module_name, hints=self.perf_hints,
+                              sandbox=self.sandbox)
+        if report["passed"]:
+            return True, source
+        return False, ("Performance check failed; fix the methods marked slow, make the ones marked unmeasured "
+                       "accept valid calls (or fix the load error):\n" + json.dumps(report))
+
     @agent
     def engineering_lead(self) -> Agent:
         return Agent(
@@ -40,6 +100,7 @@ class EngineeringTeam():
         return Agent(
             config=self.agents_config['test_engineer'],
             verbose=True,
+            tools=[TestSuiteRunnerTool(), TestModuleWriterTool()],
             allow_code_execution=True,
             code_execution_mode="safe",  # Uses Docker for safety
             max_execution_time=500, 
@@ -56,6 +117,8 @@ class EngineeringTeam():
     def code_task(self) -> Task:
         return Task(
             config=self.tasks_config['code_task'],
+            guardrail=self.check_performance,
+            guardrail_max_retries=2,
         )
 
     @task
@@ -70,6 +133,12 @@ class EngineeringTeam():
             config=self.tasks_config['test_task'],
         )   
 
+    @task
+    def test_run_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['test_run_task'],
+        )
+
     @crew
     def crew(self) -> Crew:
         """Creates the research crew"""
@@ -1,10 +1,21 @@
+import itertools
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any
+
+_share_prices = {
+    'AAPL': 150.0,
+    'TSLA': 800.0,
+    'GOOGL': 2500.0
+}
+_price_listeners = []
+_price_version = 0
+# Shared by all accounts, so a version is never reused even when an account is replaced.
+_account_versions = itertools.count(1)
 
 
 def get_share_price(symbol: str) -> float:
     """Returns the current price of shares for the given stock symbol.
-    This is a test implementation with fixed prices for specific symbols.
+    This is a test implementation with prices for specific symbols.
     
     Args:
         symbol (str): The stock symbol.
@@ -12,12 +23,38 @@ def get_share_price(symbol: str) -> float:
     Returns:
         float: Price of the share as a float.
     """
-    prices = {
-        'AAPL': 150.0,
-        'TSLA': 800.0,
-        'GOOGL': 2500.0
-    }
-    return prices.get(symbol, 0.0)
+    return _share_prices.get(symbol, 0.0)
+
+
+def set_share_price(symbol: str, price: float) -> None:
+    """Updates the price of a stock symbol and notifies price subscribers if it changed.
+
+    Args:
+        symbol (str): The stock symbol.
+        price (float): The new price per share.
+    """
+    global _price_version
+    if _share_prices.get(symbol) == price:
+        return
+    _share_prices[symbol] = price
+    _price_version += 1
+    for callback in list(_price_listeners):
+        callback(symbol, price)
+
+
+def price_version() -> int:
+    """Returns a counter that increases whenever any share price changes."""
+    return _price_version
+
+
+def subscribe_prices(callback: Callable[[str, float], None]) -> Callable[[], None]:
+    """Registers a callback invoked as callback(symbol, price) whenever a price changes.
+
+    Returns:
+        Callable: Call it to unsubscribe.
+    """
+    _price_listeners.append(callback)
+    return lambda: _price_listeners.remove(callback) if callback in _price_listeners else None
 
 
 class Account:
@@ -35,6 +72,22 @@ class Account:
         self.transactions = []  # List of transaction records
         self.total_deposits = 0.0
         self.total_withdrawals = 0.0
+        self._listeners = []
+        self.version = next(_account_versions)  # Increases on every change to cash or holdings
+
+    def subscribe(self, callback: Callable[['Account'], None]) -> Callable[[], None]:
+        """Registers a callback invoked as callback(account) after every change to cash or holdings.
+
+        Returns:
+            Callable: Call it to unsubscribe.
+        """
+        self._listeners.append(callback)
+        return lambda: self._listeners.remove(callback) if callback in self._listeners else None
+
+    def _notify(self) -> None:
+        self.version = next(_account_versions)
+        for callback in list(self._listeners):
+            callback(self)
 
     def deposit_funds(self, amount: float) -> bool:
         """Deposits a specified amount of funds into the user's account.
@@ -59,8 +112,37 @@ class Account:
             'balance_after': self.balance
         })
         
+        self._notify()
         return True
 
+    def deposit_funds_batch(self, amounts: List[float]) -> List[bool]:
+        """Deposits several amounts in order, as if deposit_funds were called for each.
+
+        Args:
+            amounts (List[float]): The amounts to be deposited.
+
+        Returns:
+            List[bool]: For each amount, True if it was deposited, False if it was invalid.
+        """
+        results = []
+        timestamp = datetime.now()
+        for amount in amounts:
+            if amount <= 0:
+                results.append(False)
+                continue
+            self.balance += amount
+            self.total_deposits += amount
+            self.transactions.append({
+                'type': 'DEPOSIT',
+                'amount': amount,
+                'timestamp': timestamp,
+                'balance_after': self.balance
+            })
+            results.append(True)
+        if any(results):
+            self._notify()
+        return results
+
     def withdraw_funds(self, amount: float) -> bool:
         """Withdraws a specified amount from the user's account, ensuring the balance doesn't go negative.
 
@@ -84,6 +166,7 @@ class Account:
             'balance_after': self.balance
         })
         
+        self._notify()
         return True
 
     def buy_shares(self, symbol: str, quantity: int) -> bool:
@@ -128,6 +211,7 @@ class Account:
             'balance_after': self.balance
         })
         
+        self._notify()
         return True
 
     def sell_shares(self, symbol: str, quantity: int) -> bool:
@@ -168,6 +252,7 @@ class Account:
             'balance_after': self.balance
         })
         
+        self._notify()
         return True
 
     def calculate_portfolio_value(self) -> float:
@@ -1,33 +1,66 @@
 import gradio as gr
-from account import Account, get_share_price
+from account import Account, get_share_price, price_version
+from portfolio_stream import PortfolioStream
+from render_cache import RenderCache
 import pandas as pd
 import datetime
+import os
+import threading
+
+# Queueing limits; defaults suit a single small instance.
+CONCURRENCY_LIMIT = int(os.environ.get("APP_CONCURRENCY_LIMIT", "8"))
+MAX_QUEUE_SIZE = int(os.environ.get("APP_MAX_QUEUE_SIZE", "256"))
+MAX_BATCH_SIZE = int(os.environ.get("APP_MAX_BATCH_SIZE", "64"))
+# Minimum seconds between pushes to one live portfolio view.
+LIVE_VIEW_INTERVAL = float(os.environ.get("APP_LIVE_VIEW_INTERVAL", "0.5"))
+# Rendered views kept for repeat requests of an unchanged account.
+RENDER_CACHE_SIZE = int(os.environ.get("APP_RENDER_CACHE_SIZE", "256"))
 
 # Initialize a single account
 account = Account("user123")
+# Handlers run concurrently, and they all share the one account.
+account_lock = threading.Lock()
+render_cache = RenderCache(RENDER_CACHE_SIZE)
+
+def cached_view(view, render, uses_prices=True):
+    # Keys embed the account and price versions, so a changed account or price never hits an old entry.
+    with account_lock:
+        key = (account.user_id, view, account.version, price_version() if uses_prices else None)
+    return render_cache.get_or_render(key, render)
 
 def create_account(user_id, initial_deposit):
     global account
-    account = Account(user_id)
-    success = account.deposit_funds(float(initial_deposit))
+    with account_lock:
+        account = Account(user_id)
+        portfolio_stream.set_account(account)
+        success = account.deposit_funds(float(initial_deposit))
     if success:
         return f"Account created for {user_id} with initial deposit of ${initial_deposit:.2f}"
     else:
         return "Failed to create account. Initial deposit must be greater than 0."
 
-def deposit(amount):
-    amount = float(amount)
-    success = account.deposit_funds(amount)
-    if success:
-        return f"Successfully deposited ${amount:.2f}. New balance: ${account.balance:.2f}"
-    else:
-        return "Deposit failed. Amount must be greater than 0."
+def deposit(amounts):
+    # Batched event: deposits queued together are applied in one call.
+    amounts = [float(amount or 0) for amount in amounts]
+    with account_lock:
+        balance = account.balance
+        results = account.deposit_funds_batch(amounts)
+    messages = []
+    for amount, success in zip(amounts, results):
+        if success:
+            balance += amount
+            messages.append(f"Successfully deposited ${amount:.2f}. New balance: ${balance:.2f}")
+        else:
+            messages.append("Deposit failed. Amount must be greater than 0.")
+    return [messages]
 
 def withdraw(amount):
     amount = float(amount)
-    success = account.withdraw_funds(amount)
+    with account_lock:
+        success = account.withdraw_funds(amount)
+        balance = account.balance
     if success:
-        return f"Successfully withdrew ${amount:.2f}. New balance: ${account.balance:.2f}"
+        return f"Successfully withdrew ${amount:.2f}. New balance: ${balance:.2f}"
     else:
         return "Withdrawal failed. Amount must be greater than 0 and not exceed your balance."
 
@@ -40,11 +73,13 @@ def buy_shares(symbol, quantity):
         if current_price == 0.0:
             return f"Invalid symbol '{symbol}'. Available symbols: AAPL, TSLA, GOOGL"
         
-        success = account.buy_shares(symbol, quantity)
+        with account_lock:
+            success = account.buy_shares(symbol, quantity)
+            balance = account.balance
         if success:
-            return f"Successfully bought {quantity} shares of {symbol} at ${current_price:.2f} each. Total cost: ${current_price * quantity:.2f}. New balance: ${account.balance:.2f}"
+            return f"Successfully bought {quantity} shares of {symbol} at ${current_price:.2f} each. Total cost: ${current_price * quantity:.2f}. New balance: ${balance:.2f}"
         else:
-            return f"Purchase failed. Insufficient funds or invalid parameters. Current balance: ${account.balance:.2f}, Required: ${current_price * quantity:.2f}"
+            return f"Purchase failed. Insufficient funds or invalid parameters. Current balance: ${balance:.2f}, Required: ${current_price * quantity:.2f}"
     except ValueError:
         return "Quantity must be an integer."
 
@@ -57,16 +92,24 @@ def sell_shares(symbol, quantity):
         if current_price == 0.0:
             return f"Invalid symbol '{symbol}'. Available symbols: AAPL, TSLA, GOOGL"
         
-        success = account.sell_shares(symbol, quantity)
+        with account_lock:
+            success = account.sell_shares(symbol, quantity)
+            balance = account.balance
         if success:
-            return f"Successfully sold {quantity} shares of {symbol} at ${current_price:.2f} each. Total received: ${current_price * quantity:.2f}. New balance: ${account.balance:.2f}"
+            return f"Successfully sold {quantity} shares of {symbol} at ${current_price:.2f} each. Total received: ${current_price * quantity:.2f}. New balance: ${balance:.2f}"
         else:
             return f"Sale failed. You don't own enough shares of {symbol} or invalid parameters."
     except ValueError:
         return "Quantity must be an integer."
 
 def get_holdings():
-    holdings = account.get_holdings()
+    return cached_view("holdings", render_holdings)
+
+def render_holdings():
+    with account_lock:
+        holdings = dict(account.get_holdings())
+        balance = account.balance
+        portfolio_value = account.calculate_portfolio_value()
     if not holdings:
         return "No holdings in portfolio."
     
@@ -80,17 +123,22 @@ def get_holdings():
         result += f"{symbol}: {quantity} shares at ${price:.2f} each = ${value:.2f}\n"
     
     result += f"\nTotal Holdings Value: ${total_value:.2f}"
-    result += f"\nCash Balance: ${account.balance:.2f}"
-    result += f"\nTotal Portfolio Value: ${account.calculate_portfolio_value():.2f}"
+    result += f"\nCash Balance: ${balance:.2f}"
+    result += f"\nTotal Portfolio Value: ${portfolio_value:.2f}"
     
     return result
 
 def get_profit_loss():
-    profit_loss = account.calculate_profit_loss()
-    portfolio_value = account.calculate_portfolio_value()
+    return cached_view("profit_loss", render_profit_loss)
+
+def render_profit_loss():
+    with account_lock:
+        profit_loss = account.calculate_profit_loss()
+        portfolio_value = account.calculate_portfolio_value()
+        total_deposits, total_withdrawals = account.total_deposits, account.total_withdrawals
     
-    result = f"Total Deposits: ${account.total_deposits:.2f}\n"
-    result += f"Total Withdrawals: ${account.total_withdrawals:.2f}\n"
+    result = f"Total Deposits: ${total_deposits:.2f}\n"
+    result += f"Total Withdrawals: ${total_withdrawals:.2f}\n"
     result += f"Current Portfolio Value: ${portfolio_value:.2f}\n"
     
     if profit_loss >= 0:
@@ -100,8 +148,30 @@ def get_profit_loss():
     
     return result
 
+def render_live_portfolio():
+    with account_lock:
+        holdings = dict(account.get_holdings())
+        balance = account.balance
+        portfolio_value = account.calculate_portfolio_value()
+        profit_loss = portfolio_value - account.total_deposits + account.total_withdrawals
+
+    result = f"Cash Balance: ${balance:.2f}\n"
+    for symbol, quantity in sorted(holdings.items()):
+        price = get_share_price(symbol)
+        result += f"{symbol}: {quantity} shares at ${price:.2f} each = ${price * quantity:.2f}\n"
+    result += f"Total Portfolio Value: ${portfolio_value:.2f}\n"
+    result += f"Total {'Profit' if profit_loss >= 0 else 'Loss'}: ${abs(profit_loss):.2f}"
+    return result
+
+# Live views wait for account or price changes instead of polling.
+portfolio_stream = PortfolioStream(account, render_live_portfolio, min_interval=LIVE_VIEW_INTERVAL)
+
 def get_transactions():
-    transactions = account.get_transaction_history()
+    return cached_view("transactions", render_transactions, uses_prices=False)
+
+def render_transactions():
+    with account_lock:
+        transactions = list(account.get_transaction_history())
     if not transactions:
         return "No transactions recorded."
     
@@ -166,7 +236,8 @@ with gr.Blocks(title="Trading Simulation Platform") as demo:
                 withdraw_btn = gr.Button("Withdraw")
                 withdraw_output = gr.Textbox(label="Result")
         
-        deposit_btn.click(deposit, inputs=deposit_amount, outputs=deposit_output)
+        deposit_btn.click(deposit, inputs=deposit_amount, outputs=deposit_output,
+                          batch=True, max_batch_size=MAX_BATCH_SIZE)
         withdraw_btn.click(withdraw, inputs=withdraw_amount, outputs=withdraw_output)
     
     with gr.Tab("Trading"):
@@ -204,6 +275,10 @@ with gr.Blocks(title="Trading Simulation Platform") as demo:
         
         holdings_btn.click(get_holdings, outputs=portfolio_output)
         profit_loss_btn.click(get_profit_loss, outputs=portfolio_output)
+
+        live_output = gr.Textbox(label="Live Portfolio", lines=10)
+        # A live view is idle until something changes, so it does not count against the concurrency limit.
+        demo.load(portfolio_stream.updates, outputs=live_output, concurrency_limit=None)
     
     with gr.Tab("Transaction History"):
         gr.Markdown("### Transaction History")
@@ -213,4 +288,4 @@ with gr.Blocks(title="Trading Simulation Platform") as demo:
         transactions_btn.click(get_transactions, outputs=transactions_output)
 
 if __name__ == "__main__":
-    demo.launch()
\ No newline at end of file
+    demo.queue(default_concurrency_limit=CONCURRENCY_LIMIT, max_size=MAX_QUEUE_SIZE).launch()
\ No newline at end of file
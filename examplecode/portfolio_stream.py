@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Callable
+
+from account import Account, subscribe_prices
+
+
+class PortfolioStream:
+    """Pushes a rendered portfolio view to live subscribers when it changes.
+
+    The stream listens to the account and to share prices. A change bumps a
+    version and wakes every waiting view; nothing runs while nothing
+    changes. A woken view re-renders at most once per `min_interval`
+    seconds, so bursts of changes coalesce into one update. It only yields
+    when the rendered text differs from what it last sent. Rendering runs
+    in the loop's default executor, so a render that waits on a lock never
+    stalls the event loop.
+    """
+
+    def __init__(self, account: Account, render: Callable[[], str], min_interval: float = 0.5):
+        """Starts listening to the account and to share prices.
+
+        Args:
+            account (Account): The account to watch.
+            render (Callable): Builds the current view as text.
+            min_interval (float): Minimum seconds between updates to one view.
+        """
+        self.render = render
+        self.min_interval = min_interval
+        self.version = 0
+        self._lock = threading.Lock()
+        self._waiters = set()  # (loop, asyncio.Event) per connected view
+        self._unsubscribe_account = account.subscribe(lambda _: self._changed())
+        self._unsubscribe_prices = subscribe_prices(lambda symbol, price: self._changed())
+
+    def set_account(self, account: Account) -> None:
+        """Switches the stream to watch a different account."""
+        self._unsubscribe_account()
+        self._unsubscribe_account = account.subscribe(lambda _: self._changed())
+        self._changed()
+
+    def _changed(self) -> None:
+        with self._lock:
+            self.version += 1
+            waiters = list(self._waiters)
+        closed = []
+        for waiter in waiters:
+            loop, event = waiter
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # the view's event loop was closed without the generator finishing
+                closed.append(waiter)
+        if closed:
+            with self._lock:
+                self._waiters.difference_update(closed)
+
+    async def updates(self) -> AsyncIterator[str]:
+        """Yields the rendered view now and again after every visible change."""
+        loop = asyncio.get_running_loop()
+        waiter = (loop, asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        seen, sent = None, None
+        try:
+            while True:
+                # Cleared before the version is read, so a change in between is never missed.
+                waiter[1].clear()
+                version = self.version
+                if version == seen:
+                    await waiter[1].wait()
+                    continue
+                seen = version
+                text = await loop.run_in_executor(None, self.render)
+                if text != sent:
+                    sent = text
+                    yield text
+                await asyncio.sleep(self.min_interval)
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def close(self) -> None:
+        self._unsubscribe_account()
+        self._unsubscribe_prices()
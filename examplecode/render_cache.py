@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class RenderCache:
+    """Bounded least-recently-used cache of rendered views.
+
+    Keys carry the state they were rendered from (account version, price
+    version), so an entry is never stale: any change produces a new key, and
+    entries for old states are simply evicted once the cache is full.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """Creates an empty cache.
+
+        Args:
+            max_entries (int): Entries kept before the least recently used is evicted.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_render(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        """Returns the cached view for key, rendering and storing it on a miss.
+
+        Args:
+            key (Hashable): Identifies the view and the state it shows.
+            render (Callable): Builds the view; called without the cache lock held.
+
+        Returns:
+            Any: The rendered view.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = render()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
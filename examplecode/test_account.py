@@ -30,7 +30,27 @@ class TestAccount(unittest.TestCase):
         self.assertEqual(self.account.balance, 0.0)
         self.assertEqual(self.account.total_deposits, 0.0)
         self.assertEqual(len(self.account.transactions), 0)
-    
+
+    def test_deposit_funds_batch(self):
+        result = self.account.deposit_funds_batch([100.0, -5.0, 50.0])
+        self.assertEqual(result, [True, False, True])
+        self.assertEqual(self.account.balance, 150.0)
+        self.assertEqual(self.account.total_deposits, 150.0)
+        self.assertEqual([tx['balance_after'] for tx in self.account.transactions], [100.0, 150.0])
+
+    def test_version_increases_on_every_change(self):
+        versions = [self.account.version]
+        self.account.deposit_funds(1000.0)
+        versions.append(self.account.version)
+        self.account.deposit_funds(-1.0)
+        versions.append(self.account.version)
+        self.account.buy_shares('AAPL', 1)
+        versions.append(self.account.version)
+        self.assertLess(versions[0], versions[1])
+        self.assertEqual(versions[1], versions[2])
+        self.assertLess(versions[2], versions[3])
+        self.assertGreater(Account(self.user_id).version, versions[3])
+
     def test_withdraw_funds_sufficient(self):
         self.account.deposit_funds(200.0)
         result = self.account.withdraw_funds(100.0)
@@ -0,0 +1,86 @@
+import asyncio
+import contextlib
+import threading
+import unittest
+from account import Account, get_share_price, set_share_price
+from portfolio_stream import PortfolioStream
+
+
+class TestPortfolioStream(unittest.TestCase):
+    def setUp(self):
+        self.account = Account('test_user')
+        self.renders = 0
+
+        def render():
+            self.renders += 1
+            value = sum(get_share_price(s) * q for s, q in self.account.get_holdings().items())
+            return f"cash={self.account.balance:.2f} holdings={value:.2f}"
+
+        self.stream = PortfolioStream(self.account, render, min_interval=0.01)
+        self.addCleanup(self.stream.close)
+        self.addCleanup(set_share_price, 'AAPL', get_share_price('AAPL'))
+
+    def collect(self, actions):
+        async def run():
+            received = []
+
+            async def consume():
+                async for text in self.stream.updates():
+                    received.append(text)
+
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.05)
+            for action in actions:
+                action()
+                await asyncio.sleep(0.05)
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+            return received
+        return asyncio.run(run())
+
+    def test_pushes_account_and_price_changes(self):
+        received = self.collect([
+            lambda: self.account.deposit_funds(1000.0),
+            lambda: self.account.buy_shares('AAPL', 2),
+            lambda: set_share_price('AAPL', 200.0),
+        ])
+        self.assertEqual(received, ["cash=0.00 holdings=0.00", "cash=1000.00 holdings=0.00",
+                                    "cash=700.00 holdings=300.00", "cash=700.00 holdings=400.00"])
+
+    def test_unchanged_view_is_not_pushed(self):
+        received = self.collect([lambda: set_share_price('TSLA', get_share_price('TSLA') + 1)])
+        self.assertEqual(len(received), 1)
+        set_share_price('TSLA', get_share_price('TSLA') - 1)
+
+    def test_bursts_are_coalesced(self):
+        def burst():
+            for _ in range(100):
+                self.account.deposit_funds(1.0)
+        received = self.collect([burst])
+        self.assertEqual(received[-1], "cash=100.00 holdings=0.00")
+        self.assertLessEqual(self.renders, 3)
+
+    def test_idle_view_does_not_render(self):
+        self.assertEqual(self.collect([lambda: None, lambda: None]), ["cash=0.00 holdings=0.00"])
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(self.stream._waiters, set())
+
+    def test_render_runs_off_the_event_loop(self):
+        threads = []
+        render = self.stream.render
+        self.stream.render = lambda: (threads.append(threading.current_thread()), render())[1]
+        self.collect([lambda: self.account.deposit_funds(1.0)])
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_waiters_on_closed_loops_are_dropped(self):
+        loop = asyncio.new_event_loop()
+        loop.close()
+        self.stream._waiters.add((loop, asyncio.Event()))
+        self.account.deposit_funds(1.0)
+        self.assertEqual(self.stream._waiters, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
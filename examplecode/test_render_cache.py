@@ -0,0 +1,48 @@
+import unittest
+from account import Account, get_share_price, price_version, set_share_price
+from render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = RenderCache(max_entries=2)
+        self.renders = []
+
+    def render(self, text):
+        def build():
+            self.renders.append(text)
+            return text
+        return build
+
+    def test_hit_skips_render(self):
+        self.assertEqual(self.cache.get_or_render(("u", "holdings", 1, 0), self.render("a")), "a")
+        self.assertEqual(self.cache.get_or_render(("u", "holdings", 1, 0), self.render("b")), "a")
+        self.assertEqual(self.renders, ["a"])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.get_or_render("k1", self.render("1"))
+        self.cache.get_or_render("k2", self.render("2"))
+        self.cache.get_or_render("k1", self.render("1"))
+        self.cache.get_or_render("k3", self.render("3"))
+        self.assertEqual(len(self.cache), 2)
+        self.cache.get_or_render("k1", self.render("1"))
+        self.cache.get_or_render("k2", self.render("2"))
+        self.assertEqual(self.renders, ["1", "2", "3", "2"])
+
+    def test_account_and_price_changes_change_the_key(self):
+        account = Account('test_user')
+        key = lambda: (account.user_id, "holdings", account.version, price_version())
+        first = key()
+        self.assertEqual(key(), first)
+        account.deposit_funds(10.0)
+        second = key()
+        self.assertNotEqual(second, first)
+        original = get_share_price('AAPL')
+        set_share_price('AAPL', original + 1)
+        self.addCleanup(set_share_price, 'AAPL', original)
+        self.assertNotEqual(key(), second)
+
+
+if __name__ == '__main__':
+    unittest.main()
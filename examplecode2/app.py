@@ -1,7 +1,14 @@
 
+import os
+
 import gradio as gr
 from banking_core import EnterpriseBankingSystem
 
+# Queueing limits; defaults suit a single small instance.
+CONCURRENCY_LIMIT = int(os.environ.get("APP_CONCURRENCY_LIMIT", "8"))
+MAX_QUEUE_SIZE = int(os.environ.get("APP_MAX_QUEUE_SIZE", "256"))
+MAX_BATCH_SIZE = int(os.environ.get("APP_MAX_BATCH_SIZE", "64"))
+
 bank_system = EnterpriseBankingSystem()
 
 def create_account(name, customer_id, currency):
@@ -10,9 +17,10 @@ def create_account(name, customer_id, currency):
 def get_account_details(account_id):
     return bank_system.get_account_details(account_id)
 
-def perform_deposit(account_id, amount):
-    success = bank_system.deposit(account_id, amount)
-    return 'Deposit Successful' if success else 'Deposit Failed'
+def perform_deposit(account_ids, amounts):
+    # Batched event: deposits queued together are posted with one deposit_batch call.
+    results = bank_system.deposit_batch(zip(account_ids, (amount or 0 for amount in amounts)))
+    return [['Deposit Successful' if success else 'Deposit Failed' for success in results]]
 
 def perform_withdrawal(account_id, amount):
     success = bank_system.withdraw(account_id, amount)
@@ -43,7 +51,9 @@ deposit_demo = gr.Interface(
     inputs=["text", "number"],
     outputs="text",
     title="Deposit",
-    description="Deposit funds into an existing account."
+    description="Deposit funds into an existing account.",
+    batch=True,
+    max_batch_size=MAX_BATCH_SIZE
 )
 
 withdraw_demo = gr.Interface(
@@ -62,7 +72,10 @@ transfer_demo = gr.Interface(
     description="Transfer funds between two accounts."
 )
 
-gr.TabbedInterface(
+app = gr.TabbedInterface(
     [demo, account_detail_demo, deposit_demo, withdraw_demo, transfer_demo],
     ["Create Account", "Account Details", "Deposit", "Withdrawal", "Transfer"]
-).launch()
+)
+
+if __name__ == "__main__":
+    app.queue(default_concurrency_limit=CONCURRENCY_LIMIT, max_size=MAX_QUEUE_SIZE).launch()
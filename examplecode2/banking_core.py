@@ -1,8 +1,16 @@
+import threading
+
 
 class EnterpriseBankingSystem:
-    def __init__(self):
+    def __init__(self, num_lock_stripes: int = 64):
         self.accounts = {}
         self.next_account_id = 1
+        self._lock_stripes = [threading.Lock() for _ in range(num_lock_stripes)]
+
+    def _locks_for(self, *account_ids: str) -> list:
+        # Stripes are always taken in ascending order so concurrent transfers cannot deadlock.
+        stripes = sorted({hash(account_id) % len(self._lock_stripes) for account_id in account_ids})
+        return [self._lock_stripes[stripe] for stripe in stripes]
         
     def create_account(self, customer_info: dict, currency: str) -> dict:
         account_id = f'acc_{self.next_account_id}'
@@ -20,19 +28,116 @@ class EnterpriseBankingSystem:
     def deposit(self, account_id: str, amount: float) -> bool:
         if amount <= 0 or account_id not in self.accounts:
             return False
-        self.accounts[account_id]['balance'] += amount
+        with self._locks_for(account_id)[0]:
+            self.accounts[account_id]['balance'] += amount
         return True
 
     def withdraw(self, account_id: str, amount: float) -> bool:
-        if amount <= 0 or account_id not in self.accounts or self.accounts[account_id]['balance'] < amount:
+        if amount <= 0 or account_id not in self.accounts:
             return False
-        self.accounts[account_id]['balance'] -= amount
+        with self._locks_for(account_id)[0]:
+            if self.accounts[account_id]['balance'] < amount:
+                return False
+            self.accounts[account_id]['balance'] -= amount
         return True
 
     def transfer(self, from_account_id: str, to_account_id: str, amount: float) -> bool:
-        if self.withdraw(from_account_id, amount) and self.deposit(to_account_id, amount):
+        # Both accounts are validated and locked before either balance changes,
+        # so a failed transfer never leaves money debited but not credited.
+        if amount <= 0 or from_account_id not in self.accounts or to_account_id not in self.accounts:
+            return False
+        locks = self._locks_for(from_account_id, to_account_id)
+        for lock in locks:
+            lock.acquire()
+        try:
+            source = self.accounts[from_account_id]
+            if source['balance'] < amount:
+                return False
+            source['balance'] -= amount
+            self.accounts[to_account_id]['balance'] += amount
             return True
-        return False
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def deposit_batch(self, deposits) -> list:
+        """Post many deposits with the same outcome as calling deposit() on each.
+
+        Args:
+            deposits (iterable): (account_id, amount) tuples.
+
+        Returns:
+            list: True for each deposit that was applied, False for each rejected.
+        """
+        results = []
+        for lock in self._lock_stripes:
+            lock.acquire()
+        try:
+            for account_id, amount in deposits:
+                account = self.accounts.get(account_id)
+                if account is None or amount <= 0:
+                    results.append(False)
+                    continue
+                account['balance'] += amount
+                results.append(True)
+        finally:
+            for lock in reversed(self._lock_stripes):
+                lock.release()
+        return results
+
+    def transfer_batch(self, transfers) -> list:
+        """Post many transfers with the same outcome as calling transfer() on each in order.
+
+        Each transfer is checked against the running balances left by the
+        transfers before it, so results match a sequential loop exactly. Only
+        the final balance of each touched account is written back, once. All
+        lock stripes are held for the whole batch so concurrent single
+        operations never interleave with it.
+
+        Args:
+            transfers (iterable): (from_account_id, to_account_id, amount) tuples.
+
+        Returns:
+            list: True for each transfer that was applied, False for each rejected.
+        """
+        find_account = self.accounts.get
+        running = {}
+        find_running = running.get
+        results = []
+        record = results.append
+        for lock in self._lock_stripes:
+            lock.acquire()
+        try:
+            for from_account_id, to_account_id, amount in transfers:
+                source = find_running(from_account_id)
+                if source is None:
+                    account = find_account(from_account_id)
+                    if account is None:
+                        record(False)
+                        continue
+                    source = account['balance']
+                if amount <= 0 or source < amount:
+                    record(False)
+                    continue
+                destination = find_running(to_account_id)
+                if destination is None:
+                    account = find_account(to_account_id)
+                    if account is None:
+                        record(False)
+                        continue
+                    destination = account['balance']
+                running[from_account_id] = source - amount
+                if to_account_id == from_account_id:
+                    destination = source - amount
+                running[to_account_id] = destination + amount
+                record(True)
+            accounts = self.accounts
+            for account_id, balance in running.items():
+                accounts[account_id]['balance'] = balance
+        finally:
+            for lock in reversed(self._lock_stripes):
+                lock.release()
+        return results
 
 
 # Example usage
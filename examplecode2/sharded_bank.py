@@ -0,0 +1,380 @@
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+import zlib
+
+from banking_core import EnterpriseBankingSystem
+
+# Two-phase commit steps; the shard must have them on disk before it answers.
+_DURABLE_OPS = ("prepare", "commit", "abort")
+
+
+class _Shard:
+    """One partition of the accounts, served inside a worker process.
+
+    Balances live in an EnterpriseBankingSystem. Every successful mutation is
+    appended to the shard's journal, which is replayed on start-up, so a
+    restarted shard comes back with its balances and any transfers it had
+    prepared but not yet been told to commit or abort.
+    """
+
+    def __init__(self, journal_path=None):
+        self.bank = EnterpriseBankingSystem(num_lock_stripes=1)
+        self.pending = {}  # txid -> ("debit" | "credit", account_id, amount)
+        self.journal = None
+        if journal_path and os.path.exists(journal_path):
+            with open(journal_path, encoding="utf-8") as handle:
+                for line in handle:
+                    op, *args = json.loads(line)
+                    getattr(self, "op_" + op)(*args)
+        if journal_path:
+            self.journal = open(journal_path, "a", encoding="utf-8")
+
+    def apply(self, op, args):
+        result = getattr(self, "op_" + op)(*args)
+        if result and self.journal is not None and op not in ("details", "pending"):
+            self.journal.write(json.dumps([op, *args]))
+            self.journal.write("\n")
+        return result
+
+    def flush(self, durable=False):
+        if self.journal is not None:
+            self.journal.flush()
+            if durable:
+                os.fsync(self.journal.fileno())
+
+    def op_create(self, account_id, customer_info, currency):
+        self.bank.accounts[account_id] = {'customer_info': customer_info, 'currency': currency, 'balance': 0.0}
+        return True
+
+    def op_details(self, account_id):
+        return self.bank.get_account_details(account_id)
+
+    def op_deposit(self, account_id, amount):
+        return self.bank.deposit(account_id, amount)
+
+    def op_withdraw(self, account_id, amount):
+        return self.bank.withdraw(account_id, amount)
+
+    def op_transfer(self, from_account_id, to_account_id, amount):
+        return self.bank.transfer(from_account_id, to_account_id, amount)
+
+    def op_prepare(self, txid, kind, account_id, amount):
+        # A prepared debit is taken out of the balance straight away, so it
+        # cannot be spent twice while the coordinator decides.
+        if txid in self.pending:
+            return True
+        if kind == "debit":
+            if not self.bank.withdraw(account_id, amount):
+                return False
+        elif account_id not in self.bank.accounts:
+            return False
+        self.pending[txid] = (kind, account_id, amount)
+        return True
+
+    def op_commit(self, txid):
+        entry = self.pending.pop(txid, None)
+        if entry is not None and entry[0] == "credit":
+            self.bank.accounts[entry[1]]['balance'] += entry[2]
+        return True
+
+    def op_abort(self, txid):
+        entry = self.pending.pop(txid, None)
+        if entry is not None and entry[0] == "debit":
+            self.bank.accounts[entry[1]]['balance'] += entry[2]
+        return True
+
+    def op_pending(self):
+        return list(self.pending)
+
+
+def _serve(connection, journal_path):
+    shard = _Shard(journal_path)
+    while True:
+        batch = connection.recv()
+        if batch is None:
+            break
+        results = [shard.apply(op, args) for op, *args in batch]
+        shard.flush(durable=any(op in _DURABLE_OPS for op, *_ in batch))
+        connection.send(results)
+    shard.flush()
+    connection.close()
+
+
+class ShardedBank:
+    """examplecode2's banking API over accounts partitioned across processes.
+
+    Accounts are placed on a shard by a stable hash of their id. Deposits,
+    withdrawals and same-shard transfers are routed to the owning shard;
+    transfers between shards run through a two-phase commit: both shards
+    prepare (the debit is reserved), the coordinator logs its decision, then
+    both shards commit or abort. Shards fsync their journal before answering
+    a prepare, commit or abort. On start-up the decision log is used to
+    finish any transfer interrupted between phases, and shard journals let a
+    whole deployment restart from `data_dir`; the outcome is kept in
+    `recovered`.
+
+    Batches sent with `execute` go to all shards at once and are processed
+    in parallel.
+    """
+
+    def __init__(self, num_shards=4, data_dir=None):
+        self.num_shards = num_shards
+        self.data_dir = data_dir
+        self._log = None
+        # Guards the decision table, the account counter and the coordinator log.
+        self._state_lock = threading.RLock()
+        self._decisions = {}  # txid -> (transfer, decision or None) for transfers not yet finished
+        self._next_account_id = 1
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+            self._load_metadata()
+            self._read_log()
+            self._log = open(os.path.join(data_dir, "coordinator.log"), "a", encoding="utf-8")
+        context = multiprocessing.get_context("fork")
+        self._connections = []
+        self._locks = []
+        self._processes = []
+        for shard in range(num_shards):
+            parent, child = context.Pipe()
+            journal = os.path.join(data_dir, f"shard-{shard}.journal") if data_dir else None
+            process = context.Process(target=_serve, args=(child, journal), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._locks.append(threading.Lock())
+            self._processes.append(process)
+        self.recovered = self._recover()
+
+    def _load_metadata(self):
+        path = os.path.join(self.data_dir, "metadata.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                metadata = json.load(handle)
+            if metadata["num_shards"] != self.num_shards:
+                raise ValueError(f"{self.data_dir} holds {metadata['num_shards']} shards, not {self.num_shards}")
+            self._next_account_id = metadata["next_account_id"]
+        else:
+            self._save_metadata()
+
+    def _save_metadata(self):
+        path = os.path.join(self.data_dir, "metadata.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump({"num_shards": self.num_shards, "next_account_id": self._next_account_id}, handle)
+        os.replace(path + ".tmp", path)
+
+    def _read_log(self):
+        path = os.path.join(self.data_dir, "coordinator.log")
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                record = json.loads(line)
+                if record["event"] == "begin":
+                    self._decisions[record["txid"]] = (record["transfer"], None)
+                elif record["event"] in ("commit", "abort"):
+                    self._decisions[record["txid"]] = (self._decisions[record["txid"]][0], record["event"])
+                else:
+                    self._decisions.pop(record["txid"], None)
+
+    def _write_log(self, durable=False, **record):
+        with self._state_lock:
+            if self._log is None:
+                return
+            self._log.write(json.dumps(record) + "\n")
+            self._log.flush()
+            if durable:
+                os.fsync(self._log.fileno())
+
+    def shard_for(self, account_id):
+        return zlib.crc32(account_id.encode("utf-8")) % self.num_shards
+
+    def _call_many(self, batches):
+        """Send {shard: [op, ...]} to every shard, then collect {shard: results}."""
+        shards = sorted(batches)
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            for shard in shards:
+                self._connections[shard].send(batches[shard])
+            return {shard: self._connections[shard].recv() for shard in shards}
+        finally:
+            for shard in reversed(shards):
+                self._locks[shard].release()
+
+    def _call(self, shard, op, *args):
+        return self._call_many({shard: [(op, *args)]})[shard][0]
+
+    def create_account(self, customer_info: dict, currency: str) -> dict:
+        with self._state_lock:
+            account_id = f'acc_{self._next_account_id}'
+            self._next_account_id += 1
+            if self.data_dir:
+                self._save_metadata()
+        self._call(self.shard_for(account_id), "create", account_id, customer_info, currency)
+        return {'account_id': account_id, 'customer_info': customer_info, 'currency': currency, 'balance': 0.0}
+
+    def get_account_details(self, account_id: str) -> dict:
+        return self._call(self.shard_for(account_id), "details", account_id)
+
+    def deposit(self, account_id: str, amount: float) -> bool:
+        return self._call(self.shard_for(account_id), "deposit", account_id, amount)
+
+    def withdraw(self, account_id: str, amount: float) -> bool:
+        return self._call(self.shard_for(account_id), "withdraw", account_id, amount)
+
+    def transfer(self, from_account_id: str, to_account_id: str, amount: float) -> bool:
+        if amount <= 0:
+            return False
+        source, destination = self.shard_for(from_account_id), self.shard_for(to_account_id)
+        if source == destination:
+            return self._call(source, "transfer", from_account_id, to_account_id, amount)
+        return self._two_phase_transfer(from_account_id, to_account_id, amount)
+
+    def _two_phase_transfer(self, from_account_id, to_account_id, amount):
+        txid = uuid.uuid4().hex
+        transfer = [from_account_id, to_account_id, amount]
+        with self._state_lock:
+            self._decisions[txid] = (transfer, None)
+            self._write_log(event="begin", txid=txid, transfer=transfer)
+        source, destination = self.shard_for(from_account_id), self.shard_for(to_account_id)
+        votes = self._call_many({
+            source: [("prepare", txid, "debit", from_account_id, amount)],
+            destination: [("prepare", txid, "credit", to_account_id, amount)],
+        })
+        decision = "commit" if votes[source][0] and votes[destination][0] else "abort"
+        # The decision must be durable before any shard acts on it.
+        with self._state_lock:
+            self._write_log(durable=True, event=decision, txid=txid)
+            self._decisions[txid] = (transfer, decision)
+        self._finish(txid)
+        return decision == "commit"
+
+    def _finish(self, txid):
+        with self._state_lock:
+            (from_account_id, to_account_id, _), decision = self._decisions[txid]
+        self._call_many({self.shard_for(from_account_id): [(decision or "abort", txid)],
+                         self.shard_for(to_account_id): [(decision or "abort", txid)]})
+        with self._state_lock:
+            self._write_log(event="end", txid=txid)
+            del self._decisions[txid]
+
+    def _recover(self):
+        """Finish cross-shard transfers interrupted by the previous run.
+
+        Transfers with a logged commit decision are committed on both shards;
+        any without a decision are aborted, which returns a reserved debit.
+        This only runs from __init__, before any transfer of this run can be
+        in flight, so it never aborts a transfer that is still preparing.
+        Commit and abort are idempotent on the shards, so a crash during
+        recovery is recovered on the next start.
+
+        Returns:
+            dict: Number of transfers committed and aborted.
+        """
+        outcome = {"commit": 0, "abort": 0}
+        for txid in list(self._decisions):
+            _, decision = self._decisions[txid]
+            if decision is None:
+                self._write_log(durable=True, event="abort", txid=txid)
+                self._decisions[txid] = (self._decisions[txid][0], "abort")
+            outcome[self._decisions[txid][1]] += 1
+            self._finish(txid)
+        # Prepared transfers the coordinator never logged (it failed before writing "begin") are released too.
+        pending = self._call_many({shard: [("pending",)] for shard in range(self.num_shards)})
+        for shard, (txids,) in pending.items():
+            if txids:
+                self._call_many({shard: [("abort", txid) for txid in txids]})
+                outcome["abort"] += len(txids)
+        return outcome
+
+    def partition(self, operations):
+        """Split ("deposit" | "withdraw", account_id, amount) and same-shard
+        ("transfer", from, to, amount) operations into per-shard batches.
+
+        Returns:
+            tuple: ({shard: [operation, ...]}, {shard: [position, ...]}).
+        """
+        batches, positions = {}, {}
+        for position, operation in enumerate(operations):
+            shard = self.shard_for(operation[1])
+            if operation[0] == "transfer" and self.shard_for(operation[2]) != shard:
+                raise ValueError(f"Cross-shard transfer at position {position} must use transfer()")
+            batches.setdefault(shard, []).append(operation)
+            positions.setdefault(shard, []).append(position)
+        return batches, positions
+
+    def execute(self, operations):
+        """Run many single-shard operations, every shard working in parallel.
+
+        Returns:
+            list: Each operation's result, in the order given.
+        """
+        operations = list(operations)
+        batches, positions = self.partition(operations)
+        results = [None] * len(operations)
+        for shard, shard_results in self._call_many(batches).items():
+            for position, result in zip(positions[shard], shard_results):
+                results[position] = result
+        return results
+
+    def close(self):
+        for shard, connection in enumerate(self._connections):
+            with self._locks[shard]:
+                connection.send(None)
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
+        with self._state_lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    def client(bank, operations):
+        # Every call goes through the public API, so it takes the shard locks and cross-shard
+        # transfers run the two-phase commit.
+        for kind, *args in operations:
+            getattr(bank, kind)(*args)
+
+    operations_per_client = 20_000
+    for num_shards in (1, 2, 4, 8):
+        bank = ShardedBank(num_shards)
+        accounts = {shard: [] for shard in range(num_shards)}
+        while min(len(ids) for ids in accounts.values()) < 100:
+            account_id = bank.create_account({}, "USD")["account_id"]
+            accounts[bank.shard_for(account_id)].append(account_id)
+        everyone = [account_id for ids in accounts.values() for account_id in ids]
+        bank.execute([("deposit", account_id, 1000.0) for account_id in everyone])
+        rng = random.Random(0)
+        workloads = []
+        for shard, ids in accounts.items():
+            operations = []
+            for _ in range(operations_per_client):
+                kind = rng.random()
+                if kind < 0.4:
+                    operations.append(("deposit", rng.choice(ids), 10.0))
+                elif kind < 0.7:
+                    operations.append(("withdraw", rng.choice(ids), 10.0))
+                elif kind < 0.9:
+                    operations.append(("transfer", *rng.sample(ids, 2), 5.0))
+                else:
+                    operations.append(("transfer", rng.choice(ids), rng.choice(everyone), 5.0))
+            workloads.append(operations)
+        # One client thread per shard, each mostly working on its own shard's accounts.
+        clients = [threading.Thread(target=client, args=(bank, operations)) for operations in workloads]
+        started = time.perf_counter()
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        total = sum(len(operations) for operations in workloads)
+        print(f"{num_shards} shards: {total / elapsed:,.0f} ops/s")
+        bank.close()
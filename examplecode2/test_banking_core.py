@@ -1,3 +1,5 @@
+import random
+import threading
 import unittest
 from banking_core import EnterpriseBankingSystem
 
@@ -92,6 +94,12 @@ class TestEnterpriseBankingSystem(unittest.TestCase):
             50.0
         ))
         
+        # A failed transfer must not debit the source account
+        self.assertEqual(
+            self.bank.get_account_details(self.account['account_id'])['balance'],
+            initial_balance1 - transfer_amount
+        )
+
         # Test transfer from non-existing account
         self.assertFalse(self.bank.transfer(
             'nonexistent_account', 
@@ -99,5 +107,54 @@ class TestEnterpriseBankingSystem(unittest.TestCase):
             50.0
         ))
 
+    def test_concurrent_transfers_conserve_money(self):
+        account_ids = [self.bank.create_account({'name': f'c{i}'}, 'USD')['account_id'] for i in range(20)]
+        for account_id in account_ids:
+            self.bank.deposit(account_id, 1000.0)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(2000):
+                source, destination = rng.sample(account_ids, 2)
+                self.bank.transfer(source, destination, float(rng.randint(1, 300)))
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        balances = [self.bank.get_account_details(a)['balance'] for a in account_ids]
+        self.assertEqual(sum(balances), 20 * 1000.0)
+        self.assertTrue(all(balance >= 0 for balance in balances))
+
+    def test_deposit_batch(self):
+        account_id = self.account['account_id']
+        results = self.bank.deposit_batch([(account_id, 100.0), ('nonexistent_account', 10.0),
+                                           (account_id, -5.0), (account_id, 25.0)])
+        self.assertEqual(results, [True, False, False, True])
+        self.assertEqual(self.bank.get_account_details(account_id)['balance'], 125.0)
+
+    def test_transfer_batch_matches_sequential_transfers(self):
+        batch_bank = EnterpriseBankingSystem()
+        account_ids = []
+        for i in range(30):
+            account_ids.append(self.bank.create_account({'name': f'c{i}'}, 'USD')['account_id'])
+            batch_bank.create_account({'name': f'c{i}'}, 'USD')
+        batch_bank.create_account(self.customer_info, 'USD')
+        for account_id in account_ids:
+            self.bank.deposit(account_id, 100.0)
+            batch_bank.deposit(account_id, 100.0)
+        rng = random.Random(7)
+        transfers = [(rng.choice(account_ids + ['missing']), rng.choice(account_ids + ['missing']),
+                      rng.choice([rng.uniform(0, 120), 0.0, -5.0])) for _ in range(5000)]
+        transfers.append((account_ids[0], account_ids[0], 10.0))
+        expected = [self.bank.transfer(*transfer) for transfer in transfers]
+        self.assertEqual(batch_bank.transfer_batch(transfers), expected)
+        for account_id in account_ids:
+            self.assertEqual(batch_bank.get_account_details(account_id)['balance'],
+                             self.bank.get_account_details(account_id)['balance'])
+        self.assertIn(True, expected)
+        self.assertIn(False, expected)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
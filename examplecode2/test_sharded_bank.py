@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from sharded_bank import ShardedBank
+
+
+class TestShardedBank(unittest.TestCase):
+    def setUp(self):
+        self.bank = ShardedBank(num_shards=3)
+        self.addCleanup(self.bank.close)
+        self.accounts = [self.bank.create_account({'name': f'c{i}'}, 'USD')['account_id'] for i in range(12)]
+        for account_id in self.accounts:
+            self.bank.deposit(account_id, 100.0)
+
+    def pair(self, same_shard):
+        for source in self.accounts:
+            for destination in self.accounts:
+                if source != destination and (self.bank.shard_for(source) == self.bank.shard_for(destination)) == same_shard:
+                    return source, destination
+
+    def balance(self, account_id):
+        return self.bank.get_account_details(account_id)['balance']
+
+    def test_routing(self):
+        self.assertEqual(len({self.bank.shard_for(account_id) for account_id in self.accounts}), 3)
+        self.assertEqual(self.bank.get_account_details(self.accounts[0]),
+                         {'customer_info': {'name': 'c0'}, 'currency': 'USD', 'balance': 100.0})
+        self.assertIsNone(self.bank.get_account_details('nonexistent_account'))
+        self.assertTrue(self.bank.withdraw(self.accounts[0], 40.0))
+        self.assertFalse(self.bank.withdraw(self.accounts[0], 400.0))
+        self.assertEqual(self.balance(self.accounts[0]), 60.0)
+
+    def test_transfers(self):
+        for same_shard in (True, False):
+            source, destination = self.pair(same_shard)
+            self.assertTrue(self.bank.transfer(source, destination, 30.0))
+            self.assertEqual((self.balance(source), self.balance(destination)), (70.0, 130.0))
+            self.assertFalse(self.bank.transfer(source, destination, 500.0))
+            self.assertFalse(self.bank.transfer(source, 'nonexistent_account', 10.0))
+            self.assertEqual((self.balance(source), self.balance(destination)), (70.0, 130.0))
+            self.bank.transfer(destination, source, 30.0)
+
+    def test_concurrent_account_ids_are_unique(self):
+        created = []
+
+        def worker():
+            for _ in range(50):
+                created.append(self.bank.create_account({}, 'USD')['account_id'])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(created)), 200)
+
+    def test_execute_batches_by_shard(self):
+        operations = [('deposit', account_id, 5.0) for account_id in self.accounts]
+        operations.append(('withdraw', self.accounts[1], 1000.0))
+        operations.append(('transfer', *self.pair(True), 10.0))
+        results = self.bank.execute(operations)
+        self.assertEqual(results, [True] * 12 + [False, True])
+        self.assertEqual(sum(self.balance(account_id) for account_id in self.accounts), 12 * 105.0)
+        with self.assertRaises(ValueError):
+            self.bank.execute([('transfer', *self.pair(False), 1.0)])
+
+
+class TestShardedBankRecovery(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def open_bank(self):
+        bank = ShardedBank(num_shards=2, data_dir=self.data_dir)
+        self.addCleanup(bank.close)
+        return bank
+
+    def test_restart_restores_balances(self):
+        bank = self.open_bank()
+        source = bank.create_account({'name': 'a'}, 'USD')['account_id']
+        destination = bank.create_account({'name': 'b'}, 'USD')['account_id']
+        bank.deposit(source, 100.0)
+        bank.transfer(source, destination, 25.0)
+        bank.close()
+        bank = self.open_bank()
+        self.assertEqual(bank.get_account_details(source)['balance'], 75.0)
+        self.assertEqual(bank.get_account_details(destination)['balance'], 25.0)
+        self.assertNotIn(bank.create_account({}, 'USD')['account_id'], (source, destination))
+        with self.assertRaises(ValueError):
+            ShardedBank(num_shards=3, data_dir=self.data_dir)
+
+    def test_recover_completes_logged_decisions(self):
+        bank = self.open_bank()
+        ids = [bank.create_account({}, 'USD')['account_id'] for _ in range(6)]
+        source = ids[0]
+        destination = next(i for i in ids if bank.shard_for(i) != bank.shard_for(source))
+        undecided = next(i for i in ids if i not in (source, destination) and bank.shard_for(i) == bank.shard_for(source))
+        bank.deposit(source, 100.0)
+        bank.deposit(undecided, 100.0)
+        # Crash after logging a commit decision, before the shards heard it.
+        bank._finish = lambda txid: None
+        self.assertTrue(bank.transfer(source, destination, 40.0))
+        # Crash after prepare, before any decision was logged.
+        bank._write_log(event="begin", txid="lost", transfer=[undecided, destination, 60.0])
+        bank._call(bank.shard_for(undecided), "prepare", "lost", "debit", undecided, 60.0)
+        bank._call(bank.shard_for(destination), "prepare", "lost", "credit", destination, 60.0)
+        self.assertEqual(bank.get_account_details(source)['balance'], 60.0)
+        self.assertEqual(bank.get_account_details(undecided)['balance'], 40.0)
+        bank.close()
+
+        bank = self.open_bank()
+        self.assertEqual(bank.get_account_details(source)['balance'], 60.0)
+        self.assertEqual(bank.get_account_details(destination)['balance'], 40.0)
+        self.assertEqual(bank.get_account_details(undecided)['balance'], 100.0)
+        self.assertEqual(bank.recovered, {"commit": 1, "abort": 1})
+        self.assertFalse(hasattr(bank, "recover"))
+        with open(os.path.join(self.data_dir, "coordinator.log"), encoding="utf-8") as handle:
+            events = [json.loads(line)["event"] for line in handle]
+        self.assertEqual(events.count("end"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,328 @@
+import threading
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Digits after the decimal point; every other currency uses 2.
+CURRENCY_EXPONENTS = {"JPY": 0, "KRW": 0, "BHD": 3, "KWD": 3}
+
+_SHIFT = 16
+_CHUNK = 1 << _SHIFT
+_MASK = _CHUNK - 1
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_minor_units(value, scale, currency):
+    """Convert an amount to int minor units, rejecting amounts with finer precision."""
+    scaled = value * scale
+    minor = round(scaled)
+    # Allow for float error in sums like 0.1 + 0.2, which grows with the magnitude.
+    if abs(scaled - minor) > 1e-6 + abs(scaled) * 1e-15:
+        raise ValueError(f"Amount {value!r} is not a whole number of {currency} minor units")
+    return minor
+
+
+class _Codes:
+    """Small value <-> int code dictionary for low-cardinality columns."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _IdColumn:
+    """Append-only column of fixed-width ASCII ids with an open-addressing hash index.
+
+    Values are stored in chunks that are never reallocated; the index holds
+    int32 positions at a load factor of at most one half and is rebuilt into
+    a new array (then swapped in) when it fills, so lookups never lock.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self.size = 0
+        self._chunks = []
+        self._slots = np.full(2 * _CHUNK, -1, dtype=np.int32)
+
+    def __iter__(self):
+        for chunk, values in enumerate(self._chunks):
+            count = min(_CHUNK, self.size - chunk * _CHUNK)
+            for value in values[:count].tolist():
+                yield value.decode("ascii")
+
+    def find(self, value):
+        try:
+            key = value.encode("ascii")
+        except UnicodeEncodeError:
+            return None  # ids are ASCII, so it cannot be stored
+        slots = self._slots
+        mask = len(slots) - 1
+        slot = hash(value) & mask
+        while True:
+            position = slots.item(slot)
+            if position < 0:
+                return None
+            if self._chunks[position >> _SHIFT][position & _MASK] == key:
+                return position
+            slot = (slot + 1) & mask
+
+    @staticmethod
+    def _place(slots, value, position):
+        mask = len(slots) - 1
+        slot = hash(value) & mask
+        while slots.item(slot) >= 0:
+            slot = (slot + 1) & mask
+        slots[slot] = position
+
+    def append(self, value):
+        """Add a value that is not present yet; callers serialize appends."""
+        if len(value.encode("ascii")) > self.width:
+            raise ValueError(f"Id {value!r} is longer than {self.width} characters")
+        position = self.size
+        if position & _MASK == 0:
+            self._chunks.append(np.zeros(_CHUNK, dtype=f"S{self.width}"))
+        self._chunks[position >> _SHIFT][position & _MASK] = value.encode("ascii")
+        if 2 * (position + 1) > len(self._slots):
+            slots = np.full(2 * len(self._slots), -1, dtype=np.int32)
+            for existing, existing_value in enumerate(self):
+                self._place(slots, existing_value, existing)
+            self._place(slots, value, position)
+            self._slots = slots
+        else:
+            self._place(self._slots, value, position)
+        self.size = position + 1
+        return position
+
+    def code(self, value):
+        position = self.find(value)
+        return self.append(value) if position is None else position
+
+    def value(self, position):
+        return self._chunks[position >> _SHIFT][position & _MASK].decode("ascii")
+
+
+class AccountProxy:
+    """Account view over one table row, with the same attributes as Account."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @property
+    def account_id(self):
+        return self._table.account_id(self._row)
+
+    @property
+    def customer_id(self):
+        return self._table.customer_id(self._row)
+
+    @property
+    def account_type(self):
+        return self._table.account_type(self._row)
+
+    @property
+    def currency(self):
+        return self._table.currency(self._row)
+
+    @property
+    def balance(self):
+        return self._table.balance(self._row)
+
+    @balance.setter
+    def balance(self, value):
+        self._table.set_balance(self._row, value)
+
+    @property
+    def created_at(self):
+        return self._table.created_at(self._row)
+
+    def __repr__(self):
+        return f"AccountProxy({self.account_id!r}, balance={self.balance!r})"
+
+
+class AccountTable(MutableMapping):
+    """account_id -> account mapping stored as parallel typed arrays.
+
+    Each account is one row: balance in int64 minor units, currency and
+    account-type codes, a customer code and the creation time in epoch
+    microseconds. Ids live in a fixed-width byte column and are found
+    through an open-addressing hash index of row numbers, so no Python
+    object is kept per account. Reads return an AccountProxy for the row.
+
+    Columns grow in fixed-size chunks that are never reallocated, so a
+    balance written while another thread appends rows is never lost.
+    Balances that are not a whole number of minor units are rejected with
+    ValueError rather than rounded, so the table never holds a balance that
+    differs from what was posted.
+    """
+
+    def __init__(self, id_width=16):
+        self._ids = _IdColumn(id_width)
+        self._balances = []
+        self._currencies = []
+        self._types = []
+        self._customers = []
+        self._created = []
+        self._customer_ids = _IdColumn(id_width)
+        self._currency_codes = _Codes()
+        self._type_codes = _Codes()
+        self._scales = []  # currency code -> 10 ** exponent
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._ids.size
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, account_id):
+        return isinstance(account_id, str) and self._ids.find(account_id) is not None
+
+    def __getitem__(self, account_id):
+        row = self._ids.find(account_id) if isinstance(account_id, str) else None
+        if row is None:
+            raise KeyError(account_id)
+        return AccountProxy(self, row)
+
+    def get(self, account_id, default=None):
+        row = self._ids.find(account_id) if isinstance(account_id, str) else None
+        return default if row is None else AccountProxy(self, row)
+
+    def __setitem__(self, account_id, account):
+        """Insert or overwrite an account (any object with the Account attributes)."""
+        for value in (account_id, account.customer_id):
+            if len(value.encode("ascii")) > self._ids.width:
+                raise ValueError(f"Id {value!r} is longer than {self._ids.width} characters")
+        scale = 10 ** CURRENCY_EXPONENTS.get(account.currency, 2)
+        balance = _to_minor_units(account.balance, scale, account.currency)
+        with self._lock:
+            row = self._ids.find(account_id)
+            if row is None:
+                customer = self._customer_ids.code(account.customer_id)
+                if len(self._balances) << _SHIFT == self._ids.size:
+                    self._balances.append(np.zeros(_CHUNK, dtype=np.int64))
+                    self._currencies.append(np.zeros(_CHUNK, dtype=np.int16))
+                    self._types.append(np.zeros(_CHUNK, dtype=np.int16))
+                    self._customers.append(np.zeros(_CHUNK, dtype=np.int32))
+                    self._created.append(np.zeros(_CHUNK, dtype=np.int64))
+                chunk, offset = self._ids.size >> _SHIFT, self._ids.size & _MASK
+                self._customers[chunk][offset] = customer
+            else:
+                chunk, offset = row >> _SHIFT, row & _MASK
+                self._customers[chunk][offset] = self._customer_ids.code(account.customer_id)
+            currency = self._currency_codes.code(account.currency)
+            if currency == len(self._scales):
+                self._scales.append(scale)
+            self._currencies[chunk][offset] = currency
+            self._types[chunk][offset] = self._type_codes.code(account.account_type)
+            self._created[chunk][offset] = (account.created_at - _EPOCH) // timedelta(microseconds=1)
+            self._balances[chunk][offset] = balance
+            if row is None:
+                # Publish the id last, so a concurrent lookup never sees a half-written row.
+                self._ids.append(account_id)
+
+    def __delitem__(self, account_id):
+        raise TypeError("Accounts cannot be removed from an AccountTable; close them instead")
+
+    def account_id(self, row):
+        return self._ids.value(row)
+
+    def customer_id(self, row):
+        return self._customer_ids.value(self._customers[row >> _SHIFT].item(row & _MASK))
+
+    def account_type(self, row):
+        return self._type_codes.values[self._types[row >> _SHIFT].item(row & _MASK)]
+
+    def currency(self, row):
+        return self._currency_codes.values[self._currencies[row >> _SHIFT].item(row & _MASK)]
+
+    def balance_minor(self, row):
+        return self._balances[row >> _SHIFT].item(row & _MASK)
+
+    def balance(self, row):
+        scale = self._scales[self._currencies[row >> _SHIFT].item(row & _MASK)]
+        return self._balances[row >> _SHIFT].item(row & _MASK) / scale
+
+    def set_balance(self, row, value):
+        currency = self._currencies[row >> _SHIFT].item(row & _MASK)
+        minor = _to_minor_units(value, self._scales[currency], self._currency_codes.values[currency])
+        self._balances[row >> _SHIFT][row & _MASK] = minor
+
+    def created_at(self, row):
+        return _EPOCH + timedelta(microseconds=self._created[row >> _SHIFT].item(row & _MASK))
+
+    def chunks(self):
+        """Yield (first_row, columns) per chunk for vectorized passes.
+
+        The column arrays are live views: writing to "balance_minor" writes
+        the balances. "account_id" holds the ids as ASCII bytes.
+        """
+        size = len(self)
+        for chunk in range(len(self._balances)):
+            count = min(_CHUNK, size - chunk * _CHUNK)
+            yield chunk * _CHUNK, {
+                "account_id": self._ids._chunks[chunk][:count],
+                "balance_minor": self._balances[chunk][:count],
+                "currency": self._currencies[chunk][:count],
+                "account_type": self._types[chunk][:count],
+                "customer": self._customers[chunk][:count],
+                "created_at": self._created[chunk][:count],
+            }
+
+    def codes(self, column):
+        """Values of a coded column ("currency" or "account_type"), indexed by code."""
+        return {"currency": self._currency_codes, "account_type": self._type_codes}[column].values
+
+    def customer_for_code(self, code):
+        return self._customer_ids.value(code)
+
+    def scales(self):
+        """Minor units per major unit, indexed by currency code."""
+        return np.array(self._scales, dtype=np.int64)
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    from banking_core import Account
+
+    count = 1_000_000
+    # Customer ids are shared with the Customer objects, as they are in the bank.
+    customer_ids = [f"CUST{i:08d}" for i in range(count // 3 + 1)]
+    tracemalloc.start()
+    accounts = {}
+    for i in range(count):
+        accounts[f"ACC{i:09d}"] = Account(f"ACC{i:09d}", customer_ids[i // 3], "checking", "USD", 100.0)
+    objects = tracemalloc.get_traced_memory()[0]
+    template = accounts["ACC000000000"]
+    del accounts
+    baseline = tracemalloc.get_traced_memory()[0]
+    table = AccountTable()
+    for i in range(count):
+        template.account_id, template.customer_id = f"ACC{i:09d}", customer_ids[i // 3]
+        table[template.account_id] = template
+    compact = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    print(f"Account objects: {objects / count:.0f} bytes/account, "
+          f"AccountTable: {compact / count:.0f} bytes/account ({objects / compact:.1f}x smaller)")
+
+    account = table["ACC000123456"]
+    started = time.perf_counter()
+    for _ in range(1_000_000):
+        account.balance = account.balance + 1.0
+    print(f"balance update: {(time.perf_counter() - started) * 1e3 / 1000:.2f}us")
+    started = time.perf_counter()
+    for i in range(100_000):
+        table.get(f"ACC{i * 7:09d}")
+    print(f"lookup: {(time.perf_counter() - started) * 1e6 / 100_000:.2f}us")
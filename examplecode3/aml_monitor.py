@@ -0,0 +1,292 @@
+from array import array
+from collections import deque
+from datetime import datetime
+
+
+def _epoch(timestamp):
+    if timestamp is None:
+        return datetime.now().timestamp()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+class AMLAlert:
+    def __init__(self, kind, account_id, timestamp, details):
+        self.kind = kind  # "structuring", "round_trip" or "cycle"
+        self.account_id = account_id
+        self.timestamp = timestamp
+        self.details = details
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "account_id": self.account_id,
+            "timestamp": self.timestamp,
+            "details": self.details,
+        }
+
+
+class _Bucket:
+    __slots__ = ("bucket_id", "edges", "near")
+
+    def __init__(self, bucket_id):
+        self.bucket_id = bucket_id
+        self.edges = array("l")  # edge slot of every transfer in this bucket
+        self.near = {}  # node -> near-threshold transfers in this bucket
+
+
+class TransferGraph:
+    """Incrementally maintained graph of account-to-account transfers.
+
+    Accounts are interned to integer node ids. Each distinct (source,
+    destination) pair owns one slot in a pool of typed arrays holding its
+    endpoints, live transfer count and latest transfer time. Slots are
+    chained into every node's outgoing and incoming lists through next/prev
+    arrays, so adding or dropping a pair is O(1) and a pair is found by
+    walking whichever of the two lists is shorter. Buckets record the slot of
+    each transfer, so expiry drops a whole bucket at a time and freed slots
+    are reused; memory grows with counterparties rather than transfer volume.
+    Each call to `record_transfer` only inspects the neighbourhood of the new
+    edge, never the full history.
+    """
+
+    def __init__(self, bucket_seconds=3600, retention_buckets=24,
+                 reporting_threshold=10000.0, structuring_margin=0.1, structuring_count=3,
+                 round_trip_seconds=86400, max_cycle_length=4, max_fanout=64,
+                 max_alerts=10000):
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+        self.reporting_threshold = reporting_threshold
+        self.structuring_floor = reporting_threshold * (1 - structuring_margin)
+        self.structuring_count = structuring_count
+        self.round_trip_seconds = round_trip_seconds
+        self.max_cycle_length = max_cycle_length
+        self.max_fanout = max_fanout
+
+        self._index = {}  # account_id -> node
+        self._ids = []    # node -> account_id
+        # Per node: first slot of its outgoing / incoming list (-1 when empty) and list lengths.
+        self._out_head = array("l")
+        self._in_head = array("l")
+        self._out_degree = array("l")
+        self._in_degree = array("l")
+        # Per edge slot.
+        self._edge_src = array("l")
+        self._edge_dst = array("l")
+        self._edge_live = array("l")   # transfers still inside the retention window
+        self._edge_last = array("d")   # latest transfer epoch
+        self._out_next = array("l")
+        self._out_prev = array("l")
+        self._in_next = array("l")
+        self._in_prev = array("l")
+        self._free = array("l")        # released slots, reused before the pool grows
+        self._near_totals = {}  # node -> near-threshold transfers in retention window
+        self._buckets = deque()
+        self.edge_count = 0
+        self.alerts = deque(maxlen=max_alerts)
+        self._alerts_by_account = {}  # account_id -> deque of that account's alerts in self.alerts
+
+    def _node(self, account_id):
+        node = self._index.get(account_id)
+        if node is None:
+            node = len(self._ids)
+            self._index[account_id] = node
+            self._ids.append(account_id)
+            self._out_head.append(-1)
+            self._in_head.append(-1)
+            self._out_degree.append(0)
+            self._in_degree.append(0)
+        return node
+
+    def _find_edge(self, src, dst):
+        # Walk the shorter of src's outgoing and dst's incoming lists.
+        if self._out_degree[src] <= self._in_degree[dst]:
+            edge, following, ends, wanted = self._out_head[src], self._out_next, self._edge_dst, dst
+        else:
+            edge, following, ends, wanted = self._in_head[dst], self._in_next, self._edge_src, src
+        while edge >= 0 and ends[edge] != wanted:
+            edge = following[edge]
+        return edge
+
+    def _add_edge(self, src, dst):
+        if self._free:
+            edge = self._free.pop()
+            self._edge_src[edge], self._edge_dst[edge] = src, dst
+            self._edge_live[edge], self._edge_last[edge] = 0, 0.0
+        else:
+            edge = len(self._edge_src)
+            self._edge_src.append(src)
+            self._edge_dst.append(dst)
+            self._edge_live.append(0)
+            self._edge_last.append(0.0)
+            for links in (self._out_next, self._out_prev, self._in_next, self._in_prev):
+                links.append(-1)
+        self._link(edge, src, self._out_head, self._out_next, self._out_prev)
+        self._link(edge, dst, self._in_head, self._in_next, self._in_prev)
+        self._out_degree[src] += 1
+        self._in_degree[dst] += 1
+        return edge
+
+    def _remove_edge(self, edge):
+        src, dst = self._edge_src[edge], self._edge_dst[edge]
+        self._unlink(edge, src, self._out_head, self._out_next, self._out_prev)
+        self._unlink(edge, dst, self._in_head, self._in_next, self._in_prev)
+        self._out_degree[src] -= 1
+        self._in_degree[dst] -= 1
+        self._free.append(edge)
+
+    @staticmethod
+    def _link(edge, node, heads, nexts, prevs):
+        head = heads[node]
+        nexts[edge], prevs[edge] = head, -1
+        if head >= 0:
+            prevs[head] = edge
+        heads[node] = edge
+
+    @staticmethod
+    def _unlink(edge, node, heads, nexts, prevs):
+        following, preceding = nexts[edge], prevs[edge]
+        if preceding >= 0:
+            nexts[preceding] = following
+        else:
+            heads[node] = following
+        if following >= 0:
+            prevs[following] = preceding
+
+    def _bucket_for(self, bucket_id):
+        if not self._buckets or bucket_id > self._buckets[-1].bucket_id:
+            self._buckets.append(_Bucket(bucket_id))
+            self._expire(bucket_id - self.retention_buckets)
+            return self._buckets[-1]
+        for bucket in reversed(self._buckets):
+            if bucket.bucket_id == bucket_id:
+                return bucket
+            if bucket.bucket_id < bucket_id:
+                break
+        return None  # older than anything still retained
+
+    def _expire(self, oldest_expired_id):
+        while self._buckets and self._buckets[0].bucket_id <= oldest_expired_id:
+            bucket = self._buckets.popleft()
+            for edge in bucket.edges:
+                remaining = self._edge_live[edge] - 1
+                self._edge_live[edge] = remaining
+                if not remaining:
+                    self._remove_edge(edge)
+            self.edge_count -= len(bucket.edges)
+            for node, count in bucket.near.items():
+                remaining = self._near_totals[node] - count
+                if remaining:
+                    self._near_totals[node] = remaining
+                else:
+                    del self._near_totals[node]
+
+    def _add_alert(self, alert):
+        if len(self.alerts) == self.alerts.maxlen:
+            # The evicted alert is also the oldest one kept for its account.
+            evicted = self.alerts[0].account_id
+            by_account = self._alerts_by_account[evicted]
+            by_account.popleft()
+            if not by_account:
+                del self._alerts_by_account[evicted]
+        self.alerts.append(alert)
+        self._alerts_by_account.setdefault(alert.account_id, deque()).append(alert)
+
+    def record_transfer(self, source_account_id, destination_account_id, amount, timestamp=None):
+        """Add one transfer edge and return the alerts it triggers.
+
+        Args:
+            source_account_id (str): Account the money left.
+            destination_account_id (str): Account the money arrived in.
+            amount (float): Transfer amount in the transfer currency.
+            timestamp (datetime | float | None): When the transfer posted.
+
+        Returns:
+            list: AMLAlert objects raised by this transfer (usually empty).
+        """
+        ts = _epoch(timestamp)
+        bucket = self._bucket_for(int(ts // self.bucket_seconds))
+        if bucket is None:
+            return []
+
+        src = self._node(source_account_id)
+        dst = self._node(destination_account_id)
+        edge = self._find_edge(src, dst)
+        if edge < 0:
+            edge = self._add_edge(src, dst)
+        bucket.edges.append(edge)
+        self._edge_live[edge] += 1
+        if ts > self._edge_last[edge]:
+            self._edge_last[edge] = ts
+        self.edge_count += 1
+
+        alerts = []
+        if self.structuring_floor <= amount < self.reporting_threshold:
+            bucket.near[src] = bucket.near.get(src, 0) + 1
+            total = self._near_totals.get(src, 0) + 1
+            self._near_totals[src] = total
+            if total == self.structuring_count:
+                alerts.append(AMLAlert("structuring", source_account_id, ts, {
+                    "near_threshold_transfers": total,
+                    "threshold": self.reporting_threshold,
+                }))
+
+        if src != dst:  # money moved within one account closes no round trip or cycle
+            returned = self._find_edge(dst, src)
+            if returned >= 0 and abs(ts - self._edge_last[returned]) <= self.round_trip_seconds:
+                alerts.append(AMLAlert("round_trip", source_account_id, ts, {
+                    "counterparty": destination_account_id,
+                    "seconds_apart": abs(ts - self._edge_last[returned]),
+                }))
+            elif self.max_cycle_length > 2:
+                path = self._find_path(dst, src, self.max_cycle_length - 1)
+                if path is not None:
+                    alerts.append(AMLAlert("cycle", source_account_id, ts, {
+                        "path": [source_account_id] + [self._ids[node] for node in path],
+                    }))
+
+        for alert in alerts:
+            self._add_alert(alert)
+        return alerts
+
+    def _find_path(self, start, target, max_hops):
+        # Bounded breadth-first search; hubs are capped at max_fanout neighbours
+        # so a single edge never costs more than max_fanout ** max_hops steps.
+        parents = {start: None}
+        frontier = [start]
+        for hop in range(max_hops):
+            next_frontier = []
+            for node in frontier:
+                edge, checked = self._out_head[node], 0
+                while edge >= 0 and checked < self.max_fanout:
+                    neighbour = self._edge_dst[edge]
+                    edge = self._out_next[edge]
+                    checked += 1
+                    if neighbour in parents or (hop == 0 and neighbour == target):
+                        continue  # a direct hop back is a round trip, not a cycle
+                    parents[neighbour] = node
+                    if neighbour == target:
+                        path = []
+                        while neighbour is not None:
+                            path.append(neighbour)
+                            neighbour = parents[neighbour]
+                        return path[::-1]
+                    next_frontier.append(neighbour)
+            frontier = next_frontier
+        return None
+
+    def counterparties(self, account_id):
+        """Accounts this one sent money to within the retention window, newest pair first."""
+        node = self._index.get(account_id)
+        if node is None:
+            return []
+        result = []
+        edge = self._out_head[node]
+        while edge >= 0:
+            result.append(self._ids[self._edge_dst[edge]])
+            edge = self._out_next[edge]
+        return result
+
+    def alerts_for(self, account_id):
+        return list(self._alerts_by_account.get(account_id, ()))
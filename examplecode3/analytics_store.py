@@ -0,0 +1,315 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+
+# Revenue earned per unit of volume, by transaction type, used for lifetime value.
+DEFAULT_REVENUE_RATES = {
+    "deposit": 0.01,
+    "withdrawal": 0.0,
+    "transfer": 0.001,
+    "card_transaction": 0.02,
+    "loan_payment": 0.05,
+}
+
+
+def _epoch(value):
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+class _Codes:
+    """Interns strings to dense integer codes."""
+
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def code(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ColumnarTransactionStore:
+    """Columnar mirror of the transaction stream.
+
+    Postings are staged in plain lists and moved into the NumPy columns a
+    chunk at a time, so per-transaction cost stays a few list appends. The
+    columns grow by doubling and queries work on views of the filled prefix,
+    so analytics never touch Transaction objects and never copy the history.
+    Amounts are never added across currencies: totals are reported per
+    currency code.
+    """
+
+    _COLUMNS = (
+        ("amount", np.float64),
+        ("currency", np.int16),
+        ("type", np.int16),
+        ("timestamp", np.int64),
+        ("account", np.int32),
+        ("customer", np.int32),
+    )
+
+    def __init__(self, chunk_size=65536, revenue_rates=None):
+        self.chunk_size = chunk_size
+        self.revenue_rates = dict(DEFAULT_REVENUE_RATES if revenue_rates is None else revenue_rates)
+        self.currencies = _Codes()
+        self.types = _Codes()
+        self.accounts = _Codes()
+        self.customers = _Codes()
+        self._size = 0
+        self._columns = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in self._COLUMNS}
+        self._staged = []
+        self._lock = threading.Lock()
+        # Lifetime value per (customer, currency) over the first _ltv_rows posted rows.
+        self._ltv = np.zeros((0, 0), dtype=np.float64)
+        self._ltv_rows = 0
+        self._ltv_lock = threading.Lock()
+
+    def __len__(self):
+        return self._size + len(self._staged)
+
+    def append(self, amount, currency, transaction_type, timestamp, account_id, customer_id):
+        with self._lock:
+            self._staged.append((
+                amount,
+                self.currencies.code(currency),
+                self.types.code(transaction_type),
+                _epoch(timestamp),
+                self.accounts.code(account_id),
+                self.customers.code(customer_id),
+            ))
+            if len(self._staged) >= self.chunk_size:
+                self._flush()
+
+    def append_transaction(self, transaction, customer_id):
+        self.append(transaction.amount, transaction.currency, transaction.transaction_type,
+                    transaction.timestamp, transaction.account_id, customer_id)
+
+    def extend(self, amounts, currencies, transaction_types, timestamps, account_ids, customer_ids):
+        """Bulk-load already collected columns (e.g. when backfilling history)."""
+        with self._lock:
+            self._flush()
+            n = len(amounts)
+            self._reserve(n)
+            end = self._size + n
+            columns = self._columns
+            columns["amount"][self._size:end] = amounts
+            for name, codes, values in (("currency", self.currencies, currencies),
+                                        ("type", self.types, transaction_types),
+                                        ("account", self.accounts, account_ids),
+                                        ("customer", self.customers, customer_ids)):
+                unique, inverse = np.unique(np.asarray(values), return_inverse=True)
+                mapping = np.array([codes.code(value.item()) for value in unique], dtype=columns[name].dtype)
+                columns[name][self._size:end] = mapping[inverse]
+            timestamps = np.asarray(timestamps)
+            if timestamps.dtype == object:
+                timestamps = np.array([_epoch(ts) for ts in timestamps], dtype=np.int64)
+            columns["timestamp"][self._size:end] = timestamps
+            self._size = end
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._columns["amount"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _flush(self):
+        if not self._staged:
+            return
+        staged, self._staged = self._staged, []
+        self._reserve(len(staged))
+        end = self._size + len(staged)
+        for (name, _), values in zip(self._COLUMNS, zip(*staged)):
+            self._columns[name][self._size:end] = values
+        self._size = end
+
+    def columns(self):
+        """Return read-only views of every column over all posted transactions."""
+        with self._lock:
+            self._flush()
+            size = self._size
+            views = {}
+            for name, column in self._columns.items():
+                view = column[:size]
+                view.flags.writeable = False
+                views[name] = view
+            return views
+
+    def _mask(self, columns, filters):
+        # None means "every row", which lets unfiltered queries skip the copies.
+        filters = filters or {}
+        mask = None
+
+        def narrow(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if filters.get("start") is not None:
+            narrow(columns["timestamp"] >= _epoch(filters["start"]))
+        if filters.get("end") is not None:
+            narrow(columns["timestamp"] <= _epoch(filters["end"]))
+        for key, name, codes in (("transaction_types", "type", self.types),
+                                 ("currencies", "currency", self.currencies),
+                                 ("customer_ids", "customer", self.customers),
+                                 ("account_ids", "account", self.accounts)):
+            if filters.get(key) is not None:
+                wanted = [codes.index[value] for value in filters[key] if value in codes.index]
+                if len(wanted) == 1:
+                    narrow(columns[name] == wanted[0])
+                else:
+                    narrow(np.isin(columns[name], wanted))
+        return mask
+
+    @staticmethod
+    def _select(column, mask):
+        return column if mask is None else column[mask]
+
+    def group_by(self, keys, filters=None, bucket_seconds=86400):
+        """Count and sum amounts grouped by any of customer, account, type,
+        currency and time bucket.
+
+        Totals only stay in one currency when "currency" is one of the keys.
+
+        Args:
+            keys (list): Group-by keys, e.g. ["customer", "type"] or ["bucket"].
+            filters (dict): Optional start, end, transaction_types, currencies,
+                customer_ids and account_ids.
+            bucket_seconds (int): Width of the "bucket" key in seconds.
+
+        Returns:
+            dict: tuple of key values -> {"count": int, "total": float}.
+        """
+        columns = self.columns()
+        mask = self._mask(columns, filters)
+        amounts = self._select(columns["amount"], mask)
+        if not len(amounts):
+            return {}
+
+        key_columns, radices, offsets, decoders = [], [], [], []
+        for key in keys:
+            if key == "bucket":
+                values = self._select(columns["timestamp"], mask) // bucket_seconds
+                offset = int(values.min())
+                values = values - offset
+                decoders.append(lambda value: datetime.fromtimestamp(int(value) * bucket_seconds))
+            else:
+                codes = {"customer": self.customers, "account": self.accounts,
+                         "type": self.types, "currency": self.currencies}[key]
+                values = self._select(columns[key], mask)
+                offset = 0
+                decoders.append(lambda value, codes=codes: codes.values[int(value)])
+            key_columns.append(values)
+            radices.append(int(values.max()) + 1)
+            offsets.append(offset)
+
+        space = 1
+        for radix in radices:
+            space *= radix
+        if space > np.iinfo(np.int64).max:
+            # Too many distinct key combinations for one int64 key: group the key rows directly.
+            groups, inverse = np.unique(np.stack(key_columns, axis=1), axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            counts = np.bincount(inverse, minlength=len(groups))
+            totals = np.bincount(inverse, weights=amounts, minlength=len(groups))
+            parts = list(groups.T)
+        else:
+            # Fold the key columns into one mixed-radix int64 key per row.
+            combined = np.zeros(len(amounts), dtype=np.int64)
+            for values, radix in zip(key_columns, radices):
+                combined *= radix
+                combined += values
+            if space <= max(4 * len(amounts), 1 << 20):
+                counts = np.bincount(combined, minlength=space)
+                totals = np.bincount(combined, weights=amounts, minlength=space)
+                groups = np.flatnonzero(counts)
+                counts, totals = counts[groups], totals[groups]
+            else:
+                groups, inverse = np.unique(combined, return_inverse=True)
+                counts = np.bincount(inverse, minlength=len(groups))
+                totals = np.bincount(inverse, weights=amounts, minlength=len(groups))
+            parts = []
+            remaining = groups
+            for radix in reversed(radices):
+                remaining, part = np.divmod(remaining, radix)
+                parts.append(part)
+            parts.reverse()
+        result = {}
+        for i in range(len(groups)):
+            key = tuple(decode(part[i] + offset) for decode, part, offset in zip(decoders, parts, offsets))
+            result[key] = {"count": int(counts[i]), "total": float(totals[i])}
+        return result
+
+    def summary(self, filters=None):
+        """Transaction count plus totals and averages per currency code.
+
+        Returns:
+            dict: transaction_count, total_amount and average_amount
+                (currency -> amount), and by_type (type -> currency ->
+                {"count": int, "total": float}).
+        """
+        total_amount, average_amount, by_type = {}, {}, {}
+        for (transaction_type, currency), group in self.group_by(["type", "currency"], filters).items():
+            by_type.setdefault(transaction_type, {})[currency] = group
+        count = 0
+        for (currency,), group in self.group_by(["currency"], filters).items():
+            count += group["count"]
+            total_amount[currency] = group["total"]
+            average_amount[currency] = group["total"] / group["count"]
+        return {
+            "transaction_count": count,
+            "total_amount": total_amount,
+            "average_amount": average_amount,
+            "by_type": by_type,
+        }
+
+    def lifetime_values(self):
+        """Revenue-weighted volume for every customer, per currency.
+
+        The result is kept between calls; each call only folds in the rows
+        posted since the previous one.
+
+        Returns:
+            numpy.ndarray: Read-only LTV indexed by [customer code, currency
+                code] (see `customers` and `currencies`).
+        """
+        columns = self.columns()
+        with self._ltv_lock:
+            shape = (len(self.customers.values), len(self.currencies.values))
+            ltv = self._ltv
+            if ltv.shape != shape:
+                ltv = np.zeros(shape, dtype=np.float64)
+                ltv[:self._ltv.shape[0], :self._ltv.shape[1]] = self._ltv
+            start, end = self._ltv_rows, len(columns["amount"])
+            if start < end:
+                if ltv is self._ltv:
+                    ltv = ltv.copy()  # callers may still hold the previous result
+                rates = np.array([self.revenue_rates.get(value, 0.0) for value in self.types.values] or [0.0])
+                revenue = columns["amount"][start:end] * rates[columns["type"][start:end]]
+                cells = columns["customer"][start:end].astype(np.int64) * shape[1] + columns["currency"][start:end]
+                ltv += np.bincount(cells, weights=revenue, minlength=ltv.size).reshape(shape)
+            ltv.flags.writeable = False
+            self._ltv, self._ltv_rows = ltv, end
+            return ltv
+
+    def customer_ltv(self, customer_id):
+        """Lifetime value of one customer.
+
+        Returns:
+            dict: currency -> LTV for each currency the customer earned in.
+        """
+        code = self.customers.index.get(customer_id)
+        if code is None:
+            return {}
+        row = self.lifetime_values()[code]
+        return {self.currencies.values[currency]: float(row[currency]) for currency in np.flatnonzero(row).tolist()}
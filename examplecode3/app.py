@@ -1,7 +1,14 @@
 import gradio as gr
 import json
+import os
+from async_banking import AsyncBankingSystem, OperationTimeoutError
 from banking_core import EnterpriseBankingSystem, Customer, Account, Transaction, CreditCard, Loan
 
+# Queueing limits; defaults suit a single small instance.
+CONCURRENCY_LIMIT = int(os.environ.get("APP_CONCURRENCY_LIMIT", "8"))
+MAX_QUEUE_SIZE = int(os.environ.get("APP_MAX_QUEUE_SIZE", "256"))
+MAX_BATCH_SIZE = int(os.environ.get("APP_MAX_BATCH_SIZE", "64"))
+
 def register_customer_interface(first_name, last_name, dob, address, contact_info, id_documents):
     try:
         id_documents = json.loads(id_documents)
@@ -27,18 +34,23 @@ def create_account_interface(customer_id, account_type, currency, initial_deposi
     except Exception as e:
         return str(e)
 
-def process_deposit_interface(account_id, amount, currency):
+async def process_deposit_interface(account_ids, amounts, currencies):
+    # Batched event: deposits queued together are posted with one process_deposits call,
+    # run off the event loop with a timeout.
     try:
         user_role = "bank_staff"  # Simplified for one user demo
-        source = "ATM"  # Simplified source
-        transaction_data = ""  # Placeholder for additional transaction data
-        transaction = bank_system.process_deposit(account_id, amount, currency, source, transaction_data, user_role)
-        return f"Deposit successful. Transaction ID: {transaction.transaction_id}"
+        results = await async_bank.process_deposits(list(zip(account_ids, amounts, currencies)), user_role)
+    except OperationTimeoutError as e:
+        # The batch keeps running and still posts; a retry now could deposit twice.
+        return [[f"Deposit pending: {e}. Check the balance before retrying."] * len(account_ids)]
     except Exception as e:
-        return str(e)
+        return [[str(e)] * len(account_ids)]
+    return [[f"Deposit successful. Transaction ID: {result.transaction_id}" if isinstance(result, Transaction)
+             else str(result) for result in results]]
 
 # Initialize the banking system
 bank_system = EnterpriseBankingSystem("Demo Bank", "DB001", "encryption_key")
+async_bank = AsyncBankingSystem(bank_system, max_workers=CONCURRENCY_LIMIT)
 
 # Grant permissions to the demo user role
 bank_system._access_control.add_role(
@@ -81,6 +93,8 @@ with gr.Blocks() as demo_app:
 
         deposit_output = gr.Textbox(label="Output")
         deposit_button = gr.Button("Process Deposit")
-        deposit_button.click(process_deposit_interface, inputs=[account_id_input, deposit_amount_input, deposit_currency_input], outputs=deposit_output)
+        deposit_button.click(process_deposit_interface, inputs=[account_id_input, deposit_amount_input, deposit_currency_input], outputs=deposit_output,
+                             batch=True, max_batch_size=MAX_BATCH_SIZE)
 
-demo_app.launch()
\ No newline at end of file
+if __name__ == "__main__":
+    demo_app.queue(default_concurrency_limit=CONCURRENCY_LIMIT, max_size=MAX_QUEUE_SIZE).launch()
\ No newline at end of file
@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+DEFAULT_TIMEOUTS = {
+    "default": 5.0,
+    "get_credit_score": 3.0,
+    "process_loan_application": 10.0,
+    "generate_compliance_report": 600.0,
+}
+
+
+class OperationTimeoutError(TimeoutError):
+    """Raised when an operation exceeds its timeout.
+
+    `pending` is the still-running operation. Banking operations are atomic,
+    so it either completes in full or fails without changing state; callers
+    that need the final outcome can await it.
+    """
+
+    def __init__(self, operation, timeout, pending):
+        super().__init__(f"{operation} did not finish within {timeout}s")
+        self.operation = operation
+        self.pending = pending
+
+
+class AsyncBankingSystem:
+    """Asyncio front for an EnterpriseBankingSystem.
+
+    External lookups (credit scores) are awaited natively through the async
+    bureau client. Postings and other blocking work run on a bounded thread
+    pool so they never stall the event loop. O(1) reads such as dashboards
+    are served inline. Every operation has a timeout. A timeout or a
+    cancelled caller never interrupts a posting halfway: the work is
+    shielded and runs to completion (or fails atomically) in the pool.
+    """
+
+    def __init__(self, bank, credit_bureau=None, max_workers=8, timeouts=None):
+        self.bank = bank
+        self.credit_bureau = credit_bureau
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="banking")
+
+    def _timeout(self, operation):
+        return self.timeouts.get(operation, self.timeouts["default"])
+
+    async def _await(self, operation, awaitable):
+        pending = asyncio.ensure_future(awaitable)
+        timeout = self._timeout(operation)
+        try:
+            return await asyncio.wait_for(asyncio.shield(pending), timeout)
+        except asyncio.TimeoutError:
+            raise OperationTimeoutError(operation, timeout, pending) from None
+
+    async def _run(self, operation, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        method = getattr(self.bank, operation)
+        return await self._await(operation, loop.run_in_executor(self._executor, partial(method, *args, **kwargs)))
+
+    async def process_deposit(self, account_id, amount, currency, source, transaction_data, user_role=None):
+        return await self._run("process_deposit", account_id, amount, currency, source, transaction_data, user_role)
+
+    async def process_deposits(self, deposits, user_role=None):
+        return await self._run("process_deposits", deposits, user_role)
+
+    async def process_withdrawal(self, account_id, amount, currency, destination, transaction_data, user_role=None):
+        return await self._run("process_withdrawal", account_id, amount, currency, destination,
+                               transaction_data, user_role)
+
+    async def process_transfer(self, source_account_id, destination_account_id, amount, currency,
+                               transaction_data, user_role=None):
+        return await self._run("process_transfer", source_account_id, destination_account_id, amount,
+                               currency, transaction_data, user_role)
+
+    async def process_card_transaction(self, card_id, merchant_id, amount, currency, transaction_data,
+                                       user_role=None):
+        return await self._run("process_card_transaction", card_id, merchant_id, amount, currency,
+                               transaction_data, user_role)
+
+    async def process_loan_payment(self, loan_id, amount, source_account_id, user_role=None):
+        return await self._run("process_loan_payment", loan_id, amount, source_account_id, user_role)
+
+    async def generate_compliance_report(self, report_type, date_range, user_role=None, **options):
+        return await self._run("generate_compliance_report", report_type, date_range, user_role, **options)
+
+    async def get_credit_score(self, customer_id, user_role=None):
+        if not self.bank._access_control.check_permission(user_role, "get_credit_score"):
+            raise PermissionError("User does not have permission to request credit scores.")
+        if customer_id not in self.bank._customers:
+            raise Exception("Customer not found")
+        if self.credit_bureau is None:
+            raise Exception("No credit bureau configured")
+        return await self._await("get_credit_score", self.credit_bureau.get_score(customer_id))
+
+    async def process_loan_application(self, customer_id, loan_type, amount, currency, term_months,
+                                       user_role=None, applicant=None, disbursement_account_id=None):
+        applicant = dict(applicant or {})
+        if applicant.get("credit_score") is None:
+            applicant["credit_score"] = await self.get_credit_score(customer_id, user_role)
+        return await self._run("process_loan_application", customer_id, loan_type, amount, currency,
+                               term_months, user_role, applicant, disbursement_account_id)
+
+    async def get_exchange_rate(self, from_currency, to_currency):
+        fx_service = self.bank._fx_service
+        if fx_service is not None and not fx_service.is_fresh():
+            # Only an expired snapshot has to wait for the provider.
+            return await self._run("get_exchange_rate", from_currency, to_currency)
+        return self.bank.get_exchange_rate(from_currency, to_currency)
+
+    async def get_customer_dashboard(self, customer_id, user_role=None):
+        return self.bank.get_customer_dashboard(customer_id, user_role)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
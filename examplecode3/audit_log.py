@@ -0,0 +1,354 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+# seq, timestamp (ns), user symbol, action symbol, detail (utf-8, padded), chain hash
+_RECORD = struct.Struct("<QqII96s32s")
+_BODY_SIZE = _RECORD.size - 32
+_GENESIS = bytes(32)
+_SEGMENT_NAME = "segment-{:06d}.log"
+_SYMBOLS_NAME = "symbols.jsonl"
+
+
+class AuditIntegrityError(Exception):
+    pass
+
+
+def _to_ns(timestamp):
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp() * 1e9)
+    return int(timestamp * 1e9)
+
+
+def _entry(seq, ts_ns, user, action, detail):
+    return {
+        "seq": seq,
+        "timestamp": datetime.fromtimestamp(ts_ns / 1e9),
+        "user": user,
+        "action": action,
+        "detail": detail,
+    }
+
+
+class InMemoryAuditLog:
+    """Audit log kept in process memory, with the same API as AuditLog."""
+
+    def __init__(self):
+        self._entries = []
+        self._by_user = {}
+        self._by_action = {}
+        self._timestamps = array("q")
+
+    def append(self, user, action, detail=""):
+        seq = len(self._entries)
+        ts_ns = max(time.time_ns(), self._timestamps[-1] if self._timestamps else 0)
+        self._entries.append(_entry(seq, ts_ns, user, action, detail))
+        self._timestamps.append(ts_ns)
+        self._by_user.setdefault(user, array("Q")).append(seq)
+        self._by_action.setdefault(action, array("Q")).append(seq)
+        return seq
+
+    def sync(self, seq=None):
+        pass
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def query(self, user=None, action=None, start=None, end=None, limit=None):
+        seqs = _select(self._timestamps, self._by_user, self._by_action, user, action, start, end)
+        result = []
+        for seq in seqs:
+            entry = self._entries[seq]
+            if action is not None and entry["action"] != action:
+                continue
+            if user is not None and entry["user"] != user:
+                continue
+            result.append(entry)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+
+def _select(timestamps, by_user, by_action, user, action, start, end, durable=None):
+    # Narrow to a seq range with the timestamp column, then walk the shortest
+    # matching posting list inside that range.
+    durable = len(timestamps) if durable is None else durable
+    lo = 0 if start is None else bisect_left(timestamps, _to_ns(start), 0, durable)
+    hi = durable if end is None else bisect_right(timestamps, _to_ns(end), 0, durable)
+    postings = []
+    if user is not None:
+        postings.append(by_user.get(user, ()))
+    if action is not None:
+        postings.append(by_action.get(action, ()))
+    if not postings:
+        return range(lo, hi)
+    shortest = min(postings, key=len)
+    return shortest[bisect_left(shortest, lo):bisect_left(shortest, hi)]
+
+
+class AuditLog:
+    """Append-only, hash-chained audit log stored in fixed-size segment files.
+
+    Every record is a fixed-width struct whose last field is
+    sha256(previous hash + record body), so altering or removing any record
+    breaks the chain from that point on. `append` only packs the record and
+    hands it to a background writer, which writes and fsyncs whole batches
+    (group commit); callers that need durability call `sync`. Per-user and
+    per-action posting lists plus a timestamp column stay in memory and are
+    rebuilt from the segments on open; filtered reads decode only the matching
+    records straight out of mmapped segments.
+    """
+
+    def __init__(self, directory, records_per_segment=1_000_000, commit_interval=0.002,
+                 max_batch=4096):
+        self.directory = directory
+        self.records_per_segment = records_per_segment
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        os.makedirs(directory, exist_ok=True)
+
+        self._symbols = []
+        self._symbol_ids = {}
+        self._pending_symbols = []
+        self._by_user = {}
+        self._by_action = {}
+        self._timestamps = array("q")
+        self._last_hash = _GENESIS
+        self._next_seq = 0
+        self._durable = 0
+        self._maps = {}  # sealed segment number -> mmap
+
+        self._load()
+
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = bytearray()
+        self._pending_count = 0
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="audit-log-writer", daemon=True)
+        self._writer.start()
+
+    # -- recovery -------------------------------------------------------------
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, _SEGMENT_NAME.format(number))
+
+    def _load(self):
+        symbols_path = os.path.join(self.directory, _SYMBOLS_NAME)
+        if os.path.exists(symbols_path):
+            with open(symbols_path, encoding="utf-8") as handle:
+                for line in handle:
+                    if line.endswith("\n"):
+                        self._intern_loaded(json.loads(line))
+        number = 0
+        while os.path.exists(self._segment_path(number)):
+            path = self._segment_path(number)
+            size = os.path.getsize(path)
+            whole = size - size % _RECORD.size
+            if whole != size:  # torn write at the tail of the last batch
+                os.truncate(path, whole)
+            if whole:
+                with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    for offset in range(0, whole, _RECORD.size):
+                        seq, ts_ns, user, action, _, digest = _RECORD.unpack_from(view, offset)
+                        self._index(seq, ts_ns, user, action)
+                        self._last_hash = digest
+            number += 1
+        self._next_seq = self._durable = len(self._timestamps)
+
+    def _intern_loaded(self, name):
+        self._symbol_ids[name] = len(self._symbols)
+        self._symbols.append(name)
+
+    def _index(self, seq, ts_ns, user, action):
+        self._timestamps.append(ts_ns)
+        self._by_user.setdefault(self._symbols[user], array("Q")).append(seq)
+        self._by_action.setdefault(self._symbols[action], array("Q")).append(seq)
+
+    # -- writing --------------------------------------------------------------
+
+    def _intern(self, name):
+        symbol = self._symbol_ids.get(name)
+        if symbol is None:
+            symbol = len(self._symbols)
+            self._symbol_ids[name] = symbol
+            self._symbols.append(name)
+            self._pending_symbols.append(name)
+        return symbol
+
+    def append(self, user, action, detail=""):
+        """Queue one audit record and return its sequence number.
+
+        The record is durable once the writer's next group commit completes;
+        call `sync(seq)` to wait for that.
+        """
+        user, action = str(user), str(action)
+        detail_bytes = str(detail).encode("utf-8")[:96]
+        with self._lock:
+            if self._closed:
+                raise ValueError("audit log is closed")
+            seq = self._next_seq
+            ts_ns = max(time.time_ns(), self._timestamps[-1] if self._timestamps else 0)
+            user_id, action_id = self._intern(user), self._intern(action)
+            body = _RECORD.pack(seq, ts_ns, user_id, action_id, detail_bytes, _GENESIS)[:_BODY_SIZE]
+            self._last_hash = hashlib.sha256(self._last_hash + body).digest()
+            self._pending += body
+            self._pending += self._last_hash
+            self._pending_count += 1
+            self._next_seq = seq + 1
+            self._index(seq, ts_ns, user_id, action_id)
+            if self._pending_count == 1 or self._pending_count >= self.max_batch:
+                self._wakeup.notify()
+        return seq
+
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending_count and not self._closed:
+                    self._wakeup.wait()
+                if self._pending_count < self.max_batch and not self._closed:
+                    self._wakeup.wait(self.commit_interval)  # let the group fill up
+                if not self._pending_count:
+                    return
+                batch, self._pending = self._pending, bytearray()
+                first = self._durable
+                count, self._pending_count = self._pending_count, 0
+                symbols, self._pending_symbols = self._pending_symbols, []
+            self._write_batch(first, count, batch, symbols)
+            with self._lock:
+                self._durable = first + count
+                self._flushed.notify_all()
+
+    def _write_batch(self, first, count, batch, symbols):
+        if symbols:
+            with open(os.path.join(self.directory, _SYMBOLS_NAME), "a", encoding="utf-8") as handle:
+                handle.writelines(json.dumps(name) + "\n" for name in symbols)
+                handle.flush()
+                os.fsync(handle.fileno())
+        view = memoryview(batch)
+        seq, written = first, 0
+        while written < count:
+            number, slot = divmod(seq, self.records_per_segment)
+            take = min(count - written, self.records_per_segment - slot)
+            fd = os.open(self._segment_path(number), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, view[written * _RECORD.size:(written + take) * _RECORD.size])
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            seq += take
+            written += take
+
+    def sync(self, seq=None):
+        """Block until `seq` (default: everything appended so far) is on disk."""
+        with self._lock:
+            target = self._next_seq if seq is None else seq + 1
+            while self._durable < target:
+                self._wakeup.notify()
+                self._flushed.wait()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        self._writer.join()
+        for view in self._maps.values():
+            view.close()
+        self._maps.clear()
+
+    def __len__(self):
+        return self._next_seq
+
+    # -- reading --------------------------------------------------------------
+
+    def _view(self, number, durable):
+        view = self._maps.get(number)
+        if view is not None:
+            return view
+        with open(self._segment_path(number), "rb") as handle:
+            view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if (number + 1) * self.records_per_segment <= durable:
+            self._maps[number] = view  # sealed segments never change again
+        return view
+
+    def _read(self, seq, views, durable):
+        number, slot = divmod(seq, self.records_per_segment)
+        view = views.get(number)
+        if view is None:
+            view = views[number] = self._view(number, durable)
+        return _RECORD.unpack_from(view, slot * _RECORD.size)
+
+    def query(self, user=None, action=None, start=None, end=None, limit=None):
+        """Return durable records matching every given filter, oldest first.
+
+        Args:
+            user (str): Only records written by this user.
+            action (str): Only records of this action.
+            start (datetime | float): Inclusive lower bound on the timestamp.
+            end (datetime | float): Inclusive upper bound on the timestamp.
+            limit (int): Stop after this many records.
+
+        Returns:
+            list: Dicts with seq, timestamp, user, action and detail.
+        """
+        with self._lock:
+            durable = self._durable
+            seqs = _select(self._timestamps, self._by_user, self._by_action,
+                           user, action, start, end, durable)
+        symbols = self._symbols
+        views = {}
+        result = []
+        for seq in seqs:
+            _, ts_ns, user_id, action_id, detail, _ = self._read(seq, views, durable)
+            if action is not None and symbols[action_id] != action:
+                continue
+            if user is not None and symbols[user_id] != user:
+                continue
+            result.append(_entry(seq, ts_ns, symbols[user_id], symbols[action_id],
+                                 detail.rstrip(b"\0").decode("utf-8", "replace")))
+            if limit is not None and len(result) >= limit:
+                break
+        for number, view in views.items():
+            if self._maps.get(number) is not view:
+                view.close()
+        return result
+
+    def verify(self):
+        """Recompute the hash chain over every durable record.
+
+        Raises:
+            AuditIntegrityError: At the first record whose hash does not match.
+        """
+        self.sync()
+        previous = _GENESIS
+        views = {}
+        durable = self._durable
+        try:
+            for seq in range(durable):
+                number, slot = divmod(seq, self.records_per_segment)
+                if number not in views:
+                    views[number] = self._view(number, durable)
+                view = views[number]
+                offset = slot * _RECORD.size
+                body = view[offset:offset + _BODY_SIZE]
+                previous = hashlib.sha256(previous + body).digest()
+                if previous != view[offset + _BODY_SIZE:offset + _RECORD.size]:
+                    raise AuditIntegrityError(f"audit chain broken at record {seq}")
+        finally:
+            for number, view in views.items():
+                if self._maps.get(number) is not view:
+                    view.close()
+        return True
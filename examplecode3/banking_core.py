@@ -1,5 +1,45 @@
-from datetime import datetime
+from datetime import date, datetime
+from itertools import islice
+import base64
+import copy
+import math
 import random
+import threading
+
+from account_table import CURRENCY_EXPONENTS, AccountTable
+from aml_monitor import TransferGraph
+from analytics_store import ColumnarTransactionStore
+from audit_log import AuditLog, InMemoryAuditLog
+from compliance_reports import stream_report
+from customer_index import CustomerIndex
+from dashboards import DashboardStore
+from end_of_day import run_end_of_day
+from rewards import RewardsEngine
+from envelope_crypto import EnvelopeEncryption
+from fx_service import CurrencyNotSupportedError
+from loans import LoanBook, score_applications
+from snapshot import LazyMapping, SnapshotReader, write_snapshot
+from transaction_engine import AccountNotFoundError, TransactionEngine
+
+
+# Customer fields that only ever leave memory encrypted, bound to the institution and customer id.
+SENSITIVE_CUSTOMER_FIELDS = ("dob", "contact_info", "id_documents")
+
+
+def _new_id(prefix, in_use=()):
+    # Ten random digits; an id already in `in_use` is drawn again rather than replacing its holder.
+    while True:
+        new_id = f"{prefix}{random.randrange(10 ** 10):010d}"
+        if new_id not in in_use:
+            return new_id
+
+
+def _round_to_minor_units(amount, currency, up=False):
+    # Postings are rounded once, here, so the Transaction records exactly what the balance moved by.
+    scale = 10 ** CURRENCY_EXPONENTS.get(currency, 2)
+    scaled = amount * scale
+    return (math.ceil(scaled - 1e-6) if up else round(scaled)) / scale
+
 
 class Customer:
     def __init__(self, customer_id, first_name, last_name, dob, address, contact_info, 
@@ -17,11 +57,19 @@ class Customer:
         self.loans = []
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Call callback(customer, field, old_value) after every profile update."""
+        self._listeners.append(callback)
 
     def update_profile(self, field, value):
         if hasattr(self, field):
+            old_value = getattr(self, field)
             setattr(self, field, value)
             self.updated_at = datetime.now()
+            for callback in self._listeners:
+                callback(self, field, old_value)
             return True
         return False
 
@@ -52,26 +100,35 @@ class Account:
 
 
 class Transaction:
-    def __init__(self, transaction_id, account_id, amount, currency, transaction_type, timestamp=None):
+    def __init__(self, transaction_id, account_id, amount, currency, transaction_type, timestamp=None,
+                 counterparty_account_id=None, business_date=None):
         self.transaction_id = transaction_id
         self.account_id = account_id
         self.amount = amount
         self.currency = currency
         self.transaction_type = transaction_type
         self.timestamp = timestamp or datetime.now()
+        self.counterparty_account_id = counterparty_account_id
+        self.business_date = business_date  # the day a batch posting belongs to, when not the posting day
 
 
 class CreditCard:
-    def __init__(self, card_id, customer_id, card_type, credit_limit, balance=0.0):
+    def __init__(self, card_id, customer_id, card_type, credit_limit, balance=0.0, currency="USD",
+                 cycle_points=0.0, lifetime_points=0.0):
         self.card_id = card_id
         self.customer_id = customer_id
         self.card_type = card_type
         self.credit_limit = credit_limit
         self.balance = balance
+        self.currency = currency
+        # Rewards totals as of the last charge, so they survive a restart.
+        self.cycle_points = cycle_points
+        self.lifetime_points = lifetime_points
 
 
 class Loan:
-    def __init__(self, loan_id, customer_id, loan_type, amount, currency, term_months, status="pending"):
+    def __init__(self, loan_id, customer_id, loan_type, amount, currency, term_months, status="pending",
+                 interest_rate=None, repaid=0.0):
         self.loan_id = loan_id
         self.customer_id = customer_id
         self.loan_type = loan_type
@@ -79,6 +136,8 @@ class Loan:
         self.currency = currency
         self.term_months = term_months
         self.status = status
+        self.interest_rate = interest_rate
+        self.repaid = repaid  # total paid so far, in the loan currency
 
 
 class AccessControl:
@@ -99,66 +158,794 @@ class AccessControl:
 
 
 class EnterpriseBankingSystem:
-    def __init__(self, institution_name, institution_id, encryption_key):
+    def __init__(self, institution_name, institution_id, encryption_key, audit_dir=None, fx_service=None,
+                 storage=None, compact_accounts=False):
         self.institution_name = institution_name
         self.institution_id = institution_id
         self._encryption_key = encryption_key
         self._customers = {}  # customer_id -> Customer
-        self._accounts = {}   # account_id -> Account
+        # account_id -> Account, or an AccountTable of typed arrays for very large books
+        self._accounts = AccountTable() if compact_accounts else {}
         self._transactions = []
         self._credit_cards = {}  # card_id -> CreditCard
         self._loans = {}  # loan_id -> Loan
-        self._audit_log = []
+        self._audit_log = AuditLog(audit_dir) if audit_dir else InMemoryAuditLog()
         self._access_control = AccessControl()
+        self._aml_monitor = TransferGraph()
+        self._aml_lock = threading.Lock()
+        self._engine = TransactionEngine(self._accounts)
+        self._fx_service = fx_service  # ExchangeRateService, or None for single-currency operation
+        self._crypto = None  # EnvelopeEncryption, created on first use (key derivation is slow)
+        self._crypto_lock = threading.Lock()
+        self._wrapped_keys = {}  # tenant -> wrapped data key, persisted before the key is first used
+        self._analytics = ColumnarTransactionStore()
+        self._dashboards = DashboardStore()
+        self._rewards = RewardsEngine()
+        self._card_lock = threading.Lock()
+        self._loan_book = LoanBook()
+        self._loan_lock = threading.Lock()
+        self._customer_index = CustomerIndex()
+        self._onboarding_lock = threading.Lock()
+        self._indexed = threading.Event()  # cleared while a restored bank is still indexing customers
+        self._indexed.set()
+        self._storage = storage  # StorageBackend written through on every change, or None
+        if storage is not None:
+            self._restore(storage)
+
+    def _restore(self, storage):
+        state = storage.load()
+        self._wrapped_keys = dict(state.get("wrapped_keys", {}))
+        for record in self._opened_customers(state["customers"]):
+            created_at = datetime.fromtimestamp(record.pop("created_at"))
+            customer = Customer(**record)
+            customer.created_at = customer.updated_at = created_at
+            self._customers[customer.customer_id] = customer
+            self._index_customer(customer)
+            self._dashboards.register_customer(customer.customer_id)
+        for record in state["accounts"]:
+            account = Account(record["account_id"], record["customer_id"], record["account_type"],
+                              record["currency"], record["balance"])
+            account.created_at = datetime.fromtimestamp(record["created_at"])
+            self._accounts[account.account_id] = account
+            self._customers[account.customer_id].accounts.append(account.account_id)
+            self._dashboards.update_account(account.customer_id, account.account_id, account.currency,
+                                            account.balance)
+        for record in state["credit_cards"]:
+            card = CreditCard(**record)
+            self._credit_cards[card.card_id] = card
+            self._customers[card.customer_id].credit_cards.append(card.card_id)
+            self._rewards.register_card(card.card_id, card.card_type)
+            self._rewards.restore(card.card_id, card.cycle_points, card.lifetime_points)
+            self._dashboards.update_credit_card(card.customer_id, card.card_id, card.credit_limit, card.balance)
+        for record in state["loans"]:
+            loan = Loan(**record)
+            self._loans[loan.loan_id] = loan
+            self._customers[loan.customer_id].loans.append(loan.loan_id)
+            if loan.status == "approved":
+                self._book_loan(loan.loan_id, loan.amount, loan.interest_rate, loan.term_months, loan.repaid)
+                self._dashboards.update_loan(loan.customer_id, loan.loan_id,
+                                             self._loan_book.outstanding(loan.loan_id), loan.status)
+        self._restore_transactions(state.get("transactions", ()))
+
+    def _restore_transactions(self, records):
+        # The ledger feeds analytics, compliance reports, lifetime value and AML, so it is replayed too.
+        transactions, customer_ids = [], []
+        for record in records:
+            transactions.append(Transaction(record["transaction_id"], record["account_id"], record["amount"],
+                                            record["currency"], record["transaction_type"],
+                                            datetime.fromtimestamp(record["timestamp"]),
+                                            record["counterparty_account_id"],
+                                            date.fromisoformat(record["business_date"])
+                                            if record.get("business_date") else None))
+            customer_ids.append(record["customer_id"])
+        if not transactions:
+            return
+        self._transactions.extend(transactions)
+        self._analytics.extend([t.amount for t in transactions], [t.currency for t in transactions],
+                               [t.transaction_type for t in transactions], [t.timestamp for t in transactions],
+                               [t.account_id for t in transactions], customer_ids)
+        for transaction in transactions:
+            if transaction.transaction_type == "transfer":
+                self._aml_monitor.record_transfer(transaction.account_id, transaction.counterparty_account_id,
+                                                  transaction.amount, transaction.timestamp)
+
+    def _book_loan(self, loan_id, amount, interest_rate, term_months, repaid):
+        # Payments settle installments greedily, so replaying the total repaid restores the schedule position.
+        self._loan_book.add(loan_id, amount, interest_rate, term_months)
+        if repaid:
+            self._loan_book.apply_payment(loan_id, repaid)
+
+    def flush(self):
+        """Write any postings the storage backend has buffered."""
+        if self._storage is not None:
+            self._storage.flush()
+
+    def close(self):
+        """Flush and close the storage backend and the audit log."""
+        if self._storage is not None:
+            self._storage.close()
+        self._audit_log.close()
+
+    def save_snapshot(self, path):
+        """Write customers, accounts, cards, loans and roles to a binary snapshot.
+
+        Card charges, loan changes and postings wait while the snapshot is
+        written, so it holds committed balances only and money in flight is
+        never counted twice or lost.
+        """
+        customers = {customer.customer_id: customer for customer in self._sealed_customers(self._customers.values())}
+        # Same order as the online paths: card and loan locks before engine stripes.
+        with self._card_lock, self._loan_lock, self._engine.paused():
+            return write_snapshot(path, {
+                "customers": customers,
+                "accounts": self._accounts,
+                "credit_cards": self._credit_cards,
+                "loans": self._loans,
+            }, metadata={"institution_name": self.institution_name, "institution_id": self.institution_id,
+                         "created_at": datetime.now().isoformat(),
+                         "wrapped_keys": {tenant: base64.b64encode(wrapped).decode("ascii")
+                                          for tenant, wrapped in self._wrapped_keys.items()}},
+                access_control=self._access_control.roles)
+
+    @classmethod
+    def from_snapshot(cls, path, encryption_key, **kwargs):
+        """Restart from a snapshot without loading it.
+
+        The snapshot is memory-mapped and entities are built on first access,
+        so the bank serves reads immediately whatever the snapshot's size.
+        Materializing any entity also materializes its customer, which seeds
+        that customer's dashboard from the snapshot. Restored customers are
+        indexed for duplicate detection in the background; registrations and
+        duplicate searches wait until that is done.
+        """
+        reader = SnapshotReader(path)
+        bank = cls(reader.metadata["institution_name"], reader.metadata["institution_id"], encryption_key,
+                   **kwargs)
+        bank._access_control.roles = dict(reader.access_control)
+        bank._wrapped_keys = {tenant: base64.b64decode(wrapped)
+                              for tenant, wrapped in reader.metadata.get("wrapped_keys", {}).items()}
+        sections = reader.sections
+
+        def customer(row):
+            created_at = row.pop("created_at")
+            # Decrypted on read: only customers that are touched pay for it.
+            row = bank._envelope().decrypt_fields(bank.institution_id, row, SENSITIVE_CUSTOMER_FIELDS,
+                                                  row["customer_id"])
+            customer = Customer(**row)
+            customer.created_at = customer.updated_at = created_at
+            customer.add_listener(bank._customer_index.on_profile_update)
+            customer_id = customer.customer_id
+            bank._dashboards.register_customer(customer_id)
+            for record in map(sections["accounts"].row, sections["accounts"].rows_for_customer(customer_id)):
+                customer.accounts.append(record["account_id"])
+                bank._dashboards.update_account(customer_id, record["account_id"], record["currency"],
+                                                record["balance"])
+            for record in map(sections["credit_cards"].row, sections["credit_cards"].rows_for_customer(customer_id)):
+                customer.credit_cards.append(record["card_id"])
+                bank._dashboards.update_credit_card(customer_id, record["card_id"], record["credit_limit"],
+                                                    record["balance"])
+            for record in map(sections["loans"].row, sections["loans"].rows_for_customer(customer_id)):
+                loan_id = record["loan_id"]
+                customer.loans.append(loan_id)
+                if record["status"] == "approved":
+                    bank._book_loan(loan_id, record["amount"], record["interest_rate"], record["term_months"],
+                                    record.get("repaid", 0.0))
+                    bank._dashboards.update_loan(customer_id, loan_id, bank._loan_book.outstanding(loan_id),
+                                                 record["status"])
+                else:
+                    bank._dashboards.update_loan(customer_id, loan_id, record["amount"], record["status"])
+            return customer
+
+        # Entities materialize their customer first, so its dashboard is seeded before any posting.
+        def account(row):
+            bank._customers.load(row["customer_id"])
+            created_at = row.pop("created_at")
+            account = Account(**row)
+            account.created_at = created_at
+            return account
+
+        def credit_card(row):
+            bank._customers.load(row["customer_id"])
+            bank._rewards.register_card(row["card_id"], row["card_type"])
+            card = CreditCard(**row)
+            bank._rewards.restore(card.card_id, card.cycle_points, card.lifetime_points)
+            return card
+
+        def loan(row):
+            bank._customers.load(row["customer_id"])
+            return Loan(**row)
+
+        bank._customers = LazyMapping(sections["customers"], customer)
+        bank._accounts = LazyMapping(sections["accounts"], account)
+        bank._credit_cards = LazyMapping(sections["credit_cards"], credit_card)
+        bank._loans = LazyMapping(sections["loans"], loan)
+        bank._engine = TransactionEngine(bank._accounts)
+
+        def index_customers():
+            index, section = bank._customer_index, sections["customers"]
+            try:
+                for record in bank._opened_customers(map(section.row, range(section.count))):
+                    # Customers updated since the restart were already re-indexed from their live profile.
+                    index.add(record["customer_id"], record["first_name"], record["last_name"], record["dob"],
+                              record["contact_info"], record["id_documents"], replace=False)
+            finally:
+                bank._indexed.set()
+
+        # Reads are served straight away; registration waits until restored customers are indexed.
+        bank._indexed.clear()
+        threading.Thread(target=index_customers, daemon=True).start()
+        return bank
 
     def register_customer(self, customer_data, user_role):
         if not self._access_control.check_permission(user_role, "register_customer"):
             raise PermissionError("User does not have permission to register customers.")
-        new_customer_id = f"CUST{random.randint(1000, 9999)}"
-        new_customer = Customer(customer_id=new_customer_id, **customer_data)
+        new_customer = Customer(customer_id=None, **customer_data)
         if new_customer.verify_kyc():
-            self._customers[new_customer_id] = new_customer
+            self._indexed.wait()
+            with self._onboarding_lock:
+                holders = self._customer_index.document_matches(new_customer.id_documents)
+                if holders:
+                    # The holder is recorded for investigators but never returned to the caller.
+                    self._audit_log.append(user_role, "register_customer_rejected",
+                                           f"identity document held by {holders[0]}")
+                    raise Exception("KYC validation failed")
+                new_customer_id = new_customer.customer_id = _new_id("CUST", self._customers)
+                self._customers[new_customer_id] = new_customer
+                self._index_customer(new_customer)
+            if self._storage is not None:
+                self._storage.save_customer(self._sealed_customers([new_customer])[0])
+            self._dashboards.register_customer(new_customer_id)
+            self._audit_log.append(user_role, "register_customer", new_customer_id)
             return new_customer_id
         else:
             raise Exception("KYC validation failed")
 
+    def _sealed_customers(self, customers):
+        """Copies of customers with their sensitive fields encrypted, for storage and snapshots."""
+        customers = list(customers)
+        if not customers:
+            return []
+        sealed = self._envelope().encrypt_many(
+            self.institution_id, [{field: getattr(customer, field) for field in SENSITIVE_CUSTOMER_FIELDS}
+                                  for customer in customers],
+            SENSITIVE_CUSTOMER_FIELDS, [customer.customer_id for customer in customers])
+        copies = []
+        for customer, fields in zip(customers, sealed):
+            stored = copy.copy(customer)
+            stored.__dict__.update(fields)
+            copies.append(stored)
+        return copies
+
+    def _opened_customers(self, records, batch_size=1000):
+        """Stored customer records with their sensitive fields decrypted, one key lookup per batch."""
+        records = iter(records)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return
+            yield from self._envelope().decrypt_many(self.institution_id, batch, SENSITIVE_CUSTOMER_FIELDS,
+                                                     [record["customer_id"] for record in batch])
+
+    def _index_customer(self, customer):
+        self._customer_index.add_customer(customer)
+        customer.add_listener(self._customer_index.on_profile_update)
+
+    def find_duplicate_customers(self, customer_data, user_role=None):
+        """Existing customers matching an applicant by document, contact or name and date of birth."""
+        if not self._access_control.check_permission(user_role, "register_customer"):
+            raise PermissionError("User does not have permission to register customers.")
+        self._indexed.wait()
+        return self._customer_index.find_duplicates(
+            customer_data.get("first_name"), customer_data.get("last_name"), customer_data.get("dob"),
+            customer_data.get("contact_info"), customer_data.get("id_documents"))
+
     def create_account(self, customer_id, account_type, currency, initial_deposit=0, user_role=None):
         if not self._access_control.check_permission(user_role, "create_account"):
             raise PermissionError("User does not have permission to create accounts.")
         if customer_id not in self._customers:
             raise Exception("Customer not found")
-        new_account_id = f"ACC{random.randint(1000, 9999)}"
-        new_account = Account(account_id=new_account_id, customer_id=customer_id, 
-                             account_type=account_type, currency=currency, balance=initial_deposit)
-        self._accounts[new_account_id] = new_account
+        with self._onboarding_lock:
+            new_account_id = _new_id("ACC", self._accounts)
+            new_account = Account(account_id=new_account_id, customer_id=customer_id,
+                                  account_type=account_type, currency=currency, balance=initial_deposit)
+            self._accounts[new_account_id] = new_account
         self._customers[customer_id].accounts.append(new_account_id)
+        if self._storage is not None:
+            self._storage.save_account(new_account)
+        self._dashboards.update_account(customer_id, new_account_id, currency, new_account.balance)
+        self._audit_log.append(user_role, "create_account", new_account_id)
         return new_account_id
 
+    def _get_account(self, account_id):
+        account = self._accounts.get(account_id)
+        if not account:
+            raise AccountNotFoundError("Account not found")
+        return account
+
+    @staticmethod
+    def _activity(transaction):
+        return {
+            "transaction_id": transaction.transaction_id,
+            "transaction_type": transaction.transaction_type,
+            "account_id": transaction.account_id,
+            "amount": transaction.amount,
+            "currency": transaction.currency,
+            "timestamp": transaction.timestamp,
+        }
+
+    def _publish_balances(self, transaction):
+        # Runs inside the engine's locks, so dashboards see postings in commit order, and the ledger row is
+        # queued with the balances it moved so storage never holds one without the other.
+        activity = self._activity(transaction)
+
+        def publish(accounts):
+            if self._storage is not None:
+                customer_id = self._accounts[transaction.account_id].customer_id
+                self._storage.save_balances(accounts, [(transaction, customer_id)])
+            for account in accounts:
+                self._dashboards.update_account(account.customer_id, account.account_id,
+                                                account.currency, account.balance, activity)
+        return publish
+
+    def _record_transaction(self, transaction, user_role, customer_id=None):
+        self._transactions.append(transaction)
+        if customer_id is None:
+            customer_id = self._accounts[transaction.account_id].customer_id
+        # Storage already has the row: postings queue it with their balances, card charges with the card.
+        self._analytics.append_transaction(transaction, customer_id)
+        self._audit_log.append(user_role, f"process_{transaction.transaction_type}",
+                               f"{transaction.transaction_id} {transaction.account_id} "
+                               f"{transaction.amount} {transaction.currency}")
+        return transaction
+
+    def _publish_batch(self, accounts, transactions=(), activity=True):
+        # `transactions` are stored with the balances, as with _publish_balances, and with `activity` also
+        # show up in their accounts' recent activity.
+        if self._storage is not None:
+            self._storage.save_balances(accounts, [(transaction, self._accounts[transaction.account_id].customer_id)
+                                                   for transaction in transactions])
+        activities = {}
+        for transaction in transactions if activity else ():
+            activities.setdefault(transaction.account_id, []).append(self._activity(transaction))
+        for account in accounts:
+            for activity in activities.get(account.account_id) or [None]:
+                self._dashboards.update_account(account.customer_id, account.account_id, account.currency,
+                                                account.balance, activity)
+
+    def _record_postings(self, postings, timestamp, user_role, action, business_date=None):
+        # Bulk form of _record_transaction for batch jobs: one analytics load and one audit entry per batch.
+        # The caller hands the transactions to _publish_batch, which stores them with the balances.
+        transactions, customer_ids = [], []
+        for account_id, currency, transaction_type, amount in postings:
+            transactions.append(Transaction(_new_id("TRANS"), account_id, amount, currency,
+                                            transaction_type, timestamp, business_date=business_date))
+            customer_ids.append(self._accounts[account_id].customer_id)
+        if not transactions:
+            return transactions
+        self._transactions.extend(transactions)
+        self._analytics.extend([t.amount for t in transactions], [t.currency for t in transactions],
+                               [t.transaction_type for t in transactions], [timestamp] * len(transactions),
+                               [t.account_id for t in transactions], customer_ids)
+        self._audit_log.append(user_role, action,
+                               f"{len(transactions)} postings {transactions[0].transaction_id}.."
+                               f"{transactions[-1].transaction_id}")
+        return transactions
+
     def process_deposit(self, account_id, amount, currency, source, transaction_data, user_role=None):
         if not self._access_control.check_permission(user_role, "process_deposit"):
             raise PermissionError("User does not have permission to process deposits.")
-        account = self._accounts.get(account_id)
-        if not account:
-            raise Exception("Account not found")
+        if amount is None or amount <= 0:
+            raise ValueError("Deposit amount must be positive")
+        account = self._get_account(account_id)
         if account.currency != currency:
-            raise Exception("Currency mismatch")
-        account.balance += amount
-        transaction_id = f"TRANS{random.randint(1000, 9999)}"
+            if self._fx_service is None:
+                raise Exception("Currency mismatch")
+            amount = self._fx_service.convert(amount, currency, account.currency)
+            currency = account.currency
+        amount = _round_to_minor_units(amount, currency)
+        transaction_id = _new_id("TRANS")
         transaction = Transaction(transaction_id=transaction_id, account_id=account_id, amount=amount, 
                                   currency=currency, transaction_type="deposit")
-        self._transactions.append(transaction)
+        self._engine.post([(account_id, amount)], on_commit=self._publish_balances(transaction))
+        return self._record_transaction(transaction, user_role)
+
+    def process_deposits(self, deposits, user_role=None):
+        """Post many independent deposits with a single engine call.
+
+        Each deposit is validated on its own, as process_deposit would; the
+        valid ones are then posted together, so a burst of deposits takes the
+        engine locks once and is recorded and audited as one batch.
+
+        Args:
+            deposits (list): (account_id, amount, currency) tuples.
+            user_role (str): The acting user, checked once for the batch.
+
+        Returns:
+            list: For each deposit, its Transaction or the exception that rejected it.
+        """
+        if not self._access_control.check_permission(user_role, "process_deposit"):
+            raise PermissionError("User does not have permission to process deposits.")
+        results, postings, positions = [], [], []
+        for account_id, amount, currency in deposits:
+            try:
+                if amount is None or amount <= 0:
+                    raise ValueError("Deposit amount must be positive")
+                account = self._get_account(account_id)
+                if account.currency != currency:
+                    if self._fx_service is None:
+                        raise Exception("Currency mismatch")
+                    amount = self._fx_service.convert(amount, currency, account.currency)
+                    currency = account.currency
+            except Exception as error:
+                results.append(error)
+                continue
+            positions.append(len(results))
+            results.append(None)
+            postings.append((account_id, currency, "deposit", _round_to_minor_units(amount, currency)))
+        if postings:
+            recorded = []
+
+            def commit(accounts):
+                # Recorded under the engine's locks, so the batch reaches the dashboards with its activity.
+                recorded.extend(self._record_postings(postings, datetime.now(), user_role, "process_deposits"))
+                self._publish_batch(accounts, recorded)
+
+            self._engine.post([(account_id, amount) for account_id, _, _, amount in postings], on_commit=commit)
+            for position, transaction in zip(positions, recorded):
+                results[position] = transaction
+        return results
+
+    def process_withdrawal(self, account_id, amount, currency, destination, transaction_data, user_role=None):
+        if not self._access_control.check_permission(user_role, "process_withdrawal"):
+            raise PermissionError("User does not have permission to process withdrawals.")
+        if amount is None or amount <= 0:
+            raise ValueError("Withdrawal amount must be positive")
+        account = self._get_account(account_id)
+        if account.currency != currency:
+            raise Exception("Currency mismatch")
+        amount = _round_to_minor_units(amount, currency)
+        transaction_id = _new_id("TRANS")
+        transaction = Transaction(transaction_id=transaction_id, account_id=account_id, amount=amount,
+                                  currency=currency, transaction_type="withdrawal")
+        self._engine.post([(account_id, -amount)], on_commit=self._publish_balances(transaction))
+        return self._record_transaction(transaction, user_role)
+
+    def process_transfer(self, source_account_id, destination_account_id, amount,
+                         currency, transaction_data, user_role=None):
+        if not self._access_control.check_permission(user_role, "process_transfer"):
+            raise PermissionError("User does not have permission to process transfers.")
+        if amount is None or amount <= 0:
+            raise ValueError("Transfer amount must be positive")
+        source = self._get_account(source_account_id)
+        destination = self._get_account(destination_account_id)
+        if source.currency != currency or destination.currency != currency:
+            raise Exception("Currency mismatch")
+        amount = _round_to_minor_units(amount, currency)
+        transaction_id = _new_id("TRANS")
+        transaction = Transaction(transaction_id=transaction_id, account_id=source_account_id, amount=amount,
+                                  currency=currency, transaction_type="transfer",
+                                  counterparty_account_id=destination_account_id)
+        self._engine.transfer(source_account_id, destination_account_id, amount,
+                              on_commit=self._publish_balances(transaction))
+        self._record_transaction(transaction, user_role)
+        with self._aml_lock:
+            self._aml_monitor.record_transfer(source_account_id, destination_account_id, amount,
+                                              transaction.timestamp)
         return transaction
 
-    # Placeholder methods for withdrawals, transfers, and other operations.
+    def issue_credit_card(self, customer_id, card_type, credit_limit, currency, user_role=None):
+        if not self._access_control.check_permission(user_role, "issue_credit_card"):
+            raise PermissionError("User does not have permission to issue credit cards.")
+        if customer_id not in self._customers:
+            raise Exception("Customer not found")
+        with self._card_lock:
+            new_card_id = _new_id("CARD", self._credit_cards)
+            self._rewards.register_card(new_card_id, card_type)
+            card = CreditCard(card_id=new_card_id, customer_id=customer_id, card_type=card_type,
+                              credit_limit=credit_limit, currency=currency)
+            self._credit_cards[new_card_id] = card
+        self._customers[customer_id].credit_cards.append(new_card_id)
+        if self._storage is not None:
+            self._storage.save_credit_card(card)
+        self._dashboards.update_credit_card(customer_id, new_card_id, credit_limit, card.balance)
+        self._audit_log.append(user_role, "issue_credit_card", new_card_id)
+        return new_card_id
+
+    def process_card_transaction(self, card_id, merchant_id, amount, currency,
+                                 transaction_data, user_role=None):
+        if not self._access_control.check_permission(user_role, "process_card_transaction"):
+            raise PermissionError("User does not have permission to process card transactions.")
+        if amount is None or amount <= 0:
+            raise ValueError("Card transaction amount must be positive")
+        card = self._credit_cards.get(card_id)
+        if not card:
+            raise Exception("Card not found")
+        if card.currency != currency:
+            # Purchases in another currency are charged in the card's currency.
+            if self._fx_service is None:
+                raise Exception("Currency mismatch")
+            amount = self._fx_service.convert(amount, currency, card.currency)
+            currency = card.currency
+        transaction_id = _new_id("TRANS")
+        transaction = Transaction(transaction_id=transaction_id, account_id=card_id, amount=amount,
+                                  currency=currency, transaction_type="card_transaction")
+        category = (transaction_data or {}).get("merchant_category", "")
+        with self._card_lock:
+            if card.balance + amount > card.credit_limit:
+                raise Exception("Credit limit exceeded")
+            card.balance += amount
+            self._rewards.accrue(card_id, amount, category)
+            statement = self._rewards.statement(card_id)
+            card.cycle_points, card.lifetime_points = statement["cycle_points"], statement["lifetime_points"]
+            if self._storage is not None:
+                self._storage.save_credit_card(card)
+                self._storage.append_transaction(transaction, card.customer_id)
+            self._dashboards.update_credit_card(card.customer_id, card_id, card.credit_limit, card.balance, {
+                "transaction_id": transaction_id,
+                "transaction_type": "card_transaction",
+                "account_id": card_id,
+                "merchant_id": merchant_id,
+                "amount": amount,
+                "currency": currency,
+                "timestamp": transaction.timestamp,
+            })
+        return self._record_transaction(transaction, user_role, card.customer_id)
+
+    def calculate_rewards(self, card_id, transaction_amount, merchant_category):
+        if card_id not in self._credit_cards:
+            raise Exception("Card not found")
+        return self._rewards.calculate(card_id, transaction_amount, merchant_category)
+
+    def close_rewards_cycle(self, user_role=None):
+        """End the rewards billing cycle for every card.
+
+        Returns:
+            dict: card_id -> points earned in the cycle that just closed.
+        """
+        if not self._access_control.check_permission(user_role, "close_rewards_cycle"):
+            raise PermissionError("User does not have permission to close the rewards cycle.")
+        with self._card_lock:
+            earned = self._rewards.close_cycle()
+            for card_id in earned:
+                card = self._credit_cards[card_id]
+                card.cycle_points = 0.0
+                if self._storage is not None:
+                    self._storage.save_credit_card(card)
+        self._audit_log.append(user_role, "close_rewards_cycle", f"{len(earned)} cards")
+        return earned
+
+    def process_loan_application(self, customer_id, loan_type, amount, currency,
+                                 term_months, user_role=None, applicant=None, disbursement_account_id=None):
+        if not self._access_control.check_permission(user_role, "process_loan_application"):
+            raise PermissionError("User does not have permission to process loan applications.")
+        if customer_id not in self._customers:
+            raise Exception("Customer not found")
+        if amount is None or amount <= 0:
+            raise ValueError("Loan amount must be positive")
+        applicant = applicant or {}
+        if applicant.get("credit_score") is None:
+            raise Exception("Credit score unavailable")
+        score = score_applications([applicant["credit_score"]], [applicant.get("annual_income", 0.0)],
+                                   [applicant.get("debt_to_income", 0.0)], [amount], [term_months])
+        approved = bool(score["approved"][0])
+        if approved:
+            disbursement_account, disbursed = self._disbursement_account(customer_id, amount, currency,
+                                                                         disbursement_account_id)
+        with self._loan_lock:
+            loan_id = _new_id("LOAN", self._loans)
+            loan = Loan(loan_id=loan_id, customer_id=customer_id, loan_type=loan_type, amount=amount,
+                        currency=currency, term_months=term_months,
+                        status="approved" if approved else "rejected",
+                        interest_rate=float(score["interest_rate"][0]))
+            self._loans[loan_id] = loan
+        self._customers[customer_id].loans.append(loan_id)
+        if self._storage is not None:
+            self._storage.save_loan(loan)
+        result = {
+            "loan_id": loan_id,
+            "status": loan.status,
+            "probability_of_default": float(score["probability_of_default"][0]),
+            "interest_rate": loan.interest_rate,
+        }
+        if approved:
+            schedule = self._loan_book.add(loan_id, amount, loan.interest_rate, term_months)
+            result["monthly_payment"] = schedule["payment"]
+            self._dashboards.update_loan(customer_id, loan_id, self._loan_book.outstanding(loan_id), loan.status)
+            transaction = Transaction(transaction_id=_new_id("TRANS"),
+                                      account_id=disbursement_account.account_id, amount=disbursed,
+                                      currency=disbursement_account.currency, transaction_type="loan_disbursement")
+            self._engine.post([(disbursement_account.account_id, disbursed)],
+                              on_commit=self._publish_balances(transaction))
+            self._record_transaction(transaction, user_role)
+            result["disbursement_account_id"] = disbursement_account.account_id
+        self._audit_log.append(user_role, "process_loan_application", f"{loan_id} {loan.status}")
+        return result
+
+    def _disbursement_account(self, customer_id, amount, currency, account_id=None):
+        # Defaults to the customer's first account in the loan currency; any other account needs an FX rate.
+        if account_id is None:
+            account_id = next((candidate for candidate in self._customers[customer_id].accounts
+                               if self._get_account(candidate).currency == currency), None)
+            if account_id is None:
+                raise Exception(f"Customer has no {currency} account to disburse the loan to")
+        account = self._get_account(account_id)
+        if account.customer_id != customer_id:
+            raise Exception("Disbursement account belongs to another customer")
+        if account.currency != currency:
+            if self._fx_service is None:
+                raise Exception("Currency mismatch")
+            amount = self._fx_service.convert(amount, currency, account.currency)
+        return account, _round_to_minor_units(amount, account.currency)
+
+    def process_loan_payment(self, loan_id, amount, source_account_id, user_role=None):
+        """Debit a payment, in the loan currency, from source_account_id.
+
+        Payments beyond what is outstanding are capped, so the account is only
+        debited what the loan still owes; an account in another currency is
+        debited the converted amount.
+        """
+        if not self._access_control.check_permission(user_role, "process_loan_payment"):
+            raise PermissionError("User does not have permission to process loan payments.")
+        if amount is None or amount <= 0:
+            raise ValueError("Payment amount must be positive")
+        loan = self._loans.get(loan_id)
+        if not loan:
+            raise Exception("Loan not found")
+        if loan_id not in self._loan_book:
+            raise Exception("Loan is not approved")
+        account = self._get_account(source_account_id)
+        # Held from reading the outstanding balance to applying the payment, so two payments cannot both
+        # settle the same installments.
+        with self._loan_lock:
+            if loan.status != "approved":
+                raise Exception(f"Loan is {loan.status}")
+            # Rounded up when paying off, so the final payment clears the schedule's fractional cents.
+            payoff = _round_to_minor_units(self._loan_book.outstanding(loan_id), loan.currency, up=True)
+            amount = min(_round_to_minor_units(amount, loan.currency), payoff)
+            debit = amount
+            if account.currency != loan.currency:
+                if self._fx_service is None:
+                    raise Exception("Currency mismatch")
+                debit = _round_to_minor_units(self._fx_service.convert(amount, loan.currency, account.currency),
+                                              account.currency)
+            transaction_id = _new_id("TRANS")
+            transaction = Transaction(transaction_id=transaction_id, account_id=source_account_id, amount=debit,
+                                      currency=account.currency, transaction_type="loan_payment")
+
+            def settle(accounts):
+                self._publish_balances(transaction)(accounts)
+                applied = self._loan_book.apply_payment(loan_id, amount)
+                loan.repaid += amount
+                if applied["paid_off"]:
+                    loan.status = "paid_off"
+                if self._storage is not None:
+                    self._storage.save_loan(loan)
+                self._dashboards.update_loan(loan.customer_id, loan_id, applied["outstanding"], loan.status)
+
+            self._engine.post([(source_account_id, -debit)], on_commit=settle)
+        return self._record_transaction(transaction, user_role)
+
+    def rescore_loans(self, applicants, user_role=None):
+        """Re-score active loans in one vectorized pass, e.g. overnight after a bureau refresh.
+
+        Args:
+            applicants (dict): loan_id -> current credit_score, annual_income
+                and debt_to_income of the borrower.
+            user_role (str): The acting user.
+
+        Returns:
+            dict: loan_id -> probability_of_default and the interest_rate the
+                loan would be priced at today, for every active loan given.
+        """
+        if not self._access_control.check_permission(user_role, "process_loan_application"):
+            raise PermissionError("User does not have permission to process loan applications.")
+        loan_ids = [loan_id for loan_id in applicants
+                    if loan_id in self._loan_book and self._loans[loan_id].status == "approved"]
+        if not loan_ids:
+            return {}
+        features = [applicants[loan_id] for loan_id in loan_ids]
+        score = score_applications([f["credit_score"] for f in features],
+                                   [f.get("annual_income", 0.0) for f in features],
+                                   [f.get("debt_to_income", 0.0) for f in features],
+                                   [self._loan_book.outstanding(loan_id) for loan_id in loan_ids],
+                                   [self._loan_book.remaining_installments(loan_id) for loan_id in loan_ids])
+        self._audit_log.append(user_role, "rescore_loans", f"{len(loan_ids)} loans")
+        return {loan_id: {"probability_of_default": float(score["probability_of_default"][i]),
+                          "interest_rate": float(score["interest_rate"][i])}
+                for i, loan_id in enumerate(loan_ids)}
+
+    def get_customer_dashboard(self, customer_id, user_role=None):
+        if not self._access_control.check_permission(user_role, "view_dashboard"):
+            raise PermissionError("User does not have permission to view dashboards.")
+        if not self._customers.get(customer_id):
+            raise Exception("Customer not found")
+        return self._dashboards.get(customer_id) or self._dashboards.register_customer(customer_id)
+
+    def get_transaction_analytics(self, filters=None, user_role=None):
+        if not self._access_control.check_permission(user_role, "view_analytics"):
+            raise PermissionError("User does not have permission to view analytics.")
+        filters = dict(filters or {})
+        group_by = filters.pop("group_by", None)
+        bucket_seconds = filters.pop("bucket_seconds", 86400)
+        result = self._analytics.summary(filters)
+        if group_by:
+            result["groups"] = self._analytics.group_by(group_by, filters, bucket_seconds)
+        return result
 
-    def encrypt_sensitive_data(self, data):
-        # Placeholder for real encryption logic
-        return "encrypted_data"
+    def calculate_customer_ltv(self, customer_id, user_role=None):
+        if not self._access_control.check_permission(user_role, "view_analytics"):
+            raise PermissionError("User does not have permission to view analytics.")
+        if customer_id not in self._customers:
+            raise Exception("Customer not found")
+        return self._analytics.customer_ltv(customer_id)
+
+    def generate_compliance_report(self, report_type, date_range, user_role=None, output_path=None,
+                                   fmt="csv", checkpoint_path=None, progress=None):
+        if not self._access_control.check_permission(user_role, "generate_compliance_report"):
+            raise PermissionError("User does not have permission to generate compliance reports.")
+        if output_path is None:
+            start, end = date_range
+            output_path = f"output/{report_type}_{start:%Y%m%d}_{end:%Y%m%d}.{fmt}"
+        report = stream_report(report_type, self._transactions, date_range, output_path, fmt=fmt,
+                               checkpoint_path=checkpoint_path, progress=progress)
+        self._audit_log.append(user_role, "generate_compliance_report", f"{report_type} {output_path}")
+        return report
+
+    def run_end_of_day(self, business_date, user_role=None, terms=None, batch_size=1000, checkpoint_path=None,
+                       progress=None):
+        if not self._access_control.check_permission(user_role, "run_end_of_day"):
+            raise PermissionError("User does not have permission to run end of day processing.")
+        return run_end_of_day(self, business_date, user_role=user_role, terms=terms, batch_size=batch_size,
+                              checkpoint_path=checkpoint_path, progress=progress)
+
+    def audit_user_actions(self, filters=None, user_role=None):
+        if not self._access_control.check_permission(user_role, "audit_user_actions"):
+            raise PermissionError("User does not have permission to read the audit log.")
+        filters = filters or {}
+        return self._audit_log.query(
+            user=filters.get("user"),
+            action=filters.get("action"),
+            start=filters.get("start"),
+            end=filters.get("end"),
+            limit=filters.get("limit"),
+        )
+
+    def detect_suspicious_activity(self, account_id, transaction_data=None):
+        alerts = self._aml_monitor.alerts_for(account_id)
+        return {
+            "account_id": account_id,
+            "flagged": bool(alerts),
+            "alerts": [alert.to_dict() for alert in alerts],
+        }
+
+    def _envelope(self):
+        if self._crypto is None:
+            with self._crypto_lock:
+                if self._crypto is None:
+                    self._crypto = EnvelopeEncryption(self._encryption_key, wrapped_keys=self._wrapped_keys,
+                                                      on_new_key=self._save_wrapped_key)
+        return self._crypto
 
-    def decrypt_sensitive_data(self, encrypted_data, user_role=None):
+    def _save_wrapped_key(self, tenant, wrapped):
+        # Without the wrapped key, nothing sealed under it could be read after a restart.
+        if self._storage is not None:
+            self._storage.save_wrapped_key(tenant, wrapped)
+        self._wrapped_keys[tenant] = wrapped
+
+    def encrypt_sensitive_data(self, data, record_id=""):
+        """Encrypt every field of data, bound to record_id (e.g. the customer_id) and the field name."""
+        return self._envelope().encrypt_fields(self.institution_id, data, list(data), record_id)
+
+    def decrypt_sensitive_data(self, encrypted_data, user_role=None, record_id=""):
         if not self._access_control.check_permission(user_role, "decrypt_data"):
             raise PermissionError("User does not have permission to decrypt data.")
-        # Placeholder for real decryption logic
-        return "decrypted_data"
+        return self._envelope().decrypt_fields(self.institution_id, encrypted_data, list(encrypted_data), record_id)
+
+    def get_exchange_rate(self, from_currency, to_currency):
+        if from_currency == to_currency:
+            return 1.0
+        if self._fx_service is None:
+            raise CurrencyNotSupportedError(f"No exchange rate source for {from_currency}/{to_currency}")
+        return self._fx_service.get_rate(from_currency, to_currency)
 
     # Additional methods according to the design requirements.
\ No newline at end of file
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from itertools import islice
+
+CTR_THRESHOLD = 10000.0
+
+# Which transactions each regulatory report covers.
+REPORT_RULES = {
+    # Bank Secrecy Act currency transaction reports: cash movements at or over the threshold.
+    "BSA": lambda t: t.transaction_type in ("deposit", "withdrawal", "transfer") and t.amount >= CTR_THRESHOLD,
+    # CFPB consumer-credit reporting: card and loan activity.
+    "CFPB": lambda t: t.transaction_type in ("card_transaction", "loan_payment", "loan_disbursement"),
+    # PCI DSS scope: everything that touched card data.
+    "PCI": lambda t: t.transaction_type == "card_transaction",
+}
+
+FIELDS = ["transaction_id", "timestamp", "account_id", "counterparty_account_id",
+          "transaction_type", "amount", "currency"]
+
+
+class UnsupportedReportTypeError(Exception):
+    pass
+
+
+def _row(transaction):
+    return {
+        "transaction_id": transaction.transaction_id,
+        "timestamp": transaction.timestamp.isoformat(),
+        "account_id": transaction.account_id,
+        "counterparty_account_id": getattr(transaction, "counterparty_account_id", None) or "",
+        "transaction_type": transaction.transaction_type,
+        "amount": transaction.amount,
+        "currency": transaction.currency,
+    }
+
+
+def iter_transactions(transactions, start, end, skip=0):
+    """Yield (position, transaction) for transactions inside [start, end].
+
+    The ledger is only roughly in timestamp order: timestamps are taken
+    before the locked post, so concurrent postings can append out of order.
+    Every transaction after the first `skip` is therefore checked against
+    the range rather than stopping at the first one past `end`.
+    """
+    for position, transaction in enumerate(islice(transactions, skip, None), skip):
+        if start <= transaction.timestamp <= end:
+            yield position, transaction
+
+
+def _encode(rows, fmt):
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            buffer.write(json.dumps(row))
+            buffer.write("\n")
+    return buffer.getvalue().encode("utf-8")
+
+
+def _save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as handle:
+        json.dump(state, handle)
+    os.replace(tmp, path)
+
+
+def stream_report(report_type, transactions, date_range, output_path, fmt="csv",
+                  chunk_size=10000, checkpoint_path=None, progress=None):
+    """Write a compliance report without holding it in memory.
+
+    Qualifying rows are encoded and appended `chunk_size` at a time. After
+    every chunk a checkpoint records how many source transactions were
+    consumed and how long the output file is, so an interrupted run started
+    again with the same checkpoint truncates any partial chunk and carries on
+    where it left off.
+
+    Args:
+        report_type (str): One of REPORT_RULES (BSA, CFPB, PCI).
+        transactions (iterable): Transactions in posting order; timestamps
+            need not be sorted.
+        date_range (tuple): Inclusive (start, end) datetimes.
+        output_path (str): CSV or JSONL file to write.
+        fmt (str): "csv" or "jsonl".
+        chunk_size (int): Rows buffered between writes and checkpoints.
+        checkpoint_path (str): Where to keep resume state; None disables it.
+        progress (callable): Called as progress(scanned, rows_written) per
+            chunk, where scanned counts source transactions consumed.
+
+    Returns:
+        dict: Report summary with row count, total amount and output path.
+    """
+    try:
+        rule = REPORT_RULES[report_type]
+    except KeyError:
+        raise UnsupportedReportTypeError(f"Unsupported report type: {report_type}") from None
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported format: {fmt}")
+    start, end = date_range
+    state = {"report_type": report_type, "start": start.isoformat(), "end": end.isoformat(),
+             "format": fmt, "next_position": 0, "rows_written": 0, "total_amount": 0.0, "bytes": 0}
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding="utf-8") as handle:
+            saved = json.load(handle)
+        # A checkpoint is only usable while the output it describes is still on disk.
+        if all(saved.get(key) == state[key] for key in ("report_type", "start", "end", "format")) \
+                and os.path.exists(output_path) and os.path.getsize(output_path) >= saved["bytes"]:
+            state = saved
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    resuming = state["bytes"] > 0
+    with open(output_path, "r+b" if resuming else "wb") as output:
+        if resuming:
+            output.truncate(state["bytes"])
+            output.seek(state["bytes"])
+        elif fmt == "csv":
+            output.write(",".join(FIELDS).encode("utf-8") + b"\r\n")
+
+        rows = []
+
+        def commit(scanned):
+            output.write(_encode(rows, fmt))
+            output.flush()
+            state["rows_written"] += len(rows)
+            state["total_amount"] += sum(row["amount"] for row in rows)
+            state["next_position"] = scanned
+            state["bytes"] = output.tell()
+            rows.clear()
+            if checkpoint_path:
+                _save_checkpoint(checkpoint_path, state)
+            if progress is not None:
+                progress(state["next_position"], state["rows_written"])
+
+        scanned = state["next_position"]
+        for scanned, transaction in enumerate(islice(transactions, scanned, None), scanned + 1):
+            if start <= transaction.timestamp <= end and rule(transaction):
+                rows.append(_row(transaction))
+                if len(rows) >= chunk_size:
+                    commit(scanned)
+        commit(scanned)
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return {
+        "report_type": report_type,
+        "date_range": (start, end),
+        "rows": state["rows_written"],
+        "total_amount": state["total_amount"],
+        "output_path": output_path,
+        "generated_at": datetime.now(),
+    }
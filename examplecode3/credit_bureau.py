@@ -0,0 +1,181 @@
+import asyncio
+import json
+import zlib
+from collections import OrderedDict
+
+from fx_service import ExternalAPIError
+
+
+class CreditBureauServer:
+    """Local stand-in for the credit bureau HTTP API.
+
+    Serves `GET /score/<customer_id>` over keep-alive HTTP/1.1 with a
+    deterministic score per customer and an optional artificial latency.
+    Like many real servers it can close a connection after
+    `max_requests_per_connection` requests.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, max_requests_per_connection=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.max_requests_per_connection = max_requests_per_connection
+        self.request_count = 0
+        self.connection_count = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    @staticmethod
+    def score_for(customer_id):
+        return 300 + zlib.crc32(customer_id.encode("utf-8")) % 551
+
+    async def _handle(self, reader, writer):
+        self.connection_count += 1
+        served = 0
+        try:
+            while served != self.max_requests_per_connection:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.request_count += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                _, path, _ = request_line.decode("latin-1").split(" ", 2)
+                if path.startswith("/score/"):
+                    customer_id = path[len("/score/"):]
+                    status = "200 OK"
+                    body = json.dumps({"customer_id": customer_id, "score": self.score_for(customer_id)})
+                else:
+                    status, body = "404 Not Found", json.dumps({"error": "not found"})
+                payload = body.encode("utf-8")
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload)
+                await writer.drain()
+                served += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class _DeadConnection(ConnectionError):
+    """The server closed the connection before answering."""
+
+
+class CreditBureauClient:
+    """Async credit-score client with pooling, coalescing and caching.
+
+    At most `pool_size` requests are in flight at once and their keep-alive
+    connections are reused. Concurrent lookups for the same customer share a
+    single request (single-flight), and results are cached per customer for
+    `cache_ttl` seconds, so a burst of loan applications for one customer
+    costs one bureau call. A pooled connection the server has closed in the
+    meantime is discarded and the request retried once on a new connection.
+    """
+
+    def __init__(self, host, port, pool_size=10, timeout=2.0, cache_ttl=300.0, max_cached=100_000):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_cached = max_cached
+        self.requests_sent = 0
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle = []
+        self._inflight = {}
+        self._cache = OrderedDict()  # customer_id -> (score, expires_at)
+
+    async def get_score(self, customer_id):
+        loop = asyncio.get_running_loop()
+        cached = self._cache.get(customer_id)
+        if cached is not None:
+            if cached[1] > loop.time():
+                self._cache.move_to_end(customer_id)
+                return cached[0]
+            del self._cache[customer_id]
+
+        task = self._inflight.get(customer_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(customer_id))
+            self._inflight[customer_id] = task
+            task.add_done_callback(lambda done: self._finish(customer_id, done))
+        # Shielded so that one cancelled caller does not cancel the shared lookup.
+        return await asyncio.shield(task)
+
+    def _finish(self, customer_id, task):
+        self._inflight.pop(customer_id, None)
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every waiter gave up
+
+    async def _fetch(self, customer_id):
+        try:
+            status, body = await asyncio.wait_for(self._request(f"/score/{customer_id}"), self.timeout)
+        except asyncio.TimeoutError:
+            raise ExternalAPIError(f"Credit bureau timed out for {customer_id}") from None
+        except (OSError, asyncio.IncompleteReadError) as exc:
+            raise ExternalAPIError(f"Credit bureau unavailable: {exc}") from exc
+        if status != 200:
+            raise ExternalAPIError(f"Credit bureau returned {status} for {customer_id}")
+        score = json.loads(body)["score"]
+        self._cache[customer_id] = (score, asyncio.get_running_loop().time() + self.cache_ttl)
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return score
+
+    async def _request(self, path):
+        async with self._slots:
+            if self._idle:
+                try:
+                    return await self._exchange(path, *self._idle.pop())
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # The server closed the idle connection; a GET is safe to send again.
+                    pass
+            return await self._exchange(path, *await asyncio.open_connection(self.host, self.port))
+
+    async def _exchange(self, path, reader, writer):
+        reusable = False
+        try:
+            self.requests_sent += 1
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            status_line = (await reader.readline()).split()
+            if len(status_line) < 2:
+                raise _DeadConnection("connection closed before a response")
+            status = int(status_line[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            body = await reader.readexactly(length)
+            reusable = True
+            return status, body
+        finally:
+            if reusable:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
@@ -0,0 +1,238 @@
+import math
+import re
+import threading
+import unicodedata
+from array import array
+
+_NON_ALNUM = re.compile(r"[^0-9A-Z]")
+_NON_DIGIT = re.compile(r"\D")
+_NON_NAME = re.compile(r"[^a-z ]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_name(name):
+    """Lowercase ASCII letters only, so "Zoë  O'Neil" matches "zoe oneil"."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    ascii_name = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+    return _SPACES.sub(" ", _NON_NAME.sub("", ascii_name)).strip()
+
+
+def normalize_document(number):
+    return _NON_ALNUM.sub("", str(number).upper())
+
+
+def normalize_contact(value):
+    """Lowercased e-mail, or the last 10 digits of a phone number."""
+    value = str(value).strip()
+    if "@" in value:
+        return value.lower()
+    digits = _NON_DIGIT.sub("", value)
+    return digits[-10:] if len(digits) >= 7 else None
+
+
+def document_keys(id_documents):
+    if isinstance(id_documents, dict):
+        items = id_documents.items()
+    elif isinstance(id_documents, (list, tuple)):
+        items = (("", number) for number in id_documents)
+    elif id_documents:
+        items = [("", id_documents)]
+    else:
+        items = ()
+    keys = []
+    for doc_type, number in items:
+        number = normalize_document(number)
+        if number:
+            keys.append((str(doc_type).strip().lower(), number))
+    return keys
+
+
+def contact_keys(contact_info):
+    if isinstance(contact_info, dict):
+        values = contact_info.values()
+    elif isinstance(contact_info, (list, tuple)):
+        values = contact_info
+    elif contact_info:
+        values = [contact_info]
+    else:
+        values = ()
+    return [key for key in map(normalize_contact, values) if key]
+
+
+def _birth_year(dob):
+    return str(dob)[:4]
+
+
+def trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CustomerIndex:
+    """Search index over customers for KYC duplicate detection.
+
+    Identity documents, contacts and (name, date of birth) pairs are kept in
+    exact-match hash indexes over normalized values. Names also go into a
+    trigram index for fuzzy matching, blocked by birth year so a query never
+    touches the postings of people born in other years. A query only scans
+    the postings of its rarest trigrams (a match at the requested similarity
+    must share at least one of them), then verifies the candidates. Postings
+    are append-only arrays of row numbers; when a name or birth date changes
+    the new entries are appended and stale ones are dropped at verification.
+    """
+
+    def __init__(self):
+        self._rows = {}          # customer_id -> row
+        self._ids = []           # row -> customer_id
+        self._names = []         # row -> normalized full name
+        self._dobs = []          # row -> date of birth
+        self._keys = []          # row -> (document keys, contact keys, name/dob key)
+        self._documents = {}
+        self._contacts = {}
+        self._name_dob = {}
+        self._name_trigrams = {}
+        self._document_types = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, customer_id):
+        return customer_id in self._rows
+
+    @staticmethod
+    def _link(index, key, customer_id):
+        index.setdefault(key, []).append(customer_id)
+
+    @staticmethod
+    def _unlink(index, key, customer_id):
+        ids = index.get(key)
+        if ids and customer_id in ids:
+            ids.remove(customer_id)
+            if not ids:
+                del index[key]
+
+    def add(self, customer_id, first_name, last_name, dob, contact_info=None, id_documents=None, replace=True):
+        """Index a customer, replacing what was indexed for it before.
+
+        With replace=False a customer that is already indexed is left as it
+        is; the check and the insert happen under one lock, so a stale record
+        can never overwrite a concurrent re-index of the live profile.
+
+        Returns:
+            bool: Whether the customer was indexed.
+        """
+        name = normalize_name(f"{first_name} {last_name}")
+        keys = (document_keys(id_documents), contact_keys(contact_info), (name, str(dob)))
+        with self._lock:
+            row = self._rows.get(customer_id)
+            if row is not None and not replace:
+                return False
+            if row is None:
+                row = self._rows[customer_id] = len(self._ids)
+                self._ids.append(customer_id)
+                self._names.append(None)
+                self._dobs.append(None)
+                self._keys.append(((), (), None))
+            old_documents, old_contacts, old_name_dob = self._keys[row]
+            for key in old_documents:
+                self._unlink(self._documents, key, customer_id)
+            for key in old_contacts:
+                self._unlink(self._contacts, key, customer_id)
+            if old_name_dob is not None:
+                self._unlink(self._name_dob, old_name_dob, customer_id)
+            for key in keys[0]:
+                self._link(self._documents, key, customer_id)
+                self._document_types.add(key[0])
+            for key in keys[1]:
+                self._link(self._contacts, key, customer_id)
+            self._link(self._name_dob, keys[2], customer_id)
+            if name != self._names[row] or str(dob) != self._dobs[row]:
+                year = _birth_year(dob)
+                for gram in trigrams(name):
+                    self._name_trigrams.setdefault((year, gram), array("q")).append(row)
+            self._names[row] = name
+            self._dobs[row] = str(dob)
+            self._keys[row] = keys
+        return True
+
+    def add_customer(self, customer):
+        self.add(customer.customer_id, customer.first_name, customer.last_name, customer.dob,
+                 customer.contact_info, customer.id_documents)
+
+    def on_profile_update(self, customer, field, old_value):
+        """Customer.update_profile listener: re-index when a searched field changes."""
+        if field in ("first_name", "last_name", "dob", "contact_info", "id_documents"):
+            self.add_customer(customer)
+
+    def by_document(self, number, doc_type=None):
+        number = normalize_document(number)
+        types = self._document_types if doc_type is None else (str(doc_type).strip().lower(),)
+        # Document types are few, so probing each is cheaper than a second index by number.
+        return [customer_id for doc_type in list(types)
+                for customer_id in self._documents.get((doc_type, number), ())]
+
+    def document_matches(self, id_documents):
+        """Customers already holding any of these identity documents."""
+        matches = []
+        for key in document_keys(id_documents):
+            matches.extend(customer_id for customer_id in self._documents.get(key, ()) if customer_id not in matches)
+        return matches
+
+    def by_contact(self, value):
+        key = normalize_contact(value)
+        return list(self._contacts.get(key, ())) if key else []
+
+    def by_name_dob(self, first_name, last_name, dob):
+        return list(self._name_dob.get((normalize_name(f"{first_name} {last_name}"), str(dob)), ()))
+
+    def similar_names(self, first_name, last_name, dob, threshold=0.6, exact_dob=False, limit=20):
+        """Customers born the same year whose names have trigram similarity >= threshold.
+
+        Args:
+            exact_dob (bool): Only match customers with exactly this date of birth.
+
+        Returns:
+            list: (customer_id, similarity) pairs, best first.
+        """
+        query = trigrams(normalize_name(f"{first_name} {last_name}"))
+        year = _birth_year(dob)
+        postings = [self._name_trigrams.get((year, gram), ()) for gram in query]
+        postings.sort(key=len)
+        required = math.ceil(threshold * len(query))
+        candidates = set()
+        for posting in postings[:len(query) - required + 1]:
+            candidates.update(posting)
+        dob = str(dob)
+        matches = []
+        for row in candidates:
+            if self._dobs[row] != dob and (exact_dob or _birth_year(self._dobs[row]) != year):
+                continue
+            grams = trigrams(self._names[row])
+            similarity = len(query & grams) / len(query | grams)
+            if similarity >= threshold:
+                matches.append((self._ids[row], similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches[:limit]
+
+    def find_duplicates(self, first_name, last_name, dob, contact_info=None, id_documents=None,
+                        threshold=0.6):
+        """Existing customers that may be the applicant, strongest evidence first.
+
+        Returns:
+            list: Dicts with customer_id and the reasons it matched
+                (id_document, contact, name_dob, similar_name).
+        """
+        reasons = {}
+        for customer_id in self.document_matches(id_documents):
+            reasons.setdefault(customer_id, set()).add("id_document")
+        for key in contact_keys(contact_info):
+            for customer_id in self._contacts.get(key, ()):
+                reasons.setdefault(customer_id, set()).add("contact")
+        for customer_id in self.by_name_dob(first_name, last_name, dob):
+            reasons.setdefault(customer_id, set()).add("name_dob")
+        for customer_id, _ in self.similar_names(first_name, last_name, dob, threshold, exact_dob=True):
+            reasons.setdefault(customer_id, set()).add("similar_name")
+        weight = {"id_document": 8, "contact": 4, "name_dob": 2, "similar_name": 1}
+        ranked = sorted(reasons.items(), key=lambda item: -sum(weight[reason] for reason in item[1]))
+        return [{"customer_id": customer_id, "reasons": sorted(found)} for customer_id, found in ranked]
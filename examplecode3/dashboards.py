@@ -0,0 +1,94 @@
+import threading
+from datetime import datetime
+from types import MappingProxyType
+
+_EMPTY = MappingProxyType({})
+
+
+class _CustomerState:
+    __slots__ = ("lock", "version", "accounts", "credit_cards", "loans", "recent", "snapshot")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.accounts = _EMPTY
+        self.credit_cards = _EMPTY
+        self.loans = _EMPTY
+        self.recent = ()
+        self.snapshot = None
+
+
+class DashboardStore:
+    """Materialized per-customer dashboards kept current on every posting.
+
+    Each posting rebuilds only the section it touched (one account, card or
+    loan entry plus the recent-activity tuple), bumps the customer's version
+    and publishes a new read-only snapshot by swapping a single reference.
+    Readers never lock and never recompute: `get` is a dict lookup, and a
+    snapshot never changes once published, so every read is consistent.
+    """
+
+    def __init__(self, recent_limit=10):
+        self.recent_limit = recent_limit
+        self._customers = {}
+        self._create_lock = threading.Lock()
+
+    def _state(self, customer_id):
+        state = self._customers.get(customer_id)
+        if state is None:
+            with self._create_lock:
+                state = self._customers.setdefault(customer_id, _CustomerState())
+        return state
+
+    def get(self, customer_id):
+        state = self._customers.get(customer_id)
+        return state.snapshot if state is not None else None
+
+    def register_customer(self, customer_id):
+        """Publish an empty dashboard so new customers read as version 0."""
+        state = self._state(customer_id)
+        with state.lock:
+            if state.snapshot is None:
+                state.snapshot = self._publish(customer_id, state)
+            return state.snapshot
+
+    def _update(self, customer_id, section, item_id, entry, activity):
+        state = self._state(customer_id)
+        with state.lock:
+            items = dict(getattr(state, section))
+            items[item_id] = MappingProxyType(entry)
+            setattr(state, section, MappingProxyType(items))
+            if activity is not None:
+                state.recent = ((MappingProxyType(activity),) + state.recent)[:self.recent_limit]
+            state.version += 1
+            state.snapshot = self._publish(customer_id, state)
+            return state.snapshot
+
+    @staticmethod
+    def _publish(customer_id, state):
+        totals = {}
+        for account in state.accounts.values():
+            totals[account["currency"]] = totals.get(account["currency"], 0.0) + account["balance"]
+        return MappingProxyType({
+            "customer_id": customer_id,
+            "version": state.version,
+            "accounts": state.accounts,
+            "credit_cards": state.credit_cards,
+            "loans": state.loans,
+            "total_balances": MappingProxyType(totals),
+            "recent_activity": state.recent,
+            "updated_at": datetime.now(),
+        })
+
+    def update_account(self, customer_id, account_id, currency, balance, activity=None):
+        return self._update(customer_id, "accounts", account_id,
+                            {"currency": currency, "balance": balance}, activity)
+
+    def update_credit_card(self, customer_id, card_id, credit_limit, balance, activity=None):
+        return self._update(customer_id, "credit_cards", card_id,
+                            {"credit_limit": credit_limit, "balance": balance,
+                             "available_credit": credit_limit - balance}, activity)
+
+    def update_loan(self, customer_id, loan_id, outstanding, status, activity=None):
+        return self._update(customer_id, "loans", loan_id,
+                            {"outstanding": outstanding, "status": status}, activity)
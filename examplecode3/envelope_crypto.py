@@ -0,0 +1,181 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # reported when EnvelopeEncryption is created, so the rest of the bank still imports
+    AESGCM = None
+
+_AES_GCM = 2
+
+
+class DecryptionError(Exception):
+    pass
+
+
+def _associated_data(*parts):
+    # Length-prefixed, so ("ab", "c") and ("a", "bc") authenticate differently.
+    encoded = [part.encode("utf-8") for part in parts]
+    return b"".join(len(part).to_bytes(4, "big") + part for part in encoded)
+
+
+class _Cipher:
+    """AES-GCM bound to one 256-bit key.
+
+    The first byte of every token records the scheme, so the format can
+    change without breaking stored tokens.
+    """
+
+    def __init__(self, key):
+        self._aes = AESGCM(key)
+
+    def seal(self, plaintext, associated_data=b""):
+        nonce = os.urandom(12)
+        return bytes([_AES_GCM]) + nonce + self._aes.encrypt(nonce, plaintext, associated_data)
+
+    def open(self, token, associated_data=b""):
+        if token[:1] != bytes([_AES_GCM]) or len(token) < 29:
+            raise DecryptionError("Unknown or truncated token")
+        try:
+            return self._aes.decrypt(token[1:13], token[13:], associated_data)
+        except Exception as exc:
+            raise DecryptionError("Authentication failed") from exc
+
+
+class EnvelopeEncryption:
+    """Per-tenant data keys wrapped by a key-encryption key.
+
+    The key-encryption key is derived once from the institution's master
+    key. Each tenant gets a random data key that is only ever stored wrapped:
+    `on_new_key(tenant, wrapped)` is called before a new key is first used,
+    and the wrapped keys are passed back in as `wrapped_keys` on restart.
+    Unwrapped keys live in a bounded LRU cache so hot tenants never pay for
+    unwrapping. The batch APIs resolve the tenant's key once and reuse it for
+    every record.
+
+    Every token is authenticated together with its tenant and, for fields,
+    the record id and field name, so a token copied to another tenant,
+    record or field fails to decrypt.
+
+    Raises:
+        ImportError: If the cryptography package is not installed.
+    """
+
+    def __init__(self, master_key, cache_size=1024, wrapped_keys=None, on_new_key=None):
+        if AESGCM is None:
+            raise ImportError("EnvelopeEncryption requires the cryptography package (pip install cryptography)")
+        kek = hashlib.pbkdf2_hmac("sha256", master_key.encode("utf-8"), b"banking-core-kek", 100_000)
+        self._kek = _Cipher(kek)
+        self.cache_size = cache_size
+        self.wrapped_keys = dict(wrapped_keys or {})  # tenant -> wrapped data key
+        self._on_new_key = on_new_key
+        self._cache = OrderedDict()  # tenant -> _Cipher
+        # Creating a key must happen once per tenant: data sealed under a losing duplicate would be unreadable.
+        self._lock = threading.Lock()
+        self.unwrap_count = 0
+
+    def _cipher(self, tenant):
+        with self._lock:
+            cipher = self._cache.get(tenant)
+            if cipher is not None:
+                self._cache.move_to_end(tenant)
+                return cipher
+            wrapped = self.wrapped_keys.get(tenant)
+            if wrapped is None:
+                data_key = os.urandom(32)
+                wrapped = self._kek.seal(data_key, _associated_data("data-key", tenant))
+                if self._on_new_key is not None:
+                    self._on_new_key(tenant, wrapped)
+                self.wrapped_keys[tenant] = wrapped
+            else:
+                data_key = self._kek.open(wrapped, _associated_data("data-key", tenant))
+                self.unwrap_count += 1
+            cipher = self._cache[tenant] = _Cipher(data_key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return cipher
+
+    def encrypt(self, tenant, plaintext, context=()):
+        """Seal plaintext; context is a tuple of strings that must be given again to decrypt."""
+        return self._cipher(tenant).seal(plaintext, _associated_data(tenant, *context))
+
+    def decrypt(self, tenant, token, context=()):
+        return self._cipher(tenant).open(token, _associated_data(tenant, *context))
+
+    def encrypt_fields(self, tenant, record, fields, record_id=""):
+        return self.encrypt_many(tenant, [record], fields, [record_id])[0]
+
+    def decrypt_fields(self, tenant, record, fields, record_id=""):
+        return self.decrypt_many(tenant, [record], fields, [record_id])[0]
+
+    def encrypt_many(self, tenant, records, fields, record_ids=None):
+        """Encrypt the given fields of many records with one key lookup.
+
+        Args:
+            tenant (str): Tenant whose data key is used.
+            records (list): Dicts to encrypt; they are not modified.
+            fields (list): Field names to encrypt. Values are JSON-encoded
+                first, so dicts such as id_documents round-trip intact.
+            record_ids (list): An id per record (e.g. its customer_id), bound
+                into each token with the field name. Decrypt with the same ids.
+
+        Returns:
+            list: Copies of the records with those fields replaced by
+                base64 tokens.
+        """
+        seal = self._cipher(tenant).seal
+        encode, dumps = base64.urlsafe_b64encode, json.dumps
+        result = []
+        for record, record_id in zip(records, record_ids or [""] * len(records)):
+            encrypted = dict(record)
+            for field in fields:
+                if field in encrypted:
+                    token = seal(dumps(encrypted[field]).encode("utf-8"),
+                                 _associated_data(tenant, str(record_id), field))
+                    encrypted[field] = encode(token).decode("ascii")
+            result.append(encrypted)
+        return result
+
+    def decrypt_many(self, tenant, records, fields, record_ids=None):
+        open_token = self._cipher(tenant).open
+        decode, loads = base64.urlsafe_b64decode, json.loads
+        result = []
+        for record, record_id in zip(records, record_ids or [""] * len(records)):
+            decrypted = dict(record)
+            for field in fields:
+                if field in decrypted:
+                    decrypted[field] = loads(open_token(decode(decrypted[field]),
+                                                        _associated_data(tenant, str(record_id), field)))
+            result.append(decrypted)
+        return result
+
+
+if __name__ == "__main__":
+    # Records-per-second benchmark for bulk customer load and decrypt-on-read.
+    engine = EnvelopeEncryption("benchmark-master-key")
+    fields = ["dob", "contact_info", "id_documents"]
+    customers = [{
+        "customer_id": f"CUST{i}",
+        "dob": "1990-01-01",
+        "contact_info": {"email": f"user{i}@example.com", "phone": "+1-555-0100"},
+        "id_documents": {"passport": f"P{i:09d}"},
+    } for i in range(100_000)]
+    record_ids = [customer["customer_id"] for customer in customers]
+    started = time.perf_counter()
+    encrypted = engine.encrypt_many("tenant-1", customers, fields, record_ids)
+    elapsed = time.perf_counter() - started
+    print(f"bulk encrypt: {len(customers) / elapsed:,.0f} records/s")
+    started = time.perf_counter()
+    engine.decrypt_many("tenant-1", encrypted, fields, record_ids)
+    elapsed = time.perf_counter() - started
+    print(f"bulk decrypt: {len(customers) / elapsed:,.0f} records/s")
+    started = time.perf_counter()
+    for record in encrypted[:10_000]:
+        engine.decrypt_fields("tenant-1", record, fields, record["customer_id"])
+    elapsed = time.perf_counter() - started
+    print(f"decrypt on read: {10_000 / elapsed:,.0f} records/s")
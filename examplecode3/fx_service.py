@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+
+import numpy as np
+
+
+class CurrencyNotSupportedError(Exception):
+    pass
+
+
+class ExternalAPIError(Exception):
+    pass
+
+
+class FileRateProvider:
+    """Stand-in for the external rates API that reads a local JSON file.
+
+    The file holds {"base": "USD", "rates": {"EUR": 0.92, ...}}, where each
+    rate is the number of units of that currency per one unit of the base.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fetch_count = 0
+
+    def fetch(self):
+        self.fetch_count += 1
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                payload = json.load(handle)
+            return payload["base"], payload["rates"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise ExternalAPIError(f"Could not load exchange rates from {self.path}: {exc}") from exc
+
+
+class RateSnapshot:
+    """Immutable rate vector against a single base currency."""
+
+    __slots__ = ("base", "codes", "index", "rates", "fetched_at")
+
+    def __init__(self, base, rates, fetched_at):
+        rates = dict(rates)
+        rates[base] = 1.0
+        self.base = base
+        self.codes = tuple(sorted(rates))
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.rates = np.array([rates[code] for code in self.codes], dtype=np.float64)
+        self.fetched_at = fetched_at
+
+    def position(self, currency):
+        try:
+            return self.index[currency]
+        except KeyError:
+            raise CurrencyNotSupportedError(f"Currency {currency} is not supported") from None
+
+    def rate(self, from_currency, to_currency):
+        # Cross rates are triangulated through the base currency.
+        return float(self.rates[self.position(to_currency)] / self.rates[self.position(from_currency)])
+
+
+class ExchangeRateService:
+    """Cached exchange rates with a TTL and refresh-ahead.
+
+    Conversions read the current RateSnapshot, so they cost a dict lookup and
+    a division. Once a snapshot is older than `refresh_after` (a fraction of
+    the TTL) the next read starts one background refresh while still serving
+    the current rates; only a read after the full TTL has expired waits for
+    the provider.
+    """
+
+    def __init__(self, provider, ttl=300.0, refresh_after=0.8):
+        self.provider = provider
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _load(self):
+        base, rates = self.provider.fetch()
+        snapshot = RateSnapshot(base, rates, time.monotonic())
+        self._snapshot = snapshot
+        return snapshot
+
+    def _refresh_in_background(self):
+        try:
+            self._load()
+        except ExternalAPIError:
+            pass  # keep serving the current snapshot until it expires
+        finally:
+            self._refreshing = False
+
+    def is_fresh(self):
+        """True when a read can be served without waiting for the provider."""
+        snapshot = self._snapshot
+        return snapshot is not None and time.monotonic() - snapshot.fetched_at < self.ttl
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - snapshot.fetched_at < self.ttl:
+            if now - snapshot.fetched_at >= self.ttl * self.refresh_after and not self._refreshing:
+                with self._lock:
+                    if not self._refreshing:
+                        self._refreshing = True
+                        threading.Thread(target=self._refresh_in_background, daemon=True).start()
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot.fetched_at >= self.ttl:
+                snapshot = self._load()
+            return snapshot
+
+    def get_rate(self, from_currency, to_currency):
+        if from_currency == to_currency:
+            return 1.0
+        return self.snapshot().rate(from_currency, to_currency)
+
+    def convert(self, amount, from_currency, to_currency):
+        return amount * self.get_rate(from_currency, to_currency)
+
+    def convert_many(self, amounts, currencies, target):
+        """Convert many amounts into one target currency in a single pass.
+
+        Args:
+            amounts (array-like): Amounts to convert.
+            currencies (array-like): Currency code of each amount.
+            target (str): Currency to convert into.
+
+        Returns:
+            numpy.ndarray: Converted amounts as float64.
+        """
+        snapshot = self.snapshot()
+        amounts = np.asarray(amounts, dtype=np.float64)
+        codes, inverse = np.unique(np.asarray(currencies), return_inverse=True)
+        positions = np.array([snapshot.position(str(code)) for code in codes], dtype=np.intp)
+        factors = snapshot.rates[snapshot.position(target)] / snapshot.rates[positions]
+        return amounts * factors[inverse.reshape(amounts.shape)]
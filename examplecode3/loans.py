@@ -0,0 +1,145 @@
+import threading
+
+import numpy as np
+
+# Logistic default model over standardized applicant features.
+RISK_WEIGHTS = {
+    "credit_score": -0.012,     # per point above 650
+    "debt_to_income": 4.0,      # per unit of DTI ratio above 0.35
+    "loan_to_income": 1.5,      # per unit of amount / annual income above 0.5
+    "term_years": 0.08,         # per year of term
+}
+RISK_INTERCEPT = -2.5
+APPROVAL_THRESHOLD = 0.2
+BASE_RATE = 0.05
+RISK_SPREAD = 0.4
+
+
+def score_applications(credit_score, annual_income, debt_to_income, amount, term_months,
+                       approval_threshold=APPROVAL_THRESHOLD):
+    """Score a batch of loan applications in one vectorized pass.
+
+    Args:
+        credit_score (array-like): Bureau scores (300-850).
+        annual_income (array-like): Annual income in the loan currency.
+        debt_to_income (array-like): Existing debt payments / income.
+        amount (array-like): Requested principal.
+        term_months (array-like): Requested term.
+        approval_threshold (float): Highest default probability approved.
+
+    Returns:
+        dict: Arrays of probability_of_default, approved and interest_rate.
+    """
+    credit_score = np.asarray(credit_score, dtype=np.float64)
+    income = np.maximum(np.asarray(annual_income, dtype=np.float64), 1.0)
+    z = (RISK_INTERCEPT
+         + RISK_WEIGHTS["credit_score"] * (credit_score - 650.0)
+         + RISK_WEIGHTS["debt_to_income"] * (np.asarray(debt_to_income, dtype=np.float64) - 0.35)
+         + RISK_WEIGHTS["loan_to_income"] * (np.asarray(amount, dtype=np.float64) / income - 0.5)
+         + RISK_WEIGHTS["term_years"] * np.asarray(term_months, dtype=np.float64) / 12.0)
+    probability = 1.0 / (1.0 + np.exp(-z))
+    return {
+        "probability_of_default": probability,
+        "approved": probability <= approval_threshold,
+        "interest_rate": BASE_RATE + RISK_SPREAD * probability,
+    }
+
+
+def amortization_schedule(principal, annual_rate, term_months):
+    """Full level-payment schedule as arrays indexed by installment.
+
+    Returns:
+        dict: payment (float) plus interest, principal and balance arrays,
+            where balance[k] is what is owed after installment k.
+    """
+    r = annual_rate / 12.0
+    k = np.arange(1, term_months + 1, dtype=np.float64)
+    if r == 0:
+        payment = principal / term_months
+        balance = principal - payment * k
+    else:
+        growth = (1.0 + r) ** k
+        payment = principal * r / (1.0 - (1.0 + r) ** -term_months)
+        balance = principal * growth - payment * (growth - 1.0) / r
+    balance[-1] = 0.0
+    previous = np.concatenate(([principal], balance[:-1]))
+    interest = previous * r
+    principal_paid = previous - balance
+    return {
+        "payment": float(payment),
+        "interest": interest,
+        "principal": principal_paid,
+        "balance": balance,
+        "installments": interest + principal_paid,
+    }
+
+
+class _BookEntry:
+    __slots__ = ("schedule", "cumulative_due", "next_installment", "paid_total")
+
+    def __init__(self, schedule):
+        self.schedule = schedule
+        # cumulative_due[k] = everything owed up to and including installment k.
+        self.cumulative_due = np.cumsum(schedule["installments"])
+        self.next_installment = 0
+        self.paid_total = 0.0
+
+
+class LoanBook:
+    """Approved loans with their amortization schedules cached.
+
+    Schedules are computed once at approval together with the running total
+    due after each installment. A payment adds to the loan's total paid and
+    finds the next open installment with one binary search over those
+    totals, however many installments it settles.
+    """
+
+    def __init__(self):
+        self._loans = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, loan_id):
+        return loan_id in self._loans
+
+    def add(self, loan_id, principal, annual_rate, term_months):
+        schedule = amortization_schedule(principal, annual_rate, term_months)
+        with self._lock:
+            self._loans[loan_id] = _BookEntry(schedule)
+        return schedule
+
+    def schedule(self, loan_id):
+        return self._loans[loan_id].schedule
+
+    def outstanding(self, loan_id):
+        entry = self._loans[loan_id]
+        return float(max(entry.cumulative_due[-1] - entry.paid_total, 0.0))
+
+    def remaining_installments(self, loan_id):
+        entry = self._loans[loan_id]
+        return len(entry.schedule["installments"]) - entry.next_installment
+
+    def apply_payment(self, loan_id, amount):
+        """Apply a payment against the cached schedule.
+
+        Returns:
+            dict: installments_settled, next_installment, outstanding,
+                paid_off and any overpayment beyond the final installment.
+        """
+        with self._lock:
+            entry = self._loans[loan_id]
+            cumulative_due = entry.cumulative_due
+            paid_total = entry.paid_total + amount
+            start = entry.next_installment
+            # Tolerate float rounding, which grows with the running totals, so an exactly paid
+            # installment is not left open.
+            tolerance = 1e-9 * (1.0 + cumulative_due[-1])
+            entry.next_installment = int(np.searchsorted(cumulative_due, paid_total + tolerance, side="right"))
+            paid_off = entry.next_installment == len(cumulative_due)
+            entry.paid_total = float(cumulative_due[-1]) if paid_off else paid_total
+            return {
+                "installments_settled": entry.next_installment - start,
+                "next_installment": entry.next_installment,
+                "outstanding": self.outstanding(loan_id),
+                "paid_off": paid_off,
+                "overpayment": max(paid_total - float(cumulative_due[-1]), 0.0) if paid_off else 0.0,
+            }
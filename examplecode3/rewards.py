@@ -0,0 +1,125 @@
+import threading
+
+import numpy as np
+
+# Points per unit of spend: card type -> merchant category -> rate ("*" is the fallback).
+DEFAULT_REWARD_RULES = {
+    "standard": {"*": 1.0},
+    "gold": {"dining": 4.0, "groceries": 4.0, "*": 1.0},
+    "platinum": {"travel": 5.0, "dining": 3.0, "*": 1.0},
+}
+
+
+class RewardsEngine:
+    """Card-type x merchant-category rewards compiled into a lookup table.
+
+    The rules are compiled once into a 2-D rate table; the last column holds
+    each card type's fallback rate for categories it has no rule for, and
+    the last row earns nothing for card types without rules. Batch
+    accrual turns arrays of card transactions into points with one fancy
+    index and folds them into running per-card cycle and lifetime totals
+    with a bincount, so closing a billing cycle reads the totals instead of
+    replaying transactions.
+    """
+
+    def __init__(self, rules=None):
+        rules = DEFAULT_REWARD_RULES if rules is None else rules
+        self.card_types = {card_type: i for i, card_type in enumerate(rules)}
+        categories = sorted({category for rates in rules.values() for category in rates if category != "*"})
+        self.categories = {category: i for i, category in enumerate(categories)}
+        fallback = len(categories)
+        # One extra all-zero row for card types without rules, e.g. legacy cards restored from storage.
+        self.unknown_card_type = len(self.card_types)
+        self.table = np.zeros((len(self.card_types) + 1, fallback + 1), dtype=np.float64)
+        for card_type, rates in rules.items():
+            row = self.table[self.card_types[card_type]]
+            row[:] = rates.get("*", 0.0)
+            for category, rate in rates.items():
+                if category != "*":
+                    row[self.categories[category]] = rate
+
+        self.card_index = {}
+        self.card_ids = []
+        self._card_type_of = np.zeros(1024, dtype=np.int32)
+        self._cycle = np.zeros(1024, dtype=np.float64)
+        self._lifetime = np.zeros(1024, dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def register_card(self, card_id, card_type):
+        with self._lock:
+            index = self.card_index.get(card_id)
+            if index is None:
+                index = self.card_index[card_id] = len(self.card_ids)
+                self.card_ids.append(card_id)
+                if index >= len(self._cycle):
+                    grow = len(self._cycle)
+                    self._card_type_of = np.concatenate([self._card_type_of, np.zeros(grow, dtype=np.int32)])
+                    self._cycle = np.concatenate([self._cycle, np.zeros(grow)])
+                    self._lifetime = np.concatenate([self._lifetime, np.zeros(grow)])
+            self._card_type_of[index] = self.card_types.get(card_type, self.unknown_card_type)
+            return index
+
+    def category_codes(self, merchant_categories):
+        fallback = len(self.categories)
+        unique, inverse = np.unique(np.asarray(merchant_categories), return_inverse=True)
+        codes = np.array([self.categories.get(str(category), fallback) for category in unique], dtype=np.intp)
+        return codes[inverse.reshape(-1)]
+
+    def card_codes(self, card_ids):
+        return np.fromiter((self.card_index[card_id] for card_id in card_ids), dtype=np.intp, count=len(card_ids))
+
+    def calculate(self, card_id, amount, merchant_category):
+        row = self._card_type_of[self.card_index[card_id]]
+        column = self.categories.get(merchant_category, len(self.categories))
+        return float(self.table[row, column] * amount)
+
+    def accrue_batch(self, cards, merchant_categories, amounts):
+        """Accrue rewards for a batch of card transactions.
+
+        Args:
+            cards (array-like): Card indices from `register_card` (or card
+                ids, which are mapped to indices first).
+            merchant_categories (array-like): Category of each transaction.
+            amounts (array-like): Transaction amounts.
+
+        Returns:
+            numpy.ndarray: Points earned by each transaction.
+        """
+        cards = np.asarray(cards)
+        if cards.dtype.kind not in "iu":
+            cards = self.card_codes(list(cards))
+        points = self.table[self._card_type_of[cards], self.category_codes(merchant_categories)]
+        points *= np.asarray(amounts, dtype=np.float64)
+        with self._lock:
+            earned = np.bincount(cards, weights=points, minlength=len(self.card_ids))
+            self._cycle[:len(earned)] += earned
+            self._lifetime[:len(earned)] += earned
+        return points
+
+    def accrue(self, card_id, amount, merchant_category):
+        points = self.calculate(card_id, amount, merchant_category)
+        with self._lock:
+            index = self.card_index[card_id]
+            self._cycle[index] += points
+            self._lifetime[index] += points
+        return points
+
+    def restore(self, card_id, cycle_points, lifetime_points):
+        """Set a registered card's running totals, e.g. from storage after a restart."""
+        with self._lock:
+            index = self.card_index[card_id]
+            self._cycle[index] = cycle_points
+            self._lifetime[index] = lifetime_points
+
+    def statement(self, card_id):
+        index = self.card_index[card_id]
+        return {"card_id": card_id, "cycle_points": float(self._cycle[index]),
+                "lifetime_points": float(self._lifetime[index])}
+
+    def close_cycle(self):
+        """End the billing cycle: return points per card and reset cycle totals."""
+        with self._lock:
+            count = len(self.card_ids)
+            cycle = self._cycle[:count].copy()
+            self._cycle[:count] = 0.0
+        return dict(zip(self.card_ids, cycle.tolist()))
@@ -0,0 +1,344 @@
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from collections.abc import MutableMapping
+from datetime import datetime
+from operator import attrgetter
+
+import numpy as np
+
+MAGIC = b"EBSSNAP\0"
+VERSION = 1
+_HEADER = struct.Struct("<8sI4x")
+_FOOTER = struct.Struct("<QQ8s")
+_CHUNK = 65536
+
+# Column kinds: "code" is fixed-width ASCII (ids and short enumerations, binary
+# searchable in place), "text" and "json" are variable length (offsets + blob),
+# "f8" / "i8" are native numbers and "time" is a datetime stored as a timestamp.
+SCHEMA = {
+    "customers": [("customer_id", "code"), ("first_name", "text"), ("last_name", "text"), ("dob", "text"),
+                  ("address", "text"), ("contact_info", "json"), ("id_documents", "json"),
+                  ("kyc_status", "code"), ("created_at", "time")],
+    "accounts": [("account_id", "code"), ("customer_id", "code"), ("account_type", "code"),
+                 ("currency", "code"), ("balance", "f8"), ("created_at", "time")],
+    "credit_cards": [("card_id", "code"), ("customer_id", "code"), ("card_type", "code"),
+                     ("credit_limit", "f8"), ("balance", "f8"), ("currency", "code"), ("cycle_points", "f8"),
+                     ("lifetime_points", "f8")],
+    "loans": [("loan_id", "code"), ("customer_id", "code"), ("loan_type", "code"), ("amount", "f8"),
+              ("currency", "code"), ("term_months", "i8"), ("status", "code"), ("interest_rate", "f8"),
+              ("repaid", "f8")],
+}
+
+
+class SnapshotFormatError(Exception):
+    pass
+
+
+class _Writer:
+    def __init__(self, handle):
+        self.handle = handle
+
+    def align(self):
+        padding = -self.handle.tell() % 8
+        if padding:
+            self.handle.write(b"\0" * padding)
+
+    def array(self, values):
+        self.align()
+        offset = self.handle.tell()
+        self.handle.write(np.ascontiguousarray(values).tobytes())
+        return {"offset": offset, "dtype": values.dtype.str, "count": len(values)}
+
+    def column(self, kind, values):
+        if kind == "code":
+            return self.array(np.array(values, dtype="S"))
+        if kind == "f8":
+            return self.array(np.array([math.nan if value is None else value for value in values], dtype="<f8"))
+        if kind == "i8":
+            return self.array(np.array(values, dtype="<i8"))
+        if kind == "time":
+            return self.array(np.array([value.timestamp() for value in values], dtype="<f8"))
+        # Variable-length values are streamed a chunk at a time; only the offsets stay in memory.
+        encode = (lambda value: json.dumps(value, default=str)) if kind == "json" else str
+        blob_offset = self.handle.tell()
+        lengths = []
+        for start in range(0, len(values), _CHUNK):
+            encoded = [encode(value).encode("utf-8") for value in values[start:start + _CHUNK]]
+            lengths.extend(map(len, encoded))
+            self.handle.write(b"".join(encoded))
+        offsets = np.zeros(len(values) + 1, dtype="<u8")
+        np.cumsum(lengths, out=offsets[1:])
+        return {"blob_offset": blob_offset, "offsets": self.array(offsets)}
+
+
+def write_snapshot(path, sections, metadata=None, access_control=None):
+    """Write bank state as a versioned, memory-mappable snapshot.
+
+    Every section is stored column by column, sorted by its id, so a reader
+    can binary-search ids in place without loading anything. Sections with
+    a customer_id also carry a customer-ordered index so a customer's
+    accounts, cards and loans are found the same way. Columns are written
+    one at a time, and variable-length columns in chunks, so the writer
+    never holds more than one encoded column in memory.
+
+    The file is written next to `path` and renamed over it once it is on
+    disk, so a crash never leaves a truncated snapshot behind and readers
+    already mapping the old snapshot keep their copy.
+
+    Args:
+        path (str): Snapshot file to create.
+        sections (dict): Section name (a SCHEMA key) -> id -> entity mapping.
+        metadata (dict): JSON-serializable values stored alongside the data.
+        access_control (dict): Role definitions (AccessControl.roles).
+
+    Returns:
+        dict: Entity count per section.
+    """
+    toc = {"version": VERSION, "metadata": metadata or {}, "access_control": access_control or {},
+           "sections": {}}
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as handle:
+            _write_sections(handle, toc, sections)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return {name: section["count"] for name, section in toc["sections"].items()}
+
+
+def _write_sections(handle, toc, sections):
+    handle.write(_HEADER.pack(MAGIC, VERSION))
+    writer = _Writer(handle)
+    for name, entities in sections.items():
+        columns = SCHEMA[name]
+        key_field = columns[0][0]
+        items = list(entities.items())
+        order = np.argsort(np.array([key for key, _ in items], dtype="S"), kind="stable")
+        objects = [items[i][1] for i in order.tolist()]
+        section = {"count": len(objects), "key": key_field, "columns": {}}
+        for field, kind in columns:
+            values = list(map(attrgetter(field), objects))
+            section["columns"][field] = dict(kind=kind, **writer.column(kind, values))
+        if "customer_id" in section["columns"] and key_field != "customer_id":
+            customers = np.array(list(map(attrgetter("customer_id"), objects)), dtype="S")
+            by_customer = np.argsort(customers, kind="stable")
+            section["by_customer"] = writer.array(by_customer.astype("<i8"))
+            section["by_customer_key"] = writer.array(customers[by_customer])
+        toc["sections"][name] = section
+    writer.align()
+    toc_offset = handle.tell()
+    encoded = json.dumps(toc).encode("utf-8")
+    handle.write(encoded)
+    handle.write(_FOOTER.pack(toc_offset, len(encoded), MAGIC))
+
+
+class SnapshotSection:
+    """One memory-mapped section. Nothing is decoded until a row is read."""
+
+    def __init__(self, buffer, spec):
+        self._buffer = buffer
+        self.count = spec["count"]
+        self.key = spec["key"]
+        self._specs = spec["columns"]
+        self._columns = {}
+        self._keys = self._array(self._specs[self.key])
+        self._by_customer = self._array(spec["by_customer"]) if "by_customer" in spec else None
+        self._by_customer_key = self._array(spec["by_customer_key"]) if "by_customer_key" in spec else None
+
+    def _array(self, spec):
+        return np.frombuffer(self._buffer, dtype=spec["dtype"], count=spec["count"], offset=spec["offset"])
+
+    def _column(self, field):
+        column = self._columns.get(field)
+        if column is None:
+            spec = self._specs[field]
+            if spec["kind"] in ("text", "json"):
+                column = (spec["blob_offset"], self._array(spec["offsets"]))
+            else:
+                column = self._array(spec)
+            self._columns[field] = column
+        return column
+
+    @staticmethod
+    def _search(keys, key):
+        key = key.encode("ascii")
+        if len(key) > keys.dtype.itemsize:
+            return None
+        return key, int(np.searchsorted(keys, key))
+
+    def find(self, key):
+        """Row number of `key`, or None."""
+        found = self._search(self._keys, key)
+        if found is None:
+            return None
+        key, row = found
+        return row if row < self.count and self._keys[row] == key else None
+
+    def rows_for_customer(self, customer_id):
+        if self._by_customer is None:
+            return []
+        found = self._search(self._by_customer_key, customer_id)
+        if found is None:
+            return []
+        key, first = found
+        last = int(np.searchsorted(self._by_customer_key, key, side="right"))
+        return self._by_customer[first:last].tolist()
+
+    def value(self, field, row):
+        kind = self._specs[field]["kind"]
+        column = self._column(field)
+        if kind in ("text", "json"):
+            blob_offset, offsets = column
+            raw = self._buffer[blob_offset + int(offsets[row]):blob_offset + int(offsets[row + 1])]
+            text = raw.decode("utf-8")
+            return json.loads(text) if kind == "json" else text
+        value = column[row]
+        if kind == "code":
+            return value.decode("ascii")
+        if kind == "time":
+            return datetime.fromtimestamp(float(value))
+        if kind == "i8":
+            return int(value)
+        value = float(value)
+        return None if math.isnan(value) else value
+
+    def row(self, row):
+        return {field: self.value(field, row) for field in self._specs}
+
+    def keys(self):
+        for start in range(0, self.count, _CHUNK):
+            for key in self._keys[start:start + _CHUNK].tolist():
+                yield key.decode("ascii")
+
+
+class SnapshotReader:
+    """Memory-mapped snapshot. Opening it reads only the table of contents."""
+
+    def __init__(self, path):
+        with open(path, "rb") as handle:
+            self._buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buffer) < _HEADER.size + _FOOTER.size:
+            raise SnapshotFormatError(f"{path} is not a bank snapshot")
+        magic, version = _HEADER.unpack_from(self._buffer, 0)
+        toc_offset, toc_length, end_magic = _FOOTER.unpack_from(self._buffer, len(self._buffer) - _FOOTER.size)
+        if magic != MAGIC or end_magic != MAGIC:
+            raise SnapshotFormatError(f"{path} is not a bank snapshot (or was not completely written)")
+        if version != VERSION:
+            raise SnapshotFormatError(f"Unsupported snapshot version {version}")
+        toc = json.loads(self._buffer[toc_offset:toc_offset + toc_length])
+        self.metadata = toc["metadata"]
+        self.access_control = toc["access_control"]
+        self.sections = {name: SnapshotSection(self._buffer, spec) for name, spec in toc["sections"].items()}
+
+
+class LazyMapping(MutableMapping):
+    """id -> entity mapping backed by a snapshot section.
+
+    Entities are built by `factory(row_dict)` the first time they are read
+    and kept from then on, so restored state is served immediately and only
+    what is touched is ever decoded. New and updated entities live in the
+    in-memory overlay like in a plain dict.
+    """
+
+    def __init__(self, section, factory):
+        self._section = section
+        self._factory = factory
+        self._overlay = {}
+        self._deleted = set()
+        self._added = 0
+        self._lock = threading.RLock()
+
+    def _snapshot_row(self, key):
+        if key in self._deleted:
+            return None
+        return self._section.find(key)
+
+    def __getitem__(self, key):
+        entity = self._overlay.get(key)
+        if entity is not None:
+            return entity
+        with self._lock:
+            entity = self._overlay.get(key)
+            if entity is None:
+                row = self._snapshot_row(key)
+                if row is None:
+                    raise KeyError(key)
+                entity = self._factory(self._section.row(row))
+                self._overlay[key] = entity
+            return entity
+
+    def load(self, key):
+        """Build the entity for `key` now, for its side effects, if it has not been built yet."""
+        return self[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._overlay or self._snapshot_row(key) is not None
+
+    def __setitem__(self, key, entity):
+        with self._lock:
+            if key not in self._overlay and self._snapshot_row(key) is None:
+                self._added += 1
+            self._overlay[key] = entity
+
+    def __delitem__(self, key):
+        with self._lock:
+            in_snapshot = self._snapshot_row(key) is not None
+            if key not in self._overlay and not in_snapshot:
+                raise KeyError(key)
+            self._overlay.pop(key, None)
+            if in_snapshot:
+                self._deleted.add(key)
+            else:
+                self._added -= 1
+
+    def __iter__(self):
+        for key in self._section.keys():
+            if key not in self._deleted:
+                yield key
+        for key in list(self._overlay):
+            if self._section.find(key) is None:
+                yield key
+
+    def __len__(self):
+        return self._section.count - len(self._deleted) + self._added
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from types import SimpleNamespace
+
+    count = 1_000_000
+    now = datetime.now()
+    accounts = {f"ACC{i:08d}": SimpleNamespace(account_id=f"ACC{i:08d}", customer_id=f"CUST{i // 2:08d}",
+                                               account_type="checking", currency="USD", balance=float(i),
+                                               created_at=now) for i in range(count)}
+    path = os.path.join(tempfile.mkdtemp(), "bank.snap")
+    started = time.perf_counter()
+    write_snapshot(path, {"accounts": accounts})
+    print(f"write {count:,} accounts: {time.perf_counter() - started:.2f}s "
+          f"({os.path.getsize(path) / count:.0f} bytes/account)")
+
+    started = time.perf_counter()
+    reader = SnapshotReader(path)
+    restored = LazyMapping(reader.sections["accounts"], lambda row: SimpleNamespace(**row))
+    print(f"open: {(time.perf_counter() - started) * 1e3:.1f}ms")
+    started = time.perf_counter()
+    for i in range(100_000):
+        restored[f"ACC{i * 7919 % count:08d}"]
+    print(f"first read: {(time.perf_counter() - started) / 100_000 * 1e6:.1f}us per account")
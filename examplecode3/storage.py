@@ -0,0 +1,454 @@
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+def _customer_row(customer):
+    return (customer.customer_id, customer.first_name, customer.last_name, customer.dob, customer.address,
+            json.dumps(customer.contact_info, default=str), json.dumps(customer.id_documents, default=str),
+            customer.kyc_status, customer.created_at.timestamp())
+
+
+def _account_row(account):
+    return (account.account_id, account.customer_id, account.account_type, account.currency,
+            account.balance, account.created_at.timestamp())
+
+
+def _card_row(card):
+    return (card.card_id, card.customer_id, card.card_type, card.credit_limit, card.balance, card.currency,
+            card.cycle_points, card.lifetime_points)
+
+
+def _loan_row(loan):
+    return (loan.loan_id, loan.customer_id, loan.loan_type, loan.amount, loan.currency, loan.term_months,
+            loan.status, loan.interest_rate, loan.repaid)
+
+
+def _transaction_row(transaction, customer_id):
+    return (transaction.transaction_id, transaction.account_id, transaction.counterparty_account_id,
+            customer_id, transaction.transaction_type, transaction.amount, transaction.currency,
+            transaction.timestamp.timestamp(),
+            transaction.business_date.isoformat() if transaction.business_date is not None else None)
+
+
+CUSTOMER_FIELDS = ("customer_id", "first_name", "last_name", "dob", "address", "contact_info",
+                   "id_documents", "kyc_status", "created_at")
+ACCOUNT_FIELDS = ("account_id", "customer_id", "account_type", "currency", "balance", "created_at")
+CARD_FIELDS = ("card_id", "customer_id", "card_type", "credit_limit", "balance", "currency", "cycle_points",
+               "lifetime_points")
+LOAN_FIELDS = ("loan_id", "customer_id", "loan_type", "amount", "currency", "term_months", "status",
+               "interest_rate", "repaid")
+TRANSACTION_FIELDS = ("transaction_id", "account_id", "counterparty_account_id", "customer_id",
+                      "transaction_type", "amount", "currency", "timestamp", "business_date")
+
+
+def _customer_dict(row):
+    record = dict(zip(CUSTOMER_FIELDS, row))
+    record["contact_info"] = json.loads(record["contact_info"])
+    record["id_documents"] = json.loads(record["id_documents"])
+    return record
+
+
+class DuplicateKeyError(Exception):
+    """A new customer or account reused an id that is already stored."""
+
+
+class StorageBackend:
+    """Persistence interface for EnterpriseBankingSystem.
+
+    The banking system keeps its working set in memory and writes every
+    change through to a backend. Reads return plain dicts keyed by the
+    column names in the *_FIELDS tuples above.
+    """
+
+    def save_customer(self, customer):
+        """Store a new customer; raises DuplicateKeyError if the id is taken."""
+        raise NotImplementedError
+
+    def save_account(self, account):
+        """Store a new account; raises DuplicateKeyError if the id is taken."""
+        raise NotImplementedError
+
+    def save_balances(self, accounts, transactions=()):
+        """Store the accounts' balances and the ledger rows that moved them.
+
+        Args:
+            accounts (list): Accounts whose balance changed.
+            transactions (list): (transaction, customer_id) pairs, written
+                in the same storage transaction as the balances.
+        """
+        raise NotImplementedError
+
+    def save_credit_card(self, card):
+        raise NotImplementedError
+
+    def save_loan(self, loan):
+        raise NotImplementedError
+
+    def append_transaction(self, transaction, customer_id):
+        raise NotImplementedError
+
+    def save_wrapped_key(self, tenant, wrapped):
+        """Persist a tenant's wrapped data key; it must be durable before the key is used."""
+        raise NotImplementedError
+
+    def get_customer(self, customer_id):
+        raise NotImplementedError
+
+    def get_account(self, account_id):
+        raise NotImplementedError
+
+    def accounts_for_customer(self, customer_id):
+        raise NotImplementedError
+
+    def transactions_for_account(self, account_id, limit=100):
+        raise NotImplementedError
+
+    def load(self):
+        """Every stored entity as {"customers", "accounts", "credit_cards", "loans", "transactions"}
+        iterables (transactions in posting order), plus "wrapped_keys", a dict of tenant -> wrapped
+        data key."""
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class InMemoryStorage(StorageBackend):
+    def __init__(self):
+        self._customers = {}
+        self._accounts = {}
+        self._credit_cards = {}
+        self._loans = {}
+        self._transactions = []
+        self._wrapped_keys = {}
+        self._lock = threading.Lock()
+
+    def save_customer(self, customer):
+        with self._lock:
+            if customer.customer_id in self._customers:
+                raise DuplicateKeyError(f"Customer {customer.customer_id} already stored")
+            self._customers[customer.customer_id] = _customer_dict(_customer_row(customer))
+
+    def save_account(self, account):
+        with self._lock:
+            if account.account_id in self._accounts:
+                raise DuplicateKeyError(f"Account {account.account_id} already stored")
+            self._accounts[account.account_id] = dict(zip(ACCOUNT_FIELDS, _account_row(account)))
+
+    def save_balances(self, accounts, transactions=()):
+        with self._lock:
+            for account in accounts:
+                self._accounts[account.account_id]["balance"] = account.balance
+            for transaction, customer_id in transactions:
+                self._transactions.append(dict(zip(TRANSACTION_FIELDS, _transaction_row(transaction, customer_id))))
+
+    def save_credit_card(self, card):
+        self._credit_cards[card.card_id] = dict(zip(CARD_FIELDS, _card_row(card)))
+
+    def save_loan(self, loan):
+        self._loans[loan.loan_id] = dict(zip(LOAN_FIELDS, _loan_row(loan)))
+
+    def append_transaction(self, transaction, customer_id):
+        self._transactions.append(dict(zip(TRANSACTION_FIELDS, _transaction_row(transaction, customer_id))))
+
+    def save_wrapped_key(self, tenant, wrapped):
+        self._wrapped_keys[tenant] = wrapped
+
+    def get_customer(self, customer_id):
+        return self._customers.get(customer_id)
+
+    def get_account(self, account_id):
+        return self._accounts.get(account_id)
+
+    def accounts_for_customer(self, customer_id):
+        return [record for record in self._accounts.values() if record["customer_id"] == customer_id]
+
+    def transactions_for_account(self, account_id, limit=100):
+        matches = [record for record in self._transactions if record["account_id"] == account_id]
+        return matches[::-1][:limit]
+
+    def load(self):
+        return {
+            "customers": list(self._customers.values()),
+            "accounts": list(self._accounts.values()),
+            "credit_cards": list(self._credit_cards.values()),
+            "loans": list(self._loans.values()),
+            "transactions": list(self._transactions),
+            "wrapped_keys": dict(self._wrapped_keys),
+        }
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY, first_name TEXT, last_name TEXT, dob TEXT, address TEXT,
+    contact_info TEXT, id_documents TEXT, kyc_status TEXT, created_at REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id TEXT PRIMARY KEY, customer_id TEXT NOT NULL, account_type TEXT, currency TEXT,
+    balance REAL NOT NULL, created_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS accounts_by_customer ON accounts (customer_id);
+CREATE TABLE IF NOT EXISTS credit_cards (
+    card_id TEXT PRIMARY KEY, customer_id TEXT NOT NULL, card_type TEXT, credit_limit REAL, balance REAL,
+    currency TEXT NOT NULL DEFAULT 'USD', cycle_points REAL NOT NULL DEFAULT 0,
+    lifetime_points REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS credit_cards_by_customer ON credit_cards (customer_id);
+CREATE TABLE IF NOT EXISTS loans (
+    loan_id TEXT PRIMARY KEY, customer_id TEXT NOT NULL, loan_type TEXT, amount REAL, currency TEXT,
+    term_months INTEGER, status TEXT, interest_rate REAL, repaid REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS loans_by_customer ON loans (customer_id);
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY, transaction_id TEXT, account_id TEXT NOT NULL, counterparty_account_id TEXT,
+    customer_id TEXT, transaction_type TEXT, amount REAL, currency TEXT, timestamp REAL, business_date TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_by_account ON transactions (account_id, seq);
+CREATE INDEX IF NOT EXISTS transactions_by_customer ON transactions (customer_id, seq);
+CREATE TABLE IF NOT EXISTS wrapped_keys (tenant TEXT PRIMARY KEY, wrapped BLOB NOT NULL) WITHOUT ROWID;
+"""
+
+# Columns added after the first release, in the order they were added, with the value older rows get.
+ADDED_COLUMNS = [
+    ("credit_cards", "currency", "TEXT NOT NULL DEFAULT 'USD'"),
+    ("credit_cards", "cycle_points", "REAL NOT NULL DEFAULT 0"),
+    ("credit_cards", "lifetime_points", "REAL NOT NULL DEFAULT 0"),
+    ("loans", "repaid", "REAL NOT NULL DEFAULT 0"),
+    ("transactions", "business_date", "TEXT"),
+]
+
+# Customers and accounts are only ever created, so a reused id fails instead of replacing a row.
+INSERT_CUSTOMER = f"INSERT INTO customers VALUES ({', '.join('?' * len(CUSTOMER_FIELDS))})"
+INSERT_ACCOUNT = f"INSERT INTO accounts VALUES ({', '.join('?' * len(ACCOUNT_FIELDS))})"
+UPSERT_CARD = f"INSERT OR REPLACE INTO credit_cards VALUES ({', '.join('?' * len(CARD_FIELDS))})"
+UPSERT_LOAN = f"INSERT OR REPLACE INTO loans VALUES ({', '.join('?' * len(LOAN_FIELDS))})"
+INSERT_WRAPPED_KEY = "INSERT INTO wrapped_keys VALUES (?, ?)"
+UPDATE_BALANCE = "UPDATE accounts SET balance = ? WHERE account_id = ?"
+INSERT_TRANSACTION = (f"INSERT INTO transactions ({', '.join(TRANSACTION_FIELDS)}) "
+                      f"VALUES ({', '.join('?' * len(TRANSACTION_FIELDS))})")
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite backend tuned for a high posting rate.
+
+    The database runs in WAL mode so readers never block the writer. Entity
+    changes (customers, accounts, cards, loans) are committed immediately.
+    Postings are buffered: transaction rows and the latest balance of each
+    touched account are written with executemany in one transaction every
+    `batch_size` postings, so the per-posting cost is an append to a list,
+    and a background thread flushes whatever is buffered every
+    `flush_interval` seconds, so a quiet period never leaves postings
+    unwritten for long. Reads go through a small pool of read-only connections and flush the
+    buffer first, so a caller always reads its own writes. Statements are
+    module constants, so sqlite3's statement cache prepares each one once
+    per connection.
+
+    Args:
+        path (str): Database file. WAL needs a real file, so ":memory:" is
+            not supported; use InMemoryStorage instead.
+        pool_size (int): Reader connections.
+        batch_size (int): Postings buffered before an automatic flush.
+        flush_interval (float): Longest a posting stays buffered; None
+            flushes only on batch_size, reads and close().
+    """
+
+    def __init__(self, path, pool_size=4, batch_size=1000, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self._writer = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        self._writer.executescript(SCHEMA)
+        for table, column, definition in ADDED_COLUMNS:
+            if column not in [row[1] for row in self._writer.execute(f"PRAGMA table_info({table})")]:
+                self._writer.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        self._write_lock = threading.Lock()
+        self._pending_transactions = []
+        self._pending_balances = {}
+        self._readers = queue.Queue()
+        for _ in range(pool_size):
+            reader = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            reader.execute("PRAGMA query_only=ON")
+            self._readers.put(reader)
+        self._pool_size = pool_size
+        self._closed = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, args=(flush_interval,),
+                                             name="storage-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # the rows stay buffered and are retried on the next flush
+
+    def _execute(self, sql, params):
+        with self._write_lock:
+            self._writer.execute(sql, params)
+
+    def save_customer(self, customer):
+        try:
+            self._execute(INSERT_CUSTOMER, _customer_row(customer))
+        except sqlite3.IntegrityError:
+            raise DuplicateKeyError(f"Customer {customer.customer_id} already stored") from None
+
+    def save_account(self, account):
+        try:
+            self._execute(INSERT_ACCOUNT, _account_row(account))
+        except sqlite3.IntegrityError:
+            raise DuplicateKeyError(f"Account {account.account_id} already stored") from None
+
+    def save_credit_card(self, card):
+        self._execute(UPSERT_CARD, _card_row(card))
+
+    def save_loan(self, loan):
+        self._execute(UPSERT_LOAN, _loan_row(loan))
+
+    def save_wrapped_key(self, tenant, wrapped):
+        self._execute(INSERT_WRAPPED_KEY, (tenant, wrapped))
+
+    def save_balances(self, accounts, transactions=()):
+        with self._write_lock:
+            for account in accounts:
+                self._pending_balances[account.account_id] = account.balance
+            for transaction, customer_id in transactions:
+                self._pending_transactions.append(_transaction_row(transaction, customer_id))
+            if len(self._pending_transactions) >= self.batch_size:
+                self._flush_locked()
+
+    def append_transaction(self, transaction, customer_id):
+        with self._write_lock:
+            self._pending_transactions.append(_transaction_row(transaction, customer_id))
+            if len(self._pending_transactions) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending_transactions and not self._pending_balances:
+            return
+        self._writer.execute("BEGIN")
+        try:
+            self._writer.executemany(INSERT_TRANSACTION, self._pending_transactions)
+            self._writer.executemany(UPDATE_BALANCE, ((balance, account_id) for account_id, balance
+                                                      in self._pending_balances.items()))
+        except BaseException:
+            self._writer.execute("ROLLBACK")
+            raise
+        self._writer.execute("COMMIT")
+        self._pending_transactions = []
+        self._pending_balances = {}
+
+    def flush(self):
+        with self._write_lock:
+            self._flush_locked()
+
+    @contextmanager
+    def _reader(self):
+        if self._pending_transactions or self._pending_balances:
+            self.flush()
+        reader = self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put(reader)
+
+    def get_customer(self, customer_id):
+        with self._reader() as reader:
+            row = reader.execute("SELECT * FROM customers WHERE customer_id = ?", (customer_id,)).fetchone()
+        return _customer_dict(row) if row else None
+
+    def get_account(self, account_id):
+        with self._reader() as reader:
+            row = reader.execute("SELECT * FROM accounts WHERE account_id = ?", (account_id,)).fetchone()
+        return dict(zip(ACCOUNT_FIELDS, row)) if row else None
+
+    def accounts_for_customer(self, customer_id):
+        with self._reader() as reader:
+            rows = reader.execute("SELECT * FROM accounts WHERE customer_id = ?", (customer_id,)).fetchall()
+        return [dict(zip(ACCOUNT_FIELDS, row)) for row in rows]
+
+    def transactions_for_account(self, account_id, limit=100):
+        with self._reader() as reader:
+            rows = reader.execute(
+                f"SELECT {', '.join(TRANSACTION_FIELDS)} FROM transactions "
+                "WHERE account_id = ? ORDER BY seq DESC LIMIT ?", (account_id, limit)).fetchall()
+        return [dict(zip(TRANSACTION_FIELDS, row)) for row in rows]
+
+    def _stream(self, sql, make_record):
+        # A dedicated connection per table, so streaming a large table does not hold a pooled reader;
+        # it is closed once the rows are consumed or the generator is discarded.
+        reader = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            for row in reader.execute(sql):
+                yield make_record(row)
+        finally:
+            reader.close()
+
+    def load(self):
+        self.flush()
+        with self._reader() as reader:
+            wrapped_keys = dict(reader.execute("SELECT tenant, wrapped FROM wrapped_keys"))
+        return {
+            "customers": self._stream("SELECT * FROM customers", _customer_dict),
+            "accounts": self._stream("SELECT * FROM accounts", lambda row: dict(zip(ACCOUNT_FIELDS, row))),
+            "credit_cards": self._stream("SELECT * FROM credit_cards", lambda row: dict(zip(CARD_FIELDS, row))),
+            "loans": self._stream("SELECT * FROM loans", lambda row: dict(zip(LOAN_FIELDS, row))),
+            "transactions": self._stream(f"SELECT {', '.join(TRANSACTION_FIELDS)} FROM transactions ORDER BY seq",
+                                         lambda row: dict(zip(TRANSACTION_FIELDS, row))),
+            "wrapped_keys": wrapped_keys,
+        }
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        for _ in range(self._pool_size):
+            self._readers.get().close()
+        self._writer.close()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    directory = tempfile.mkdtemp()
+    storage = SQLiteStorage(os.path.join(directory, "bank.db"))
+    accounts = [SimpleNamespace(account_id=f"ACC{i}", customer_id=f"CUST{i % 1000}", account_type="checking",
+                                currency="USD", balance=0.0, created_at=datetime.now()) for i in range(100_000)]
+    with storage._write_lock:
+        storage._writer.execute("BEGIN")
+        storage._writer.executemany(INSERT_ACCOUNT, map(_account_row, accounts))
+        storage._writer.execute("COMMIT")
+
+    count = 200_000
+    now = datetime.now()
+    started = time.perf_counter()
+    for i in range(count):
+        account = accounts[i % len(accounts)]
+        account.balance += 1.0
+        storage.save_balances([account], [(SimpleNamespace(transaction_id=f"TRANS{i}", account_id=account.account_id,
+                                                           counterparty_account_id=None, transaction_type="deposit",
+                                                           amount=1.0, currency="USD", timestamp=now,
+                                                           business_date=None),
+                                           account.customer_id)])
+    storage.flush()
+    elapsed = time.perf_counter() - started
+    print(f"postings: {count / elapsed:,.0f}/s")
+
+    started = time.perf_counter()
+    for i in range(10_000):
+        storage.get_account(f"ACC{i * 7 % len(accounts)}")
+    print(f"point lookup: {(time.perf_counter() - started) / 10_000 * 1e6:.1f}us")
+    storage.close()
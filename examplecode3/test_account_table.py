@@ -0,0 +1,82 @@
+import unittest
+from datetime import datetime
+from account_table import AccountTable
+from banking_core import EnterpriseBankingSystem, AccessControl, Account
+
+
+class TestAccountTable(unittest.TestCase):
+    def setUp(self):
+        self.table = AccountTable()
+        self.table["ACC1"] = Account("ACC1", "CUST1", "checking", "USD", 100.25)
+        self.table["ACC2"] = Account("ACC2", "CUST1", "savings", "JPY", 5000)
+
+    def test_proxy_attributes(self):
+        account = self.table["ACC1"]
+        self.assertEqual((account.account_id, account.customer_id, account.account_type, account.currency),
+                         ("ACC1", "CUST1", "checking", "USD"))
+        self.assertEqual(account.balance, 100.25)
+        self.assertIsInstance(account.created_at, datetime)
+        self.assertEqual(self.table.balance_minor(0), 10025)
+        self.assertEqual(self.table.balance_minor(1), 5000)
+
+    def test_balance_updates_are_exact(self):
+        account = self.table["ACC1"]
+        for _ in range(10):
+            account.balance = account.balance + 0.1
+        self.assertEqual(account.balance, 101.25)
+        self.assertEqual(self.table.get("ACC1").balance, 101.25)
+
+    def test_amounts_finer_than_minor_units_are_rejected(self):
+        account = self.table["ACC1"]
+        with self.assertRaises(ValueError):
+            account.balance = 100.255
+        with self.assertRaises(ValueError):
+            self.table["ACC2"] = Account("ACC2", "CUST1", "savings", "JPY", 5000.5)
+        with self.assertRaises(ValueError):
+            self.table["ACC3"] = Account("ACC3", "CUST1", "checking", "USD", 0.001)
+        self.assertEqual((account.balance, self.table["ACC2"].balance), (100.25, 5000.0))
+        self.assertNotIn("ACC3", self.table)
+
+    def test_mapping_protocol(self):
+        self.assertIn("ACC2", self.table)
+        self.assertNotIn("ACC3", self.table)
+        self.assertNotIn("ACCÜ", self.table)
+        self.assertIsNone(self.table.get("ACC3"))
+        self.assertEqual(list(self.table), ["ACC1", "ACC2"])
+        with self.assertRaises(KeyError):
+            self.table["ACC3"]
+        with self.assertRaises(ValueError):
+            self.table["ACC" + "9" * 20] = Account("ACC9", "CUST1", "checking", "USD")
+
+    def test_grows_past_chunk_and_index(self):
+        for i in range(200_000):
+            self.table[f"X{i}"] = Account(f"X{i}", f"C{i % 7}", "checking", "USD", i)
+        self.assertEqual(len(self.table), 200_002)
+        self.assertEqual(self.table["X199999"].balance, 199999.0)
+        self.assertEqual(self.table["X65536"].customer_id, "C2")
+        self.assertEqual(sum(len(columns["balance_minor"]) for _, columns in self.table.chunks()), 200_002)
+
+
+class TestCompactBank(unittest.TestCase):
+    def test_postings_on_compact_accounts(self):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", compact_accounts=True)
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["register_customer", "create_account", "process_transfer"])
+        bank._access_control = access_control
+        customer_id = bank.register_customer({
+            "first_name": "John", "last_name": "Doe", "dob": "1990-01-01", "address": "123 Main St",
+            "contact_info": "john@example.com", "id_documents": {"passport": "ABC123"}}, "user1")
+        source = bank.create_account(customer_id, "checking", "USD", 100.0, "user1")
+        destination = bank.create_account(customer_id, "savings", "USD", 0.0, "user1")
+        bank.process_transfer(source, destination, 30.5, "USD", {}, "user1")
+        self.assertIsInstance(bank._accounts, AccountTable)
+        self.assertEqual(bank._accounts[source].balance, 69.5)
+        self.assertEqual(bank._dashboards.get(customer_id)["accounts"][destination]["balance"], 30.5)
+        # Amounts are rounded once to cents, and the ledger records what was posted.
+        transaction = bank.process_transfer(source, destination, 0.125, "USD", {}, "user1")
+        self.assertEqual(transaction.amount, 0.12)
+        self.assertEqual(bank._accounts[source].balance, 69.38)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from aml_monitor import TransferGraph
+from banking_core import EnterpriseBankingSystem
+
+T0 = 1_700_000_000.0
+
+
+class TestTransferGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = TransferGraph(bucket_seconds=60, retention_buckets=10, round_trip_seconds=300)
+
+    def test_plain_transfer_raises_no_alert(self):
+        self.assertEqual(self.graph.record_transfer("A", "B", 50.0, T0), [])
+        self.assertEqual(self.graph.counterparties("A"), ["B"])
+        self.assertEqual(self.graph.edge_count, 1)
+
+    def test_structuring(self):
+        alerts = []
+        for i in range(3):
+            alerts += self.graph.record_transfer("A", f"B{i}", 9500.0, T0 + i)
+        self.assertEqual([a.kind for a in alerts], ["structuring"])
+        self.assertEqual(alerts[0].account_id, "A")
+
+    def test_amounts_over_threshold_are_not_structuring(self):
+        for i in range(5):
+            self.assertEqual(self.graph.record_transfer("A", f"B{i}", 12000.0, T0 + i), [])
+
+    def test_round_trip(self):
+        self.graph.record_transfer("A", "B", 100.0, T0)
+        alerts = self.graph.record_transfer("B", "A", 100.0, T0 + 30)
+        self.assertEqual([a.kind for a in alerts], ["round_trip"])
+        self.assertEqual(alerts[0].details["counterparty"], "A")
+
+    def test_short_cycle(self):
+        self.graph.record_transfer("A", "B", 100.0, T0)
+        self.graph.record_transfer("B", "C", 100.0, T0 + 1)
+        alerts = self.graph.record_transfer("C", "A", 100.0, T0 + 2)
+        self.assertEqual([a.kind for a in alerts], ["cycle"])
+        self.assertEqual(alerts[0].details["path"], ["C", "A", "B", "C"])
+
+    def test_cycle_longer_than_limit_is_ignored(self):
+        graph = TransferGraph(max_cycle_length=3)
+        for src, dst in [("A", "B"), ("B", "C"), ("C", "D")]:
+            graph.record_transfer(src, dst, 100.0, T0)
+        self.assertEqual(graph.record_transfer("D", "A", 100.0, T0), [])
+
+    def test_expiry_drops_old_buckets(self):
+        self.graph.record_transfer("A", "B", 9500.0, T0)
+        self.graph.record_transfer("A", "C", 9500.0, T0)
+        self.graph.record_transfer("X", "Y", 10.0, T0 + 60 * 11)
+        self.assertEqual(self.graph.counterparties("A"), [])
+        self.assertEqual(self.graph.edge_count, 1)
+        # Near-threshold history expired with the bucket, so no structuring alert.
+        self.assertEqual(self.graph.record_transfer("A", "D", 9500.0, T0 + 60 * 11), [])
+        # Round trips against expired edges are not reported either.
+        self.assertEqual(self.graph.record_transfer("B", "A", 10.0, T0 + 60 * 11), [])
+
+    def test_transfer_older_than_retention_is_dropped(self):
+        self.graph.record_transfer("A", "B", 10.0, T0 + 60 * 20)
+        self.assertEqual(self.graph.record_transfer("C", "D", 10.0, T0), [])
+        self.assertEqual(self.graph.edge_count, 1)
+
+    def test_self_transfer_is_not_a_round_trip(self):
+        self.assertEqual(self.graph.record_transfer("A", "A", 100.0, T0), [])
+        self.assertEqual(self.graph.record_transfer("A", "A", 100.0, T0 + 1), [])
+
+    def test_expired_edge_slots_are_reused(self):
+        self.graph.record_transfer("A", "B", 10.0, T0)
+        self.graph.record_transfer("A", "C", 10.0, T0)
+        self.graph.record_transfer("C", "D", 10.0, T0 + 60 * 11)
+        self.graph.record_transfer("B", "D", 10.0, T0 + 60 * 11)
+        self.assertEqual(len(self.graph._edge_src), 2)
+        self.assertEqual(self.graph.counterparties("A"), [])
+        self.assertEqual(self.graph.counterparties("C"), ["D"])
+        self.assertEqual(self.graph.counterparties("B"), ["D"])
+
+    def test_alerts_for_tracks_evicted_alerts(self):
+        graph = TransferGraph(max_alerts=3)
+        for i in range(4):
+            graph.record_transfer(f"A{i}", f"B{i}", 100.0, T0)
+            graph.record_transfer(f"B{i}", f"A{i}", 100.0, T0 + 1)
+        self.assertEqual(graph.alerts_for("B0"), [])
+        self.assertEqual([alert.details["counterparty"] for alert in graph.alerts_for("B3")], ["A3"])
+        self.assertEqual(sorted(graph._alerts_by_account), ["B1", "B2", "B3"])
+
+
+class TestSuspiciousActivity(unittest.TestCase):
+    def test_detect_suspicious_activity(self):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        self.assertFalse(bank.detect_suspicious_activity("ACC1")["flagged"])
+        bank._aml_monitor.record_transfer("ACC1", "ACC2", 100.0, T0)
+        bank._aml_monitor.record_transfer("ACC2", "ACC1", 100.0, T0 + 1)
+        result = bank.detect_suspicious_activity("ACC2")
+        self.assertTrue(result["flagged"])
+        self.assertEqual(result["alerts"][0]["kind"], "round_trip")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+from datetime import datetime
+import numpy as np
+from analytics_store import ColumnarTransactionStore
+from banking_core import Account, AccessControl, Customer, EnterpriseBankingSystem
+
+DAY = 86400
+T0 = 1_700_006_400  # a UTC midnight
+
+
+class TestColumnarTransactionStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ColumnarTransactionStore(chunk_size=2)
+        rows = [
+            (100.0, "USD", "deposit", T0, "ACC1", "CUST1"),
+            (50.0, "USD", "withdrawal", T0 + 10, "ACC1", "CUST1"),
+            (200.0, "EUR", "deposit", T0 + DAY, "ACC2", "CUST2"),
+            (300.0, "USD", "card_transaction", T0 + DAY + 5, "ACC3", "CUST1"),
+            (25.0, "USD", "transfer", T0 + 2 * DAY, "ACC2", "CUST2"),
+        ]
+        for row in rows:
+            self.store.append(*row)
+
+    def test_staged_rows_are_visible(self):
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(self.store.columns()["amount"].tolist(), [100.0, 50.0, 200.0, 300.0, 25.0])
+
+    def test_summary_with_filters(self):
+        summary = self.store.summary()
+        self.assertEqual(summary["transaction_count"], 5)
+        self.assertEqual(summary["total_amount"], {"USD": 475.0, "EUR": 200.0})
+        self.assertEqual(summary["average_amount"]["USD"], 118.75)
+        self.assertEqual(summary["by_type"]["deposit"], {"USD": {"count": 1, "total": 100.0},
+                                                         "EUR": {"count": 1, "total": 200.0}})
+        deposits = self.store.summary({"transaction_types": ["deposit"], "currencies": ["USD"]})
+        self.assertEqual(deposits["total_amount"], {"USD": 100.0})
+        recent = self.store.summary({"start": T0 + DAY, "end": datetime.fromtimestamp(T0 + DAY + 5)})
+        self.assertEqual(recent["transaction_count"], 2)
+
+    def test_group_by_customer_and_type(self):
+        groups = self.store.group_by(["customer", "type"])
+        self.assertEqual(groups[("CUST1", "deposit")], {"count": 1, "total": 100.0})
+        self.assertEqual(groups[("CUST2", "transfer")], {"count": 1, "total": 25.0})
+        self.assertEqual(len(groups), 5)
+
+    def test_group_by_time_bucket(self):
+        groups = self.store.group_by(["bucket"], bucket_seconds=DAY)
+        totals = [groups[key]["total"] for key in sorted(groups)]
+        self.assertEqual(totals, [150.0, 500.0, 25.0])
+        self.assertEqual(min(groups)[0], datetime.fromtimestamp(T0))
+
+    def test_group_by_beyond_int64_key_space(self):
+        self.store.append(1.0, "USD", "deposit", T0 + 10 ** 10, "ACC1", "CUST1")
+        # Two one-second buckets spanning 10**10 seconds need 10**20 mixed-radix keys.
+        groups = self.store.group_by(["bucket", "bucket"], bucket_seconds=1)
+        self.assertEqual(len(groups), 6)
+        late = datetime.fromtimestamp(T0 + 10 ** 10)
+        self.assertEqual(groups[(late, late)], {"count": 1, "total": 1.0})
+
+    def test_lifetime_values(self):
+        ltv = self.store.lifetime_values()
+        cust1, usd = self.store.customers.index["CUST1"], self.store.currencies.index["USD"]
+        self.assertAlmostEqual(ltv[cust1, usd], 100 * 0.01 + 300 * 0.02)
+        self.assertEqual(self.store.customer_ltv("CUST2"), {"EUR": 200 * 0.01, "USD": 25 * 0.001})
+        self.assertEqual(self.store.customer_ltv("UNKNOWN"), {})
+
+    def test_lifetime_values_fold_in_new_rows(self):
+        before = self.store.lifetime_values()
+        self.assertIs(self.store.lifetime_values(), before)
+        self.store.append(100.0, "GBP", "deposit", T0, "ACC9", "CUST9")
+        self.store.append(100.0, "USD", "deposit", T0, "ACC1", "CUST1")
+        self.assertEqual(self.store.customer_ltv("CUST9"), {"GBP": 1.0})
+        self.assertAlmostEqual(self.store.customer_ltv("CUST1")["USD"], 8.0)
+        self.assertAlmostEqual(before[self.store.customers.index["CUST1"], self.store.currencies.index["USD"]], 7.0)
+        full = ColumnarTransactionStore()
+        columns = self.store.columns()
+        full.extend(columns["amount"], [self.store.currencies.values[c] for c in columns["currency"]],
+                    [self.store.types.values[c] for c in columns["type"]], columns["timestamp"],
+                    [self.store.accounts.values[c] for c in columns["account"]],
+                    [self.store.customers.values[c] for c in columns["customer"]])
+        for customer_id in self.store.customers.values:
+            expected, actual = full.customer_ltv(customer_id), self.store.customer_ltv(customer_id)
+            self.assertEqual(expected.keys(), actual.keys())
+            for currency in expected:
+                self.assertAlmostEqual(expected[currency], actual[currency])
+
+    def test_extend_matches_append(self):
+        bulk = ColumnarTransactionStore()
+        columns = self.store.columns()
+        bulk.extend(columns["amount"], ["USD", "USD", "EUR", "USD", "USD"],
+                    ["deposit", "withdrawal", "deposit", "card_transaction", "transfer"],
+                    columns["timestamp"], ["ACC1", "ACC1", "ACC2", "ACC3", "ACC2"],
+                    np.array(["CUST1", "CUST1", "CUST2", "CUST1", "CUST2"]))
+        self.assertEqual(bulk.group_by(["customer", "type"]), self.store.group_by(["customer", "type"]))
+
+
+class TestBankingAnalytics(unittest.TestCase):
+    def test_analytics_follow_postings(self):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["process_deposit", "view_analytics"])
+        bank._access_control = access_control
+        bank._customers["CUST1"] = Customer("CUST1", "John", "Doe", "1990-01-01", "123 Main St", "john@example.com", {})
+        bank._accounts["ACC1"] = Account("ACC1", "CUST1", "checking", "USD")
+        bank.process_deposit("ACC1", 100.0, "USD", "ATM", {}, "user1")
+        bank.process_deposit("ACC1", 300.0, "USD", "ATM", {}, "user1")
+        analytics = bank.get_transaction_analytics({"group_by": ["customer"]}, "user1")
+        self.assertEqual(analytics["total_amount"], {"USD": 400.0})
+        self.assertEqual(analytics["groups"][("CUST1",)]["count"], 2)
+        self.assertAlmostEqual(bank.calculate_customer_ltv("CUST1", "user1")["USD"], 4.0)
+        with self.assertRaises(PermissionError):
+            bank.get_transaction_analytics(None, "nobody")
+
+
+if __name__ == '__main__':
+    unittest.main()
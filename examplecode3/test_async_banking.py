@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import unittest
+from async_banking import AsyncBankingSystem, OperationTimeoutError
+from banking_core import EnterpriseBankingSystem, AccessControl, Customer, Account
+from credit_bureau import CreditBureauClient, CreditBureauServer
+
+
+class TestAsyncBankingSystem(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["process_deposit", "process_transfer", "get_credit_score",
+                                                   "process_loan_application", "view_dashboard"])
+        self.bank._access_control = access_control
+        self.bank._customers["CUST1"] = Customer("CUST1", "John", "Doe", "1990-01-01", "123 Main St", "john@example.com", {})
+        self.bank._accounts["ACC1"] = Account("ACC1", "CUST1", "checking", "USD", 1000.0)
+        self.bank._accounts["ACC2"] = Account("ACC2", "CUST1", "savings", "USD", 0.0)
+        self.bank._customers["CUST1"].accounts.extend(["ACC1", "ACC2"])
+        self.server = await CreditBureauServer(latency=0.01).start()
+        self.client = CreditBureauClient(self.server.host, self.server.port)
+        self.front = AsyncBankingSystem(self.bank, self.client, max_workers=4)
+
+    async def asyncTearDown(self):
+        self.front.close()
+        await self.client.close()
+        await self.server.close()
+
+    async def test_concurrent_transfers(self):
+        await asyncio.gather(*(self.front.process_transfer("ACC1", "ACC2", 10.0, "USD", {}, "user1")
+                               for _ in range(50)))
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 500.0)
+        self.assertEqual(self.bank._accounts["ACC2"].balance, 500.0)
+
+    async def test_credit_score_and_loan_application(self):
+        score = await self.front.get_credit_score("CUST1", "user1")
+        self.assertEqual(score, CreditBureauServer.score_for("CUST1"))
+        result = await self.front.process_loan_application("CUST1", "personal", 1000.0, "USD", 12, "user1",
+                                                           applicant={"annual_income": 90000})
+        self.assertIn(result["status"], ("approved", "rejected"))
+        self.assertEqual(self.server.request_count, 1)
+
+    async def test_permission_denied(self):
+        with self.assertRaises(PermissionError):
+            await self.front.get_credit_score("CUST1", "nobody")
+
+    async def test_timeout_does_not_interrupt_posting(self):
+        release = threading.Event()
+        original = self.bank.process_deposit
+
+        def slow_deposit(*args):
+            release.wait()
+            return original(*args)
+
+        self.bank.process_deposit = slow_deposit
+        self.front.timeouts["process_deposit"] = 0.05
+        with self.assertRaises(OperationTimeoutError) as raised:
+            await self.front.process_deposit("ACC1", 100.0, "USD", "cash", {}, "user1")
+        release.set()
+        await raised.exception.pending
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 1100.0)
+
+    async def test_cancelled_caller_leaves_state_consistent(self):
+        task = asyncio.ensure_future(self.front.process_transfer("ACC1", "ACC2", 100.0, "USD", {}, "user1"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.front.close()
+        self.assertEqual(self.bank._accounts["ACC1"].balance + self.bank._accounts["ACC2"].balance, 1000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
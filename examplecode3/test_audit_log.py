@@ -0,0 +1,104 @@
+import os
+import tempfile
+import time
+import unittest
+from audit_log import AuditIntegrityError, AuditLog, InMemoryAuditLog
+from banking_core import AccessControl, EnterpriseBankingSystem
+
+
+class TestAuditLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = AuditLog(self.tmp.name, records_per_segment=4)
+
+    def tearDown(self):
+        self.log.close()
+        self.tmp.cleanup()
+
+    def fill(self):
+        for i in range(10):
+            self.log.append("alice" if i % 2 else "bob", "deposit" if i % 3 else "transfer", f"tx{i}")
+        self.log.sync()
+
+    def test_append_spans_segments(self):
+        self.fill()
+        self.assertEqual(len(self.log), 10)
+        segments = sorted(name for name in os.listdir(self.tmp.name) if name.startswith("segment-"))
+        self.assertEqual(len(segments), 3)
+
+    def test_indexed_queries(self):
+        self.fill()
+        alice = self.log.query(user="alice")
+        self.assertEqual([entry["detail"] for entry in alice], ["tx1", "tx3", "tx5", "tx7", "tx9"])
+        both = self.log.query(user="alice", action="transfer")
+        self.assertEqual([entry["seq"] for entry in both], [3, 9])
+        self.assertEqual(len(self.log.query(action="deposit", limit=2)), 2)
+
+    def test_time_range_query(self):
+        self.log.append("alice", "deposit", "early")
+        self.log.sync()
+        time.sleep(0.01)
+        middle = time.time()
+        self.log.append("alice", "deposit", "late")
+        self.log.sync()
+        self.assertEqual([e["detail"] for e in self.log.query(start=middle)], ["late"])
+        self.assertEqual([e["detail"] for e in self.log.query(user="alice", end=middle)], ["early"])
+
+    def test_reopen_rebuilds_indexes_and_chain(self):
+        self.fill()
+        self.log.close()
+        self.log = AuditLog(self.tmp.name, records_per_segment=4)
+        self.assertEqual(len(self.log), 10)
+        self.log.append("carol", "deposit", "tx10")
+        self.log.sync()
+        self.assertTrue(self.log.verify())
+        self.assertEqual(self.log.query(user="carol")[0]["seq"], 10)
+
+    def test_tampering_breaks_chain(self):
+        self.fill()
+        self.log.close()
+        path = os.path.join(self.tmp.name, "segment-000001.log")
+        with open(path, "r+b") as handle:
+            handle.seek(30)
+            handle.write(b"X")
+        self.log = AuditLog(self.tmp.name, records_per_segment=4)
+        with self.assertRaises(AuditIntegrityError):
+            self.log.verify()
+
+    def test_torn_tail_is_truncated(self):
+        self.fill()
+        self.log.close()
+        with open(os.path.join(self.tmp.name, "segment-000002.log"), "ab") as handle:
+            handle.write(b"partial")
+        self.log = AuditLog(self.tmp.name, records_per_segment=4)
+        self.assertEqual(len(self.log), 10)
+        self.assertTrue(self.log.verify())
+
+
+class TestInMemoryAuditLog(unittest.TestCase):
+    def test_query(self):
+        log = InMemoryAuditLog()
+        log.append("alice", "deposit", "a")
+        log.append("bob", "deposit", "b")
+        self.assertEqual([e["detail"] for e in log.query(action="deposit", user="bob")], ["b"])
+
+
+class TestAuditUserActions(unittest.TestCase):
+    def test_banking_operations_are_audited(self):
+        with tempfile.TemporaryDirectory() as directory:
+            bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", audit_dir=directory)
+            access_control = AccessControl()
+            access_control.add_role("user1", "admin", ["register_customer", "audit_user_actions"])
+            bank._access_control = access_control
+            customer_data = {"first_name": "John", "last_name": "Doe", "dob": "1990-01-01", "address": "123 Main St", "contact_info": "john@example.com", "id_documents": {"passport": "ABC123"}}
+            customer_id = bank.register_customer(customer_data, "user1")
+            bank._audit_log.sync()
+            entries = bank.audit_user_actions({"user": "user1"}, "user1")
+            self.assertEqual([(e["action"], e["detail"]) for e in entries], [("register_customer", customer_id)])
+            with self.assertRaises(PermissionError):
+                bank.audit_user_actions({}, "nobody")
+            bank._audit_log.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
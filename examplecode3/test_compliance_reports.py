@@ -0,0 +1,141 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from banking_core import AccessControl, EnterpriseBankingSystem, Transaction
+from compliance_reports import UnsupportedReportTypeError, iter_transactions, stream_report
+
+T0 = datetime(2025, 1, 1)
+
+
+def make_transactions(count):
+    kinds = ["deposit", "card_transaction", "withdrawal", "loan_payment"]
+    return [Transaction(f"T{i}", f"ACC{i % 3}", 5000.0 + 1000.0 * (i % 10), "USD", kinds[i % 4],
+                        timestamp=T0 + timedelta(hours=i)) for i in range(count)]
+
+
+class TestComplianceReports(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.transactions = make_transactions(200)
+        self.date_range = (T0 + timedelta(hours=20), T0 + timedelta(hours=150))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def expected(self, report_type="BSA"):
+        start, end = self.date_range
+        return [t.transaction_id for t in self.transactions
+                if start <= t.timestamp <= end and t.transaction_type in ("deposit", "withdrawal")
+                and t.amount >= 10000.0]
+
+    def test_iter_transactions_respects_range(self):
+        positions = [p for p, _ in iter_transactions(self.transactions, *self.date_range)]
+        self.assertEqual(positions, list(range(20, 151)))
+        positions = [p for p, _ in iter_transactions(iter(self.transactions), *self.date_range)]
+        self.assertEqual(positions, list(range(20, 151)))
+
+    def test_out_of_order_ledger(self):
+        # A posting timestamped before a concurrent one can still be appended after it.
+        self.transactions[30], self.transactions[160] = self.transactions[160], self.transactions[30]
+        path = os.path.join(self.tmp.name, "bsa.csv")
+        stream_report("BSA", self.transactions, self.date_range, path, chunk_size=4)
+        with open(path, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual(sorted(row["transaction_id"] for row in rows), sorted(self.expected()))
+
+    def test_progress_counts_scanned_transactions(self):
+        calls = []
+        stream_report("BSA", self.transactions, self.date_range, os.path.join(self.tmp.name, "bsa.csv"),
+                      chunk_size=1000, progress=lambda scanned, written: calls.append(scanned))
+        self.assertEqual(calls, [len(self.transactions)])
+
+    def test_creates_output_directory(self):
+        path = os.path.join(self.tmp.name, "output", "bsa.csv")
+        stream_report("BSA", self.transactions, self.date_range, path)
+        self.assertTrue(os.path.exists(path))
+
+    def test_csv_report(self):
+        path = os.path.join(self.tmp.name, "bsa.csv")
+        report = stream_report("BSA", self.transactions, self.date_range, path, chunk_size=4)
+        with open(path, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual([row["transaction_id"] for row in rows], self.expected())
+        self.assertEqual(report["rows"], len(rows))
+
+    def test_jsonl_report_with_progress(self):
+        path = os.path.join(self.tmp.name, "pci.jsonl")
+        calls = []
+        stream_report("PCI", self.transactions, self.date_range, path, fmt="jsonl", chunk_size=5,
+                      progress=lambda scanned, written: calls.append(written))
+        with open(path) as handle:
+            rows = [json.loads(line) for line in handle]
+        self.assertTrue(rows and all(row["transaction_type"] == "card_transaction" for row in rows))
+        self.assertEqual(calls[-1], len(rows))
+        self.assertEqual(calls, sorted(calls))
+
+    def test_resume_from_checkpoint(self):
+        path = os.path.join(self.tmp.name, "bsa.csv")
+        checkpoint = os.path.join(self.tmp.name, "bsa.checkpoint")
+
+        def interrupt(scanned, written):
+            if written >= 6:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            stream_report("BSA", self.transactions, self.date_range, path, chunk_size=3,
+                          checkpoint_path=checkpoint, progress=interrupt)
+        self.assertTrue(os.path.exists(checkpoint))
+        with open(path, "ab") as handle:
+            handle.write(b"partial,row")  # a chunk that was being written when the process died
+        report = stream_report("BSA", self.transactions, self.date_range, path, chunk_size=3,
+                               checkpoint_path=checkpoint)
+        with open(path, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual([row["transaction_id"] for row in rows], self.expected())
+        self.assertEqual(report["rows"], len(self.expected()))
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_resume_without_output_starts_over(self):
+        path = os.path.join(self.tmp.name, "bsa.csv")
+        checkpoint = os.path.join(self.tmp.name, "bsa.checkpoint")
+
+        def interrupt(scanned, written):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            stream_report("BSA", self.transactions, self.date_range, path, chunk_size=3,
+                          checkpoint_path=checkpoint, progress=interrupt)
+        os.remove(path)
+        report = stream_report("BSA", self.transactions, self.date_range, path, chunk_size=3,
+                               checkpoint_path=checkpoint)
+        with open(path, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual([row["transaction_id"] for row in rows], self.expected())
+        self.assertEqual(report["rows"], len(rows))
+
+    def test_unsupported_report_type(self):
+        with self.assertRaises(UnsupportedReportTypeError):
+            stream_report("XYZ", self.transactions, self.date_range, os.path.join(self.tmp.name, "x.csv"))
+
+
+class TestGenerateComplianceReport(unittest.TestCase):
+    def test_generate_compliance_report(self):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["generate_compliance_report"])
+        bank._access_control = access_control
+        bank._transactions.extend(make_transactions(50))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.jsonl")
+            report = bank.generate_compliance_report("CFPB", (T0, T0 + timedelta(days=30)), "user1",
+                                                     output_path=path, fmt="jsonl")
+            self.assertEqual(report["rows"], 25)
+        with self.assertRaises(PermissionError):
+            bank.generate_compliance_report("CFPB", (T0, T0), "nobody")
+
+
+if __name__ == '__main__':
+    unittest.main()
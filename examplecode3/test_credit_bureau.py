@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+from credit_bureau import CreditBureauClient, CreditBureauServer
+from fx_service import ExternalAPIError
+
+
+class TestCreditBureauClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await CreditBureauServer(latency=0.02).start()
+        self.client = CreditBureauClient(self.server.host, self.server.port, pool_size=4)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_get_score(self):
+        score = await self.client.get_score("CUST1001")
+        self.assertEqual(score, CreditBureauServer.score_for("CUST1001"))
+        self.assertTrue(300 <= score <= 850)
+
+    async def test_concurrent_lookups_are_coalesced(self):
+        scores = await asyncio.gather(*(self.client.get_score("CUST1001") for _ in range(50)))
+        self.assertEqual(len(set(scores)), 1)
+        self.assertEqual(self.server.request_count, 1)
+
+    async def test_results_are_cached(self):
+        await self.client.get_score("CUST1001")
+        await self.client.get_score("CUST1001")
+        self.assertEqual(self.server.request_count, 1)
+
+    async def test_cache_expires(self):
+        client = CreditBureauClient(self.server.host, self.server.port, cache_ttl=0.0)
+        await client.get_score("CUST1001")
+        await client.get_score("CUST1001")
+        self.assertEqual(self.server.request_count, 2)
+        await client.close()
+
+    async def test_connections_are_pooled_and_bounded(self):
+        await asyncio.gather(*(self.client.get_score(f"CUST{i}") for i in range(40)))
+        self.assertEqual(self.server.request_count, 40)
+        self.assertLessEqual(self.server.connection_count, 4)
+
+    async def test_cancelled_caller_does_not_cancel_shared_lookup(self):
+        first = asyncio.ensure_future(self.client.get_score("CUST1001"))
+        second = asyncio.ensure_future(self.client.get_score("CUST1001"))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, CreditBureauServer.score_for("CUST1001"))
+
+    async def test_connection_closed_by_server_is_replaced(self):
+        server = await CreditBureauServer(max_requests_per_connection=1).start()
+        client = CreditBureauClient(server.host, server.port, pool_size=1)
+        for customer_id in ("CUST1", "CUST2", "CUST3"):
+            self.assertEqual(await client.get_score(customer_id), CreditBureauServer.score_for(customer_id))
+            await asyncio.sleep(0.01)  # let the server's close reach the pooled connection
+        self.assertEqual(server.connection_count, 3)
+        await client.close()
+        await server.close()
+
+    async def test_timeout(self):
+        slow = await CreditBureauServer(latency=0.5).start()
+        client = CreditBureauClient(slow.host, slow.port, timeout=0.05)
+        with self.assertRaises(ExternalAPIError):
+            await client.get_score("CUST1001")
+        await client.close()
+        await slow.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
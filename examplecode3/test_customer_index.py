@@ -0,0 +1,84 @@
+import unittest
+from banking_core import EnterpriseBankingSystem, AccessControl
+from customer_index import CustomerIndex, normalize_contact, normalize_document, normalize_name
+
+
+class TestNormalization(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize_name("  Zoë   O'Neil "), "zoe oneil")
+        self.assertEqual(normalize_document("ab-123 456"), "AB123456")
+        self.assertEqual(normalize_contact(" John@Example.COM "), "john@example.com")
+        self.assertEqual(normalize_contact("+1 (555) 010-9999"), "5550109999")
+        self.assertIsNone(normalize_contact("n/a"))
+
+
+class TestCustomerIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = CustomerIndex()
+        self.index.add("CUST1", "John", "Smith", "1980-01-10", {"email": "john@example.com", "phone": "555-010-9999"},
+                       {"passport": "AB 123456"})
+        self.index.add("CUST2", "Mary", "Jones", "1975-05-05", "mary@example.com", {"passport": "ZZ999"})
+
+    def test_exact_lookups(self):
+        self.assertEqual(self.index.by_document("ab123456"), ["CUST1"])
+        self.assertEqual(self.index.by_document("AB-123456", "Passport"), ["CUST1"])
+        self.assertEqual(self.index.by_contact("(555) 010 9999"), ["CUST1"])
+        self.assertEqual(self.index.by_name_dob("JOHN", "smith", "1980-01-10"), ["CUST1"])
+        self.assertEqual(self.index.by_document("nope"), [])
+
+    def test_similar_names(self):
+        matches = self.index.similar_names("Jon", "Smyth", "1980-01-10", threshold=0.3)
+        self.assertEqual([customer_id for customer_id, _ in matches], ["CUST1"])
+        self.assertEqual(self.index.similar_names("Jon", "Smyth", "1990-01-10", threshold=0.3), [])
+
+    def test_reindex_replaces_old_keys(self):
+        self.index.add("CUST1", "John", "Smithers", "1980-01-10", "new@example.com", {"passport": "AB123456"})
+        self.assertEqual(self.index.by_contact("john@example.com"), [])
+        self.assertEqual(self.index.by_contact("new@example.com"), ["CUST1"])
+        self.assertEqual(self.index.by_name_dob("John", "Smith", "1980-01-10"), [])
+        self.assertEqual(self.index.similar_names("John", "Smithers", "1980-01-10")[0][0], "CUST1")
+
+    def test_add_without_replace_keeps_the_indexed_profile(self):
+        self.assertFalse(self.index.add("CUST1", "John", "Smith", "1980-01-10", "stale@example.com", {},
+                                        replace=False))
+        self.assertEqual(self.index.by_contact("john@example.com"), ["CUST1"])
+        self.assertEqual(self.index.by_contact("stale@example.com"), [])
+
+    def test_find_duplicates_ranks_by_evidence(self):
+        self.index.add("CUST3", "Jon", "Smith", "1980-01-10", "other@example.com", {})
+        duplicates = self.index.find_duplicates("John", "Smith", "1980-01-10", "john@example.com", {"passport": "AB123456"})
+        self.assertEqual(duplicates[0], {"customer_id": "CUST1",
+                                         "reasons": ["contact", "id_document", "name_dob", "similar_name"]})
+        self.assertEqual(duplicates[1], {"customer_id": "CUST3", "reasons": ["similar_name"]})
+
+
+class TestBankingDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["register_customer"])
+        self.bank._access_control = access_control
+        self.data = {"first_name": "John", "last_name": "Doe", "dob": "1990-01-01", "address": "123 Main St",
+                     "contact_info": "john@example.com", "id_documents": {"passport": "ABC123"}}
+        self.customer_id = self.bank.register_customer(self.data, "user1")
+
+    def test_duplicate_document_is_rejected(self):
+        with self.assertRaises(Exception) as raised:
+            self.bank.register_customer(dict(self.data, id_documents={"passport": "abc-123"}), "user1")
+        self.assertNotIn(self.customer_id, str(raised.exception))
+        self.assertEqual(len(self.bank._customers), 1)
+
+    def test_find_duplicate_customers(self):
+        applicant = dict(self.data, first_name="Jon", id_documents={"passport": "XYZ"})
+        matches = self.bank.find_duplicate_customers(applicant, "user1")
+        self.assertEqual(matches[0]["customer_id"], self.customer_id)
+        self.assertIn("contact", matches[0]["reasons"])
+
+    def test_profile_update_is_indexed(self):
+        self.bank._customers[self.customer_id].update_profile("contact_info", "new@example.com")
+        self.assertEqual(self.bank._customer_index.by_contact("new@example.com"), [self.customer_id])
+        self.assertEqual(self.bank._customer_index.by_contact("john@example.com"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import unittest
+from banking_core import Account, AccessControl, Customer, EnterpriseBankingSystem
+from dashboards import DashboardStore
+
+
+class TestDashboardStore(unittest.TestCase):
+    def setUp(self):
+        self.store = DashboardStore(recent_limit=2)
+
+    def test_unknown_customer(self):
+        self.assertIsNone(self.store.get("CUST1"))
+        self.assertEqual(self.store.register_customer("CUST1")["version"], 0)
+
+    def test_updates_bump_version_and_totals(self):
+        self.store.update_account("CUST1", "ACC1", "USD", 100.0)
+        self.store.update_account("CUST1", "ACC2", "USD", 50.0)
+        self.store.update_credit_card("CUST1", "CARD1", 1000.0, 200.0)
+        view = self.store.update_loan("CUST1", "LOAN1", 5000.0, "active")
+        self.assertIs(self.store.get("CUST1"), view)
+        self.assertEqual(view["version"], 4)
+        self.assertEqual(view["total_balances"]["USD"], 150.0)
+        self.assertEqual(view["credit_cards"]["CARD1"]["available_credit"], 800.0)
+        self.assertEqual(view["loans"]["LOAN1"]["outstanding"], 5000.0)
+
+    def test_snapshots_are_immutable(self):
+        before = self.store.update_account("CUST1", "ACC1", "USD", 100.0, {"transaction_id": "T1"})
+        self.store.update_account("CUST1", "ACC1", "USD", 80.0, {"transaction_id": "T2"})
+        self.store.update_account("CUST1", "ACC1", "USD", 60.0, {"transaction_id": "T3"})
+        self.assertEqual(before["accounts"]["ACC1"]["balance"], 100.0)
+        with self.assertRaises(TypeError):
+            before["accounts"]["ACC1"] = {}
+        after = self.store.get("CUST1")
+        self.assertEqual([a["transaction_id"] for a in after["recent_activity"]], ["T3", "T2"])
+
+    def test_concurrent_updates_lose_nothing(self):
+        def worker(n):
+            for i in range(200):
+                self.store.update_account("CUST1", f"ACC{n}", "USD", float(i))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        view = self.store.get("CUST1")
+        self.assertEqual(view["version"], 800)
+        self.assertEqual(view["total_balances"]["USD"], 4 * 199.0)
+
+
+class TestCustomerDashboard(unittest.TestCase):
+    def test_dashboard_follows_postings(self):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["create_account", "process_deposit", "process_transfer", "view_dashboard"])
+        bank._access_control = access_control
+        bank._customers["CUST1"] = Customer("CUST1", "John", "Doe", "1990-01-01", "123 Main St", "john@example.com", {})
+        self.assertEqual(bank.get_customer_dashboard("CUST1", "user1")["version"], 0)
+        first = bank.create_account("CUST1", "checking", "USD", 0, "user1")
+        second = bank.create_account("CUST1", "savings", "USD", 0, "user1")
+        bank.process_deposit(first, 300.0, "USD", "ATM", {}, "user1")
+        bank.process_transfer(first, second, 100.0, "USD", {}, "user1")
+        view = bank.get_customer_dashboard("CUST1", "user1")
+        self.assertEqual(view["accounts"][first]["balance"], 200.0)
+        self.assertEqual(view["accounts"][second]["balance"], 100.0)
+        self.assertEqual(view["total_balances"]["USD"], 300.0)
+        self.assertEqual(view["recent_activity"][0]["transaction_type"], "transfer")
+        with self.assertRaises(PermissionError):
+            bank.get_customer_dashboard("CUST1", "nobody")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import math
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+from banking_core import Account, AccessControl, Customer, EnterpriseBankingSystem
+from end_of_day import compute_postings, snapshot_balances
+
+
+class TestComputePostings(unittest.TestCase):
+    def setUp(self):
+        self.accounts = {
+            "ACC1": Account("ACC1", "CUST1", "savings", "USD", 36500.0),
+            "ACC2": Account("ACC2", "CUST1", "checking", "USD", 100.0),
+            "ACC3": Account("ACC3", "CUST1", "checking", "JPY", 400.0),
+            "ACC4": Account("ACC4", "CUST1", "business", "USD", 3.0),
+            "ACC5": Account("ACC5", "CUST1", "brokerage", "USD", 100.0),
+        }
+
+    def test_interest_accrues_daily(self):
+        interest, fees = compute_postings(snapshot_balances(self.accounts), date(2024, 1, 15))
+        # 36500.00 * 2% / 365 = 2.00; 100.00 * 0.1% / 365 rounds down to 0.
+        self.assertEqual(interest.tolist(), [200, 0, 0, 0, 0])
+        self.assertEqual(fees.tolist(), [0] * 5)
+
+    def test_fees_only_at_month_end_and_capped(self):
+        _, fees = compute_postings(snapshot_balances(self.accounts), date(2024, 2, 29))
+        self.assertEqual(fees.tolist(), [0, 500, 5, 300, 0])
+
+    def test_table_snapshot_matches_dict_snapshot(self):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", compact_accounts=True)
+        for account_id, account in self.accounts.items():
+            bank._accounts[account_id] = account
+        table, plain = snapshot_balances(bank._accounts), snapshot_balances(self.accounts)
+        for name in ("account_id", "balance_minor", "scale", "currency", "account_type"):
+            self.assertEqual(table[name].tolist(), plain[name].tolist())
+
+
+class TestRunEndOfDay(unittest.TestCase):
+    def setUp(self):
+        self.bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["run_end_of_day", "process_deposit"])
+        self.bank._access_control = access_control
+        self.bank._customers["CUST1"] = Customer("CUST1", "John", "Doe", "1990-01-01", "", "", {})
+        for i in range(50):
+            account_type = "savings" if i % 2 else "checking"
+            self.bank._accounts[f"ACC{i}"] = Account(f"ACC{i}", "CUST1", account_type, "USD", 365.0 * (i + 1))
+
+    def test_posts_interest_and_fees(self):
+        result = self.bank.run_end_of_day(date(2024, 1, 31), "user1")
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 730.04)
+        self.assertEqual(self.bank._accounts["ACC0"].balance, 360.0)
+        self.assertEqual(result["fees"], {"USD": 5.0})
+        self.assertEqual(result["accounts"], 50)
+        kinds = {t.transaction_type for t in self.bank._transactions}
+        self.assertEqual(kinds, {"interest", "fee"})
+        self.assertEqual(len(self.bank._transactions), result["postings"])
+        self.assertEqual(len(self.bank._analytics), result["postings"])
+
+    def test_postings_keep_the_ledger_in_time_order(self):
+        self.bank.process_deposit("ACC1", 15000.0, "USD", "cash", {}, "user1")
+        self.bank.run_end_of_day(date(2024, 1, 15), "user1")
+        timestamps = [t.timestamp for t in self.bank._transactions]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual({t.business_date for t in self.bank._transactions[1:]}, {date(2024, 1, 15)})
+        self.assertGreater(self.bank._transactions[-1].timestamp.date(), date(2024, 1, 15))
+
+    def test_fee_that_would_overdraw_is_skipped(self):
+        self.bank._accounts["ACC0"].balance = 3.0
+        snapshot = snapshot_balances
+        # The balance drops after the snapshot the fee was computed from.
+        with patch("end_of_day.snapshot_balances",
+                   lambda accounts: (snapshot(accounts), setattr(accounts["ACC0"], "balance", 1.0))[0]):
+            result = self.bank.run_end_of_day(date(2024, 1, 31), "user1")
+        self.assertEqual(self.bank._accounts["ACC0"].balance, 1.0)
+        self.assertEqual(result["fees_skipped"], {"USD": 3.0})
+        self.assertEqual(len(self.bank._transactions), result["postings"])
+
+    def test_checkpoint_follows_the_ledger(self):
+        checkpoint = os.path.join(tempfile.mkdtemp(), "eod.json")
+        with patch.object(self.bank, "_record_postings", side_effect=RuntimeError("crashed")):
+            with self.assertRaises(RuntimeError):
+                self.bank.run_end_of_day(date(2024, 1, 15), "user1", checkpoint_path=checkpoint, batch_size=10)
+        with open(checkpoint) as handle:
+            self.assertEqual(json.load(handle)["next_position"], 0)
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 730.0)
+
+    def test_requires_permission(self):
+        with self.assertRaises(PermissionError):
+            self.bank.run_end_of_day(date(2024, 1, 31), "nobody")
+
+    def test_resumes_from_checkpoint(self):
+        checkpoint = os.path.join(tempfile.mkdtemp(), "eod.json")
+        expected = {f"ACC{i}": 365.0 * (i + 1) + (0.02 * (i + 1) if i % 2 else
+                                                  math.floor(36500 * (i + 1) * 0.001 / 365) / 100) for i in range(50)}
+        calls = []
+
+        def fail_after_two_batches(posted, total):
+            calls.append(posted)
+            if len(calls) == 2:
+                raise RuntimeError("crashed")
+
+        with self.assertRaises(RuntimeError):
+            self.bank.run_end_of_day(date(2024, 1, 15), "user1", checkpoint_path=checkpoint,
+                                     batch_size=10, progress=fail_after_two_batches)
+        # Online traffic between the two attempts is not part of the day's snapshot but is kept.
+        self.bank.process_deposit("ACC1", 100.0, "USD", "cash", {}, "user1")
+        result = self.bank.run_end_of_day(date(2024, 1, 15), "user1", checkpoint_path=checkpoint, batch_size=10)
+        interest = sum(balance - 365.0 * (i + 1) for i, balance in enumerate(expected.values()))
+        expected["ACC1"] += 100.0
+        self.assertGreater(result["resumed_from"], 0)
+        # The summary covers the whole day once, including the batches posted before the crash.
+        self.assertAlmostEqual(result["interest"]["USD"], interest, places=6)
+        self.assertEqual(result["postings"], len(self.bank._transactions) - 1)
+        for account_id, balance in expected.items():
+            self.assertAlmostEqual(self.bank._accounts[account_id].balance, balance, places=6)
+        self.assertFalse(os.path.exists(checkpoint))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from banking_core import AccessControl, EnterpriseBankingSystem
+from envelope_crypto import AESGCM, DecryptionError, EnvelopeEncryption
+from storage import InMemoryStorage
+
+FIELDS = ["dob", "contact_info", "id_documents"]
+
+
+@unittest.skipIf(AESGCM is None, "requires the cryptography package")
+class TestEnvelopeEncryption(unittest.TestCase):
+    def setUp(self):
+        self.engine = EnvelopeEncryption("master-key")
+        self.record = {"customer_id": "CUST1", "dob": "1990-01-01",
+                       "contact_info": "john@example.com", "id_documents": {"passport": "ABC123"}}
+
+    def test_round_trip(self):
+        token = self.engine.encrypt("tenant", b"secret")
+        self.assertNotIn(b"secret", token)
+        self.assertEqual(self.engine.decrypt("tenant", token), b"secret")
+
+    def test_tampering_is_detected(self):
+        token = bytearray(self.engine.encrypt("tenant", b"secret"))
+        token[-1] ^= 1
+        with self.assertRaises(DecryptionError):
+            self.engine.decrypt("tenant", bytes(token))
+
+    def test_tenants_have_separate_keys(self):
+        token = self.engine.encrypt("tenant-a", b"secret")
+        with self.assertRaises(DecryptionError):
+            self.engine.decrypt("tenant-b", token)
+
+    def test_batch_fields(self):
+        encrypted = self.engine.encrypt_many("tenant", [self.record] * 3, FIELDS)
+        self.assertEqual(encrypted[0]["customer_id"], "CUST1")
+        self.assertNotEqual(encrypted[0]["dob"], "1990-01-01")
+        self.assertNotEqual(encrypted[0]["dob"], encrypted[1]["dob"])
+        self.assertEqual(self.engine.decrypt_many("tenant", encrypted, FIELDS), [self.record] * 3)
+
+    def test_data_keys_are_only_stored_wrapped(self):
+        encrypted = self.engine.encrypt_fields("tenant", self.record, FIELDS)
+        restarted = EnvelopeEncryption("master-key", wrapped_keys=self.engine.wrapped_keys)
+        self.assertEqual(restarted.decrypt_fields("tenant", encrypted, FIELDS), self.record)
+        self.assertEqual(restarted.unwrap_count, 1)
+        wrong_master = EnvelopeEncryption("other-key", wrapped_keys=self.engine.wrapped_keys)
+        with self.assertRaises(DecryptionError):
+            wrong_master.decrypt_fields("tenant", encrypted, FIELDS)
+
+    def test_tokens_are_bound_to_record_and_field(self):
+        encrypted = self.engine.encrypt_fields("tenant", self.record, FIELDS, "CUST1")
+        swapped = dict(encrypted, dob=encrypted["contact_info"], contact_info=encrypted["dob"])
+        with self.assertRaises(DecryptionError):
+            self.engine.decrypt_fields("tenant", swapped, FIELDS, "CUST1")
+        with self.assertRaises(DecryptionError):
+            self.engine.decrypt_fields("tenant", encrypted, FIELDS, "CUST2")
+        self.assertEqual(self.engine.decrypt_fields("tenant", encrypted, FIELDS, "CUST1"), self.record)
+
+    def test_associated_data_is_length_prefixed(self):
+        token = self.engine.encrypt("tenant", b"secret", ("ab", "c"))
+        with self.assertRaises(DecryptionError):
+            self.engine.decrypt("tenant", token, ("a", "bc"))
+
+    def test_concurrent_first_use_creates_one_key(self):
+        saved = []
+        engine = EnvelopeEncryption("master-key", on_new_key=lambda tenant, wrapped: saved.append(tenant))
+        barrier = threading.Barrier(8)
+        tokens = []
+
+        def seal():
+            barrier.wait()
+            tokens.append(engine.encrypt("tenant", b"secret"))
+
+        threads = [threading.Thread(target=seal) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(saved, ["tenant"])
+        restarted = EnvelopeEncryption("master-key", wrapped_keys=engine.wrapped_keys)
+        self.assertEqual([restarted.decrypt("tenant", token) for token in tokens], [b"secret"] * 8)
+
+    def test_key_cache_is_bounded(self):
+        engine = EnvelopeEncryption("master-key", cache_size=2)
+        tokens = {tenant: engine.encrypt(tenant, b"x") for tenant in ["a", "b", "c"]}
+        self.assertEqual(len(engine._cache), 2)
+        self.assertEqual(engine.decrypt("a", tokens["a"]), b"x")
+        self.assertEqual(engine.unwrap_count, 1)
+
+
+@unittest.skipIf(AESGCM is None, "requires the cryptography package")
+class TestSensitiveData(unittest.TestCase):
+    def bank(self, **kwargs):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", **kwargs)
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["decrypt_data"])
+        bank._access_control = access_control
+        return bank
+
+    def test_encrypt_and_decrypt_sensitive_data(self):
+        bank = self.bank()
+        data = {"dob": "1990-01-01", "id_documents": {"passport": "ABC123"}}
+        encrypted = bank.encrypt_sensitive_data(data)
+        self.assertNotEqual(encrypted, data)
+        self.assertEqual(bank.decrypt_sensitive_data(encrypted, "user1"), data)
+        with self.assertRaises(PermissionError):
+            bank.decrypt_sensitive_data(encrypted, "nobody")
+
+    def test_data_encrypted_before_a_restart_stays_readable(self):
+        storage = InMemoryStorage()
+        encrypted = self.bank(storage=storage).encrypt_sensitive_data({"dob": "1990-01-01"}, "CUST1")
+        restarted = self.bank(storage=storage)
+        self.assertEqual(restarted.decrypt_sensitive_data(encrypted, "user1", "CUST1"), {"dob": "1990-01-01"})
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        restarted.save_snapshot(os.path.join(directory, "bank.snap"))
+        from_snapshot = EnterpriseBankingSystem.from_snapshot(os.path.join(directory, "bank.snap"), "encryption_key")
+        from_snapshot._access_control = restarted._access_control
+        self.assertEqual(from_snapshot.decrypt_sensitive_data(encrypted, "user1", "CUST1"), {"dob": "1990-01-01"})
+
+
+if __name__ == '__main__':
+    unittest.main()
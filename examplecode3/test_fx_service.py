@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from banking_core import Account, AccessControl, EnterpriseBankingSystem
+from fx_service import CurrencyNotSupportedError, ExchangeRateService, ExternalAPIError, FileRateProvider
+
+
+class TestExchangeRateService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rates.json")
+        self.write_rates({"EUR": 0.5, "GBP": 0.25, "JPY": 100.0})
+        self.provider = FileRateProvider(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_rates(self, rates):
+        with open(self.path, "w") as handle:
+            json.dump({"base": "USD", "rates": rates}, handle)
+
+    def test_direct_and_triangulated_rates(self):
+        service = ExchangeRateService(self.provider)
+        self.assertEqual(service.get_rate("USD", "EUR"), 0.5)
+        self.assertEqual(service.get_rate("EUR", "USD"), 2.0)
+        self.assertEqual(service.get_rate("EUR", "GBP"), 0.5)
+        self.assertEqual(service.get_rate("GBP", "GBP"), 1.0)
+        self.assertAlmostEqual(service.convert(10.0, "EUR", "JPY"), 2000.0)
+
+    def test_snapshot_is_cached_within_ttl(self):
+        service = ExchangeRateService(self.provider, ttl=60)
+        for _ in range(100):
+            service.get_rate("USD", "EUR")
+        self.assertEqual(self.provider.fetch_count, 1)
+
+    def test_expired_snapshot_is_reloaded(self):
+        service = ExchangeRateService(self.provider, ttl=0.01)
+        service.get_rate("USD", "EUR")
+        self.write_rates({"EUR": 0.8})
+        time.sleep(0.02)
+        self.assertEqual(service.get_rate("USD", "EUR"), 0.8)
+
+    def test_refresh_ahead_serves_current_snapshot(self):
+        service = ExchangeRateService(self.provider, ttl=60, refresh_after=0.0)
+        self.assertEqual(service.get_rate("USD", "EUR"), 0.5)
+        self.write_rates({"EUR": 0.8})
+        self.assertEqual(service.get_rate("USD", "EUR"), 0.5)
+        deadline = time.time() + 2
+        while service.get_rate("USD", "EUR") != 0.8 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(service.get_rate("USD", "EUR"), 0.8)
+
+    def test_unknown_currency(self):
+        service = ExchangeRateService(self.provider)
+        with self.assertRaises(CurrencyNotSupportedError):
+            service.get_rate("USD", "XYZ")
+
+    def test_missing_file(self):
+        service = ExchangeRateService(FileRateProvider(os.path.join(self.tmp.name, "missing.json")))
+        with self.assertRaises(ExternalAPIError):
+            service.get_rate("USD", "EUR")
+
+    def test_convert_many(self):
+        service = ExchangeRateService(self.provider)
+        result = service.convert_many([10.0, 10.0, 100.0, 1.0], ["EUR", "USD", "JPY", "GBP"], "USD")
+        self.assertEqual(result.tolist(), [20.0, 10.0, 1.0, 4.0])
+
+
+class TestMultiCurrencyDeposit(unittest.TestCase):
+    def test_deposit_is_converted_to_account_currency(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rates.json")
+            with open(path, "w") as handle:
+                json.dump({"base": "USD", "rates": {"EUR": 0.5}}, handle)
+            service = ExchangeRateService(FileRateProvider(path))
+            bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", fx_service=service)
+            access_control = AccessControl()
+            access_control.add_role("user1", "admin", ["process_deposit"])
+            bank._access_control = access_control
+            bank._accounts["ACC1"] = Account("ACC1", "CUST1", "checking", "USD", 0.0)
+            transaction = bank.process_deposit("ACC1", 50.0, "EUR", "ATM", {}, "user1")
+            self.assertEqual(transaction.amount, 100.0)
+            self.assertEqual(transaction.currency, "USD")
+            self.assertEqual(bank._accounts["ACC1"].balance, 100.0)
+            self.assertEqual(bank.get_exchange_rate("EUR", "USD"), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import math
+import unittest
+import numpy as np
+from banking_core import Account, AccessControl, Customer, EnterpriseBankingSystem
+from loans import LoanBook, amortization_schedule, score_applications
+
+
+class TestScoring(unittest.TestCase):
+    def test_batch_scoring(self):
+        result = score_applications(
+            credit_score=[800, 550, 700],
+            annual_income=[120000, 30000, 60000],
+            debt_to_income=[0.1, 0.6, 0.3],
+            amount=[20000, 40000, 10000],
+            term_months=[36, 60, 24],
+        )
+        self.assertEqual(result["approved"].tolist(), [True, False, True])
+        self.assertLess(result["probability_of_default"][0], result["probability_of_default"][2])
+        self.assertTrue(np.all(result["interest_rate"] >= 0.05))
+
+    def test_large_book(self):
+        n = 100_000
+        rng = np.random.default_rng(0)
+        result = score_applications(rng.integers(300, 850, n), rng.uniform(2e4, 2e5, n),
+                                    rng.uniform(0, 0.8, n), rng.uniform(1e3, 5e4, n), rng.choice([12, 36, 60], n))
+        self.assertEqual(result["approved"].shape, (n,))
+
+
+class TestAmortization(unittest.TestCase):
+    def test_schedule(self):
+        schedule = amortization_schedule(1200.0, 0.12, 12)
+        self.assertAlmostEqual(schedule["payment"], 106.6185, places=3)
+        self.assertAlmostEqual(schedule["principal"].sum(), 1200.0)
+        self.assertAlmostEqual(schedule["interest"][0], 12.0)
+        self.assertEqual(schedule["balance"][-1], 0.0)
+
+    def test_zero_rate(self):
+        schedule = amortization_schedule(1200.0, 0.0, 12)
+        self.assertEqual(schedule["payment"], 100.0)
+        self.assertEqual(schedule["interest"].sum(), 0.0)
+
+
+class TestLoanBook(unittest.TestCase):
+    def setUp(self):
+        self.book = LoanBook()
+        self.schedule = self.book.add("LOAN1", 1200.0, 0.0, 12)
+
+    def test_payments_follow_schedule(self):
+        self.assertEqual(self.book.outstanding("LOAN1"), 1200.0)
+        result = self.book.apply_payment("LOAN1", 100.0)
+        self.assertEqual(result["installments_settled"], 1)
+        self.assertEqual(result["outstanding"], 1100.0)
+        result = self.book.apply_payment("LOAN1", 50.0)
+        self.assertEqual(result["installments_settled"], 0)
+        self.assertEqual(result["outstanding"], 1050.0)
+        result = self.book.apply_payment("LOAN1", 250.0)
+        self.assertEqual(result["installments_settled"], 3)
+        self.assertEqual(result["next_installment"], 4)
+
+    def test_payoff_and_overpayment(self):
+        result = self.book.apply_payment("LOAN1", 1250.0)
+        self.assertTrue(result["paid_off"])
+        self.assertEqual(result["outstanding"], 0.0)
+        self.assertEqual(result["overpayment"], 50.0)
+
+    def test_installment_payments_on_a_long_loan(self):
+        schedule = self.book.add("LOAN2", 250000.0, 0.065, 360)
+        for k in range(359):
+            result = self.book.apply_payment("LOAN2", schedule["payment"])
+            self.assertEqual((result["installments_settled"], result["next_installment"]), (1, k + 1))
+        self.assertAlmostEqual(result["outstanding"], schedule["installments"][-1], places=6)
+        result = self.book.apply_payment("LOAN2", schedule["installments"][-1])
+        self.assertTrue(result["paid_off"])
+        self.assertEqual(self.book.remaining_installments("LOAN2"), 0)
+
+
+class TestBankingLoans(unittest.TestCase):
+    def setUp(self):
+        self.bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["process_loan_application", "process_loan_payment", "view_dashboard"])
+        self.bank._access_control = access_control
+        self.bank._customers["CUST1"] = Customer("CUST1", "John", "Doe", "1990-01-01", "123 Main St", "john@example.com", {})
+        self.bank._accounts["ACC1"] = Account("ACC1", "CUST1", "checking", "USD", 5000.0)
+        self.bank._customers["CUST1"].accounts.append("ACC1")
+
+    def approve(self):
+        result = self.bank.process_loan_application(
+            "CUST1", "personal", 1200.0, "USD", 12, "user1",
+            applicant={"credit_score": 780, "annual_income": 90000, "debt_to_income": 0.2})
+        self.assertEqual(result["status"], "approved")
+        return result
+
+    def test_application_and_payment(self):
+        result = self.approve()
+        loan_id = result["loan_id"]
+        payment = result["monthly_payment"]
+        self.assertEqual(result["disbursement_account_id"], "ACC1")
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 6200.0)
+        self.assertEqual(self.bank._transactions[0].transaction_type, "loan_disbursement")
+        transaction = self.bank.process_loan_payment(loan_id, payment, "ACC1", "user1")
+        # Payments are rounded to cents before they are posted.
+        self.assertEqual(transaction.amount, round(payment, 2))
+        self.assertAlmostEqual(self.bank._accounts["ACC1"].balance, 6200.0 - round(payment, 2))
+        view = self.bank.get_customer_dashboard("CUST1", "user1")
+        self.assertAlmostEqual(view["loans"][loan_id]["outstanding"], payment * 12 - round(payment, 2))
+
+    def test_invalid_payments_are_rejected(self):
+        loan_id = self.approve()["loan_id"]
+        with self.assertRaises(ValueError):
+            self.bank.process_loan_payment(loan_id, -5000.0, "ACC1", "user1")
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 6200.0)
+        self.assertEqual(self.bank._loans[loan_id].status, "approved")
+
+    def test_overpayment_is_capped_and_paid_off_loan_is_closed(self):
+        result = self.approve()
+        outstanding = result["monthly_payment"] * 12
+        transaction = self.bank.process_loan_payment(result["loan_id"], 5000.0, "ACC1", "user1")
+        # The payoff is rounded up to the next cent so it clears the schedule.
+        outstanding = math.ceil(outstanding * 100) / 100
+        self.assertEqual(transaction.amount, outstanding)
+        self.assertAlmostEqual(self.bank._accounts["ACC1"].balance, 6200.0 - outstanding)
+        self.assertEqual(self.bank._loans[result["loan_id"]].status, "paid_off")
+        with self.assertRaises(Exception):
+            self.bank.process_loan_payment(result["loan_id"], 10.0, "ACC1", "user1")
+        self.assertAlmostEqual(self.bank._accounts["ACC1"].balance, 6200.0 - outstanding)
+
+    def test_payment_in_another_currency_needs_fx(self):
+        self.bank._accounts["ACC2"] = Account("ACC2", "CUST1", "checking", "EUR", 5000.0)
+        self.bank._customers["CUST1"].accounts.append("ACC2")
+        result = self.bank.process_loan_application(
+            "CUST1", "personal", 1200.0, "EUR", 12, "user1",
+            applicant={"credit_score": 780, "annual_income": 90000, "debt_to_income": 0.2})
+        self.assertEqual(result["disbursement_account_id"], "ACC2")
+        with self.assertRaises(Exception):
+            self.bank.process_loan_payment(result["loan_id"], 100.0, "ACC1", "user1")
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 5000.0)
+
+    def test_rescore_loans(self):
+        loan_id = self.approve()["loan_id"]
+        scores = self.bank.rescore_loans({loan_id: {"credit_score": 500, "annual_income": 20000,
+                                                    "debt_to_income": 0.7}}, "user1")
+        self.assertGreater(scores[loan_id]["probability_of_default"], 0.2)
+        self.assertEqual(self.bank.rescore_loans({"LOAN0": {"credit_score": 700}}, "user1"), {})
+
+    def test_rejected_application(self):
+        result = self.bank.process_loan_application(
+            "CUST1", "personal", 50000.0, "USD", 60, "user1",
+            applicant={"credit_score": 500, "annual_income": 20000, "debt_to_income": 0.7})
+        self.assertEqual(result["status"], "rejected")
+        with self.assertRaises(Exception):
+            self.bank.process_loan_payment(result["loan_id"], 10.0, "ACC1", "user1")
+
+    def test_credit_score_required(self):
+        with self.assertRaises(Exception):
+            self.bank.process_loan_application("CUST1", "personal", 1000.0, "USD", 12, "user1")
+
+
+if __name__ == '__main__':
+    unittest.main()
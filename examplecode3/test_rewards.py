@@ -0,0 +1,106 @@
+import unittest
+import numpy as np
+from banking_core import AccessControl, CreditCard, Customer, EnterpriseBankingSystem
+from storage import InMemoryStorage
+from rewards import RewardsEngine
+
+
+class TestRewardsEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = RewardsEngine()
+        self.gold = self.engine.register_card("CARD1", "gold")
+        self.standard = self.engine.register_card("CARD2", "standard")
+
+    def test_rule_lookup(self):
+        self.assertEqual(self.engine.calculate("CARD1", 10.0, "dining"), 40.0)
+        self.assertEqual(self.engine.calculate("CARD1", 10.0, "hardware"), 10.0)
+        self.assertEqual(self.engine.calculate("CARD2", 10.0, "dining"), 10.0)
+
+    def test_unknown_card_type(self):
+        self.engine.register_card("CARD3", "diamond")
+        self.assertEqual(self.engine.calculate("CARD3", 10.0, "dining"), 0.0)
+        self.engine.accrue_batch(["CARD3"], ["travel"], [10.0])
+        self.assertEqual(self.engine.statement("CARD3")["lifetime_points"], 0.0)
+
+    def test_batch_accrual_and_cycle(self):
+        points = self.engine.accrue_batch(
+            np.array([self.gold, self.standard, self.gold]), ["dining", "travel", "fuel"], [10.0, 20.0, 5.0])
+        self.assertEqual(points.tolist(), [40.0, 20.0, 5.0])
+        self.engine.accrue("CARD2", 1.0, "dining")
+        self.assertEqual(self.engine.statement("CARD1"), {"card_id": "CARD1", "cycle_points": 45.0, "lifetime_points": 45.0})
+        self.assertEqual(self.engine.close_cycle(), {"CARD1": 45.0, "CARD2": 21.0})
+        self.assertEqual(self.engine.statement("CARD2")["cycle_points"], 0.0)
+        self.assertEqual(self.engine.statement("CARD2")["lifetime_points"], 21.0)
+
+    def test_batch_accepts_card_ids(self):
+        self.engine.accrue_batch(["CARD2", "CARD2"], ["x", "y"], [1.0, 2.0])
+        self.assertEqual(self.engine.statement("CARD2")["cycle_points"], 3.0)
+
+    def test_card_arrays_grow(self):
+        engine = RewardsEngine()
+        for i in range(3000):
+            engine.register_card(f"C{i}", "platinum")
+        engine.accrue_batch(np.arange(3000), ["travel"] * 3000, np.ones(3000))
+        self.assertEqual(engine.statement("C2999")["cycle_points"], 5.0)
+
+
+class TestCardTransactions(unittest.TestCase):
+    def test_card_transaction_accrues_rewards(self):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["issue_credit_card", "process_card_transaction", "view_dashboard"])
+        bank._access_control = access_control
+        bank._customers["CUST1"] = Customer("CUST1", "John", "Doe", "1990-01-01", "123 Main St", "john@example.com", {})
+        card_id = bank.issue_credit_card("CUST1", "gold", 500.0, "USD", "user1")
+        self.assertEqual(bank.calculate_rewards(card_id, 10.0, "dining"), 40.0)
+        bank.process_card_transaction(card_id, "M1", 100.0, "USD", {"merchant_category": "dining"}, "user1")
+        self.assertEqual(bank._rewards.statement(card_id)["cycle_points"], 400.0)
+        with self.assertRaises(Exception):
+            bank.process_card_transaction(card_id, "M1", 450.0, "USD", {}, "user1")
+        view = bank.get_customer_dashboard("CUST1", "user1")
+        self.assertEqual(view["credit_cards"][card_id]["balance"], 100.0)
+        self.assertEqual(view["credit_cards"][card_id]["available_credit"], 400.0)
+
+    def test_card_transaction_validates_amount_and_currency(self):
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["issue_credit_card", "process_card_transaction"])
+        bank._access_control = access_control
+        bank._customers["CUST1"] = Customer("CUST1", "John", "Doe", "1990-01-01", "123 Main St", "john@example.com", {})
+        card_id = bank.issue_credit_card("CUST1", "gold", 500.0, "EUR", "user1")
+        self.assertEqual(bank._credit_cards[card_id].currency, "EUR")
+        for amount in (-100.0, 0.0):
+            with self.assertRaises(ValueError):
+                bank.process_card_transaction(card_id, "M1", amount, "EUR", {}, "user1")
+        with self.assertRaisesRegex(Exception, "Currency mismatch"):
+            bank.process_card_transaction(card_id, "M1", 10.0, "USD", {}, "user1")
+        self.assertEqual(bank._credit_cards[card_id].balance, 0.0)
+        self.assertEqual(bank._rewards.statement(card_id)["cycle_points"], 0.0)
+
+    def test_close_rewards_cycle(self):
+        storage = InMemoryStorage()
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=storage)
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["issue_credit_card", "process_card_transaction"])
+        bank._access_control = access_control
+        bank._customers["CUST1"] = Customer("CUST1", "John", "Doe", "1990-01-01", "123 Main St", "john@example.com", {})
+        card_id = bank.issue_credit_card("CUST1", "gold", 500.0, "USD", "user1")
+        bank.process_card_transaction(card_id, "M1", 10.0, "USD", {"merchant_category": "dining"}, "user1")
+        with self.assertRaises(PermissionError):
+            bank.close_rewards_cycle("user1")
+        access_control.add_role("user2", "admin", ["close_rewards_cycle"])
+        self.assertEqual(bank.close_rewards_cycle("user2"), {card_id: 40.0})
+        stored = {card["card_id"]: card for card in storage.load()["credit_cards"]}[card_id]
+        self.assertEqual((stored["cycle_points"], stored["lifetime_points"]), (0.0, 40.0))
+
+        # A card whose type has no reward rules still restores, and earns nothing.
+        storage.save_credit_card(CreditCard(card_id, "CUST1", "legacy", 500.0, lifetime_points=40.0))
+        bank._customers["CUST1"].credit_cards = []
+        storage.save_customer(bank._sealed_customers([bank._customers["CUST1"]])[0])
+        restored = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=storage)
+        self.assertEqual(restored.calculate_rewards(card_id, 10.0, "dining"), 0.0)
+        self.assertEqual(restored._rewards.statement(card_id)["lifetime_points"], 40.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import snapshot
+from banking_core import EnterpriseBankingSystem, AccessControl
+from snapshot import SnapshotFormatError, SnapshotReader
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "bank.snap")
+        self.bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["register_customer", "create_account", "process_deposit",
+                                                   "issue_credit_card", "process_card_transaction",
+                                                   "process_loan_application", "view_dashboard"])
+        self.bank._access_control = access_control
+        self.customer_id = self.bank.register_customer({
+            "first_name": "Zoë", "last_name": "Doe", "dob": "1990-01-01", "address": "123 Main St",
+            "contact_info": {"email": "zoe@example.com"}, "id_documents": {"passport": "X1"}}, "user1")
+        self.checking = self.bank.create_account(self.customer_id, "checking", "USD", 100.0, "user1")
+        self.savings = self.bank.create_account(self.customer_id, "savings", "EUR", 5.0, "user1")
+        self.card_id = self.bank.issue_credit_card(self.customer_id, "gold", 1000.0, "USD", "user1")
+        self.bank.process_card_transaction(self.card_id, "M1", 40.0, "USD", {"merchant_category": "dining"}, "user1")
+        self.loan = self.bank.process_loan_application(
+            self.customer_id, "personal", 1200.0, "USD", 12, "user1",
+            applicant={"credit_score": 800, "annual_income": 90000, "debt_to_income": 0.1})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        counts = self.bank.save_snapshot(self.path)
+        self.assertEqual(counts, {"customers": 1, "accounts": 2, "credit_cards": 1, "loans": 1})
+        restored = EnterpriseBankingSystem.from_snapshot(self.path, "encryption_key")
+        self.assertEqual(restored.institution_id, "BOA1234")
+        self.assertEqual(len(restored._accounts), 2)
+        self.assertEqual(restored._accounts[self.savings].balance, 5.0)
+        self.assertEqual(restored._accounts[self.savings].currency, "EUR")
+        customer = restored._customers[self.customer_id]
+        self.assertEqual(customer.first_name, "Zoë")
+        self.assertEqual(customer.id_documents, {"passport": "X1"})
+        self.assertEqual(sorted(customer.accounts), sorted([self.checking, self.savings]))
+        self.assertEqual(restored._credit_cards[self.card_id].balance, 40.0)
+        self.assertEqual(restored._loans[self.loan["loan_id"]].interest_rate, self.loan["interest_rate"])
+        self.assertTrue(restored._access_control.check_permission("user1", "process_deposit"))
+
+    def test_restored_bank_serves_reads_and_postings(self):
+        self.bank.save_snapshot(self.path)
+        restored = EnterpriseBankingSystem.from_snapshot(self.path, "encryption_key")
+        self.assertEqual(restored._customers._overlay, {})
+        restored.process_deposit(self.checking, 50.0, "USD", "cash", {}, "user1")
+        dashboard = restored.get_customer_dashboard(self.customer_id, "user1")
+        self.assertEqual(dashboard["accounts"][self.checking]["balance"], 1350.0)  # includes the disbursed loan
+        self.assertEqual(dashboard["accounts"][self.savings]["balance"], 5.0)
+        self.assertIn(self.loan["loan_id"], dashboard["loans"])
+        new_account = restored.create_account(self.customer_id, "checking", "USD", 0.0, "user1")
+        self.assertIn(new_account, restored._accounts)
+        self.assertEqual(len(restored._accounts), 3)
+
+    def test_restored_customers_block_duplicate_registration(self):
+        self.bank.save_snapshot(self.path)
+        restored = EnterpriseBankingSystem.from_snapshot(self.path, "encryption_key")
+        with self.assertRaises(Exception):
+            restored.register_customer({
+                "first_name": "Zoe", "last_name": "Doe", "dob": "1990-01-01", "address": "1 Elm St",
+                "contact_info": {}, "id_documents": {"passport": "X1"}}, "user1")
+        self.assertIn(self.customer_id, restored._customer_index)
+
+    def test_sensitive_fields_are_encrypted(self):
+        self.bank.save_snapshot(self.path)
+        row = SnapshotReader(self.path).sections["customers"].row(0)
+        self.assertEqual(row["first_name"], "Zoë")
+        self.assertNotEqual(row["dob"], "1990-01-01")
+        self.assertIsInstance(row["id_documents"], str)
+        with open(self.path, "rb") as handle:
+            self.assertNotIn(b"zoe@example.com", handle.read())
+        restored = EnterpriseBankingSystem.from_snapshot(self.path, "encryption_key")
+        self.assertEqual(restored._customers[self.customer_id].dob, "1990-01-01")
+
+    def test_lookup_misses(self):
+        self.bank.save_snapshot(self.path)
+        section = SnapshotReader(self.path).sections["accounts"]
+        self.assertIsNone(section.find("ACC0"))
+        self.assertIsNone(section.find("ACC123456789012"))
+        self.assertEqual(section.rows_for_customer("CUST0"), [])
+
+    def test_rejects_truncated_file(self):
+        self.bank.save_snapshot(self.path)
+        with open(self.path, "r+b") as handle:
+            handle.truncate(os.path.getsize(self.path) - 4)
+        with self.assertRaises(SnapshotFormatError):
+            SnapshotReader(self.path)
+
+    def test_failed_write_keeps_the_previous_snapshot(self):
+        self.bank.save_snapshot(self.path)
+        with open(self.path, "rb") as handle:
+            previous = handle.read()
+        with patch("snapshot._Writer.column", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.bank.save_snapshot(self.path)
+        with open(self.path, "rb") as handle:
+            self.assertEqual(handle.read(), previous)
+        self.assertEqual(os.listdir(self.directory), ["bank.snap"])
+
+    def test_postings_wait_for_the_snapshot(self):
+        write_sections = snapshot._write_sections
+        depositor = threading.Thread(
+            target=self.bank.process_deposit, args=(self.checking, 50.0, "USD", "cash", {}, "user1"))
+
+        def write_while_depositing(*args):
+            depositor.start()
+            depositor.join(0.2)
+            self.assertTrue(depositor.is_alive())
+            write_sections(*args)
+
+        with patch("snapshot._write_sections", write_while_depositing):
+            self.bank.save_snapshot(self.path)
+        depositor.join()
+        restored = EnterpriseBankingSystem.from_snapshot(self.path, "encryption_key")
+        self.assertEqual(restored._accounts[self.checking].balance, 1300.0)
+        self.assertEqual(self.bank._accounts[self.checking].balance, 1350.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from datetime import date
+from unittest.mock import patch
+from banking_core import EnterpriseBankingSystem, AccessControl, Customer
+from storage import DuplicateKeyError, InMemoryStorage, SQLiteStorage
+
+
+def _grant(bank):
+    access_control = AccessControl()
+    access_control.add_role("user1", "admin", ["register_customer", "create_account", "process_deposit",
+                                               "process_transfer", "issue_credit_card",
+                                               "process_card_transaction", "process_loan_application",
+                                               "process_loan_payment", "run_end_of_day"])
+    bank._access_control = access_control
+
+
+class StorageTests:
+    def make_storage(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.storage = self.make_storage()
+        self.bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=self.storage)
+        _grant(self.bank)
+        self.customer_id = self.bank.register_customer({
+            "first_name": "John", "last_name": "Doe", "dob": "1990-01-01", "address": "123 Main St",
+            "contact_info": {"email": "john@example.com"}, "id_documents": {}}, "user1")
+        self.checking = self.bank.create_account(self.customer_id, "checking", "USD", 100.0, "user1")
+        self.savings = self.bank.create_account(self.customer_id, "savings", "USD", 0.0, "user1")
+
+    def test_write_through(self):
+        self.bank.process_deposit(self.checking, 50.0, "USD", "cash", {}, "user1")
+        self.bank.process_transfer(self.checking, self.savings, 30.0, "USD", {}, "user1")
+        self.assertEqual(self.storage.get_account(self.checking)["balance"], 120.0)
+        self.assertEqual(self.storage.get_account(self.savings)["balance"], 30.0)
+        stored = self.storage.get_customer(self.customer_id)
+        self.assertEqual(stored["first_name"], "John")
+        for field in ("dob", "contact_info", "id_documents"):
+            self.assertIsInstance(stored[field], str)
+        self.assertNotIn("john@example.com", stored["contact_info"])
+        self.assertEqual(len(self.storage.accounts_for_customer(self.customer_id)), 2)
+        history = self.storage.transactions_for_account(self.checking)
+        self.assertEqual([t["transaction_type"] for t in history], ["transfer", "deposit"])
+        self.assertEqual(history[0]["counterparty_account_id"], self.savings)
+
+    def test_postings_are_stored_with_their_balances(self):
+        with patch.object(self.storage, "save_balances", wraps=self.storage.save_balances) as save_balances, \
+                patch.object(self.storage, "append_transaction") as append_transaction:
+            self.bank.process_deposit(self.checking, 50.0, "USD", "cash", {}, "user1")
+            self.bank.process_transfer(self.checking, self.savings, 30.0, "USD", {}, "user1")
+            self.bank.process_deposits([(self.savings, 5.0, "USD")], "user1")
+        append_transaction.assert_not_called()
+        batches = [call.args[1] for call in save_balances.call_args_list]
+        self.assertEqual([[(t.transaction_type, customer_id) for t, customer_id in batch] for batch in batches],
+                         [[("deposit", self.customer_id)], [("transfer", self.customer_id)],
+                          [("deposit", self.customer_id)]])
+        self.assertEqual(len(self.storage.transactions_for_account(self.savings)), 1)
+
+    def test_restore(self):
+        card_id = self.bank.issue_credit_card(self.customer_id, "gold", 1000.0, "EUR", "user1")
+        self.bank.process_card_transaction(card_id, "M1", 40.0, "EUR", {"merchant_category": "dining"}, "user1")
+        self.bank.process_deposit(self.checking, 25.0, "USD", "cash", {}, "user1")
+        restored = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=self.storage)
+        self.assertEqual(restored._credit_cards[card_id].currency, "EUR")
+        self.assertEqual(restored._customers[self.customer_id].contact_info, {"email": "john@example.com"})
+        self.assertEqual(restored._customers[self.customer_id].dob, "1990-01-01")
+        self.assertEqual(restored._accounts[self.checking].balance, 125.0)
+        self.assertEqual(sorted(restored._customers[self.customer_id].accounts), sorted([self.checking, self.savings]))
+        self.assertEqual(restored._credit_cards[card_id].balance, 40.0)
+        self.assertEqual(restored._dashboards.get(self.customer_id)["total_balances"], {"USD": 125.0})
+
+    def test_restore_replays_ledger_rewards_and_loans(self):
+        card_id = self.bank.issue_credit_card(self.customer_id, "gold", 1000.0, "USD", "user1")
+        self.bank.process_card_transaction(card_id, "M1", 40.0, "USD", {"merchant_category": "dining"}, "user1")
+        self.bank.process_transfer(self.checking, self.savings, 30.0, "USD", {}, "user1")
+        loan = self.bank.process_loan_application(
+            self.customer_id, "personal", 1200.0, "USD", 12, "user1",
+            applicant={"credit_score": 780, "annual_income": 90000, "debt_to_income": 0.2})
+        self.bank.process_loan_payment(loan["loan_id"], loan["monthly_payment"], self.checking, "user1")
+        self.bank.flush()
+        restored = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=self.storage)
+        self.assertEqual([t.transaction_id for t in restored._transactions],
+                         [t.transaction_id for t in self.bank._transactions])
+        self.assertEqual(len(restored._analytics), len(self.bank._transactions))
+        self.assertEqual(restored._aml_monitor.counterparties(self.checking), [self.savings])
+        self.assertEqual(restored._rewards.statement(card_id), self.bank._rewards.statement(card_id))
+        self.assertAlmostEqual(restored._loan_book.outstanding(loan["loan_id"]),
+                               self.bank._loan_book.outstanding(loan["loan_id"]))
+
+    def test_restore_keeps_business_dates(self):
+        self.bank.process_deposit(self.savings, 36500.0, "USD", "cash", {}, "user1")
+        self.bank.run_end_of_day(date(2024, 1, 15), "user1")
+        self.bank.flush()
+        restored = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=self.storage)
+        self.assertEqual([(t.transaction_type, t.business_date) for t in restored._transactions],
+                         [("deposit", None), ("interest", date(2024, 1, 15))])
+
+    def test_duplicate_ids_are_rejected(self):
+        customer = Customer(self.customer_id, "Jane", "Roe", "1991-01-01", "", {}, {})
+        with self.assertRaises(DuplicateKeyError):
+            self.storage.save_customer(customer)
+        with self.assertRaises(DuplicateKeyError):
+            self.storage.save_account(self.bank._accounts[self.checking])
+
+    def test_wrapped_keys_are_stored(self):
+        self.storage.save_wrapped_key("OTHER1", b"\x02wrapped")
+        wrapped_keys = self.storage.load()["wrapped_keys"]
+        self.assertEqual(wrapped_keys["OTHER1"], b"\x02wrapped")
+        # Registering the customer created the institution's data key for its encrypted fields.
+        self.assertEqual(wrapped_keys["BOA1234"], self.bank._wrapped_keys["BOA1234"])
+
+
+class TestInMemoryStorage(StorageTests, unittest.TestCase):
+    def make_storage(self):
+        return InMemoryStorage()
+
+
+class TestSQLiteStorage(StorageTests, unittest.TestCase):
+    def make_storage(self):
+        self.directory = tempfile.mkdtemp()
+        return SQLiteStorage(os.path.join(self.directory, "bank.db"), pool_size=2, batch_size=3)
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.directory)
+
+    def test_postings_are_batched(self):
+        self.bank.process_deposit(self.checking, 1.0, "USD", "cash", {}, "user1")
+        self.assertEqual(len(self.storage._pending_transactions), 1)
+        self.bank.process_deposit(self.checking, 1.0, "USD", "cash", {}, "user1")
+        self.bank.process_deposit(self.checking, 1.0, "USD", "cash", {}, "user1")
+        self.assertEqual(self.storage._pending_transactions, [])
+
+    def test_buffered_postings_are_flushed_periodically(self):
+        self.storage.close()
+        self.storage = SQLiteStorage(self.storage.path, batch_size=100, flush_interval=0.05)
+        bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=self.storage)
+        _grant(bank)
+        bank.process_deposit(self.checking, 1.0, "USD", "cash", {}, "user1")
+        deadline = time.monotonic() + 5
+        while self.storage._pending_transactions and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.storage._pending_transactions, [])
+        self.assertEqual(len(self.storage.transactions_for_account(self.checking)), 1)
+
+    def test_survives_reopen(self):
+        self.bank.process_deposit(self.checking, 5.0, "USD", "cash", {}, "user1")
+        self.storage.close()
+        self.storage = SQLiteStorage(self.storage.path)
+        self.assertEqual(self.storage.get_account(self.checking)["balance"], 105.0)
+        self.assertEqual(len(self.storage.transactions_for_account(self.checking)), 1)
+
+    def test_cards_stored_without_currency_are_usd(self):
+        self.storage.close()
+        connection = sqlite3.connect(self.storage.path)
+        connection.executescript("DROP TABLE credit_cards; CREATE TABLE credit_cards (card_id TEXT PRIMARY KEY, "
+                                 "customer_id TEXT NOT NULL, card_type TEXT, credit_limit REAL, balance REAL) "
+                                 "WITHOUT ROWID;")
+        connection.execute("INSERT INTO credit_cards VALUES ('CARD1', ?, 'gold', 500.0, 20.0)", (self.customer_id,))
+        connection.commit()
+        connection.close()
+        self.storage = SQLiteStorage(self.storage.path)
+        restored = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=self.storage)
+        self.assertEqual(restored._credit_cards["CARD1"].currency, "USD")
+        self.assertEqual(restored._credit_cards["CARD1"].balance, 20.0)
+
+    def test_transactions_stored_without_business_date(self):
+        self.bank.process_deposit(self.checking, 5.0, "USD", "cash", {}, "user1")
+        self.storage.close()
+        connection = sqlite3.connect(self.storage.path)
+        connection.execute("ALTER TABLE transactions DROP COLUMN business_date")
+        connection.commit()
+        connection.close()
+        self.storage = SQLiteStorage(self.storage.path)
+        restored = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key", storage=self.storage)
+        self.assertEqual([t.business_date for t in restored._transactions], [None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import random
+import threading
+import unittest
+from banking_core import Account, AccessControl, EnterpriseBankingSystem, Transaction
+from transaction_engine import AccountNotFoundError, InsufficientFundsError, TransactionEngine
+
+
+class FailingAccount(Account):
+    @property
+    def balance(self):
+        return self._balance
+
+    @balance.setter
+    def balance(self, value):
+        if getattr(self, "fail", False):
+            raise RuntimeError("storage failure")
+        self._balance = value
+
+
+class TestTransactionEngine(unittest.TestCase):
+    def setUp(self):
+        self.accounts = {f"ACC{i}": Account(f"ACC{i}", "CUST1", "checking", "USD", 100.0) for i in range(4)}
+        self.engine = TransactionEngine(self.accounts, num_stripes=8)
+
+    def test_transfer(self):
+        self.engine.transfer("ACC0", "ACC1", 40.0)
+        self.assertEqual(self.accounts["ACC0"].balance, 60.0)
+        self.assertEqual(self.accounts["ACC1"].balance, 140.0)
+
+    def test_unknown_account_changes_nothing(self):
+        with self.assertRaises(AccountNotFoundError):
+            self.engine.transfer("ACC0", "missing", 40.0)
+        self.assertEqual(self.accounts["ACC0"].balance, 100.0)
+
+    def test_insufficient_funds_changes_nothing(self):
+        with self.assertRaises(InsufficientFundsError):
+            self.engine.post([("ACC0", 50.0), ("ACC1", -150.0), ("ACC2", 100.0)])
+        self.assertEqual([a.balance for a in self.accounts.values()], [100.0] * 4)
+
+    def test_legs_are_netted_per_account(self):
+        self.engine.post([("ACC0", -150.0), ("ACC0", 60.0), ("ACC1", 90.0)])
+        self.assertEqual(self.accounts["ACC0"].balance, 10.0)
+
+    def test_failed_leg_is_rolled_back(self):
+        failing = FailingAccount("ACC9", "CUST1", "checking", "USD", 0.0)
+        failing.fail = True
+        self.accounts["ACC9"] = failing
+        with self.assertRaises(RuntimeError):
+            self.engine.post([("ACC0", -30.0), ("ACC1", 10.0), ("ACC9", 20.0)])
+        self.assertEqual(self.accounts["ACC0"].balance, 100.0)
+        self.assertEqual(self.accounts["ACC1"].balance, 100.0)
+
+    def test_failed_commit_is_rolled_back(self):
+        def fail(accounts):
+            raise RuntimeError("ledger unavailable")
+
+        with self.assertRaises(RuntimeError):
+            self.engine.transfer("ACC0", "ACC1", 40.0, on_commit=fail)
+        self.assertEqual([a.balance for a in self.accounts.values()], [100.0] * 4)
+
+    def test_adjust_sees_live_balances(self):
+        self.engine.post([("ACC0", -150.0), ("ACC1", 10.0)],
+                         adjust=lambda accounts, deltas: [max(d, -a.balance) for a, d in zip(accounts, deltas)])
+        self.assertEqual(self.accounts["ACC0"].balance, 0.0)
+        self.assertEqual(self.accounts["ACC1"].balance, 110.0)
+
+    def test_concurrent_transfers_conserve_money(self):
+        accounts = {f"ACC{i}": Account(f"ACC{i}", "CUST1", "checking", "USD", 1000) for i in range(50)}
+        engine = TransactionEngine(accounts, num_stripes=16)
+        ids = list(accounts)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(2000):
+                source, destination = rng.sample(ids, 2)
+                try:
+                    engine.transfer(source, destination, rng.randint(1, 400))
+                except InsufficientFundsError:
+                    pass
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(a.balance for a in accounts.values()), 50 * 1000)
+        self.assertTrue(all(a.balance >= 0 for a in accounts.values()))
+
+
+class TestBankingTransfers(unittest.TestCase):
+    def setUp(self):
+        self.bank = EnterpriseBankingSystem("Bank of America", "BOA1234", "encryption_key")
+        access_control = AccessControl()
+        access_control.add_role("user1", "admin", ["process_transfer", "process_withdrawal", "process_deposit"])
+        self.bank._access_control = access_control
+        self.bank._accounts["ACC1"] = Account("ACC1", "CUST1", "checking", "USD", 500.0)
+        self.bank._accounts["ACC2"] = Account("ACC2", "CUST2", "checking", "USD", 0.0)
+
+    def test_process_transfer(self):
+        transaction = self.bank.process_transfer("ACC1", "ACC2", 200.0, "USD", {}, "user1")
+        self.assertEqual(transaction.transaction_type, "transfer")
+        self.assertEqual(transaction.counterparty_account_id, "ACC2")
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 300.0)
+        self.assertEqual(self.bank._accounts["ACC2"].balance, 200.0)
+        self.assertEqual(self.bank._aml_monitor.counterparties("ACC1"), ["ACC2"])
+
+    def test_transfer_to_missing_account_keeps_money(self):
+        with self.assertRaises(AccountNotFoundError):
+            self.bank.process_transfer("ACC1", "ACC404", 200.0, "USD", {}, "user1")
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 500.0)
+
+    def test_overdraft_is_prevented(self):
+        with self.assertRaises(InsufficientFundsError):
+            self.bank.process_withdrawal("ACC2", 1.0, "USD", "ATM", {}, "user1")
+
+    def test_non_positive_amounts_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.bank.process_withdrawal("ACC1", -1_000_000.0, "USD", "ATM", {}, "user1")
+        with self.assertRaises(ValueError):
+            self.bank.process_deposit("ACC1", -500.0, "USD", "cash", {}, "user1")
+        with self.assertRaises(ValueError):
+            self.bank.process_deposit("ACC1", 0.0, "USD", "cash", {}, "user1")
+        with self.assertRaises(ValueError):
+            self.bank.process_transfer("ACC1", "ACC2", -5.0, "USD", {}, "user1")
+        with self.assertRaises(ValueError):
+            self.bank.process_transfer("ACC1", "ACC404", 0.0, "USD", {}, "user1")
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 500.0)
+        self.assertEqual(self.bank._transactions, [])
+
+    def test_process_deposits_posts_valid_deposits_together(self):
+        results = self.bank.process_deposits([("ACC1", 50.0, "USD"), ("ACC404", 10.0, "USD"),
+                                              ("ACC2", 20.0, "EUR"), ("ACC2", 30.0, "USD"), ("ACC1", -1.0, "USD")],
+                                             "user1")
+        self.assertEqual([r.amount if isinstance(r, Transaction) else type(r) for r in results],
+                         [50.0, AccountNotFoundError, Exception, 30.0, ValueError])
+        self.assertEqual(self.bank._accounts["ACC1"].balance, 550.0)
+        self.assertEqual(self.bank._accounts["ACC2"].balance, 30.0)
+        self.assertEqual(len(self.bank._transactions), 2)
+        recent = self.bank._dashboards.get("CUST1")["recent_activity"]
+        self.assertEqual([(a["transaction_id"], a["amount"]) for a in recent], [(results[0].transaction_id, 50.0)])
+        self.assertEqual(self.bank._dashboards.get("CUST2")["recent_activity"][0]["amount"], 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
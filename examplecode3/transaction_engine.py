@@ -0,0 +1,141 @@
+import threading
+from contextlib import contextmanager
+
+
+class AccountNotFoundError(Exception):
+    pass
+
+
+class InsufficientFundsError(Exception):
+    pass
+
+
+class TransactionEngine:
+    """All-or-nothing balance postings over a dict of accounts.
+
+    Each account hashes to one of `num_stripes` locks. A posting takes the
+    stripes of every account it touches in ascending stripe order, so two
+    postings can never wait on each other in a cycle, and postings over
+    disjoint accounts rarely share a stripe at all. Every leg records the
+    balance it replaced in an undo log; if any leg fails the log is replayed
+    backwards before the locks are released, so no partial posting is ever
+    visible.
+
+    Striping removes lock contention between postings over disjoint
+    accounts, but postings are pure Python and share the GIL, so threads
+    interleave rather than run in parallel and throughput stays flat as
+    threads are added (run this module to measure it). Throughput that
+    scales with cores needs accounts partitioned across processes, as
+    examplecode2's ShardedBank does.
+    """
+
+    def __init__(self, accounts, num_stripes=256):
+        self._accounts = accounts
+        self._stripes = [threading.Lock() for _ in range(num_stripes)]
+
+    def _lock_order(self, account_ids):
+        return sorted({hash(account_id) % len(self._stripes) for account_id in account_ids})
+
+    @contextmanager
+    def paused(self):
+        """Hold every stripe, so no posting is in progress until the block exits.
+
+        Stripes are taken in ascending order, the same order post() uses, so
+        pausing never deadlocks with a posting.
+        """
+        for stripe in self._stripes:
+            stripe.acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(self._stripes):
+                stripe.release()
+
+    def post(self, legs, allow_overdraft=False, on_commit=None, adjust=None):
+        """Apply a multi-leg posting atomically.
+
+        Args:
+            legs (list): (account_id, delta) pairs; positive deltas credit.
+            allow_overdraft (bool): Skip the non-negative balance check.
+            on_commit (callable): Called with the touched accounts while their
+                locks are still held, so derived views see postings in order.
+                If it raises, the posting is rolled back.
+            adjust (callable): Called as adjust(accounts, deltas) with the
+                locks held, before the balance check; returns the deltas to
+                apply instead, so a leg can depend on live balances.
+
+        Raises:
+            AccountNotFoundError: If any leg names an unknown account.
+            InsufficientFundsError: If any account would end below zero.
+        """
+        legs = list(legs)
+        accounts = []
+        for account_id, _ in legs:
+            account = self._accounts.get(account_id)
+            if account is None:
+                raise AccountNotFoundError(f"Account {account_id} not found")
+            accounts.append(account)
+
+        stripes = [self._stripes[i] for i in self._lock_order(account_id for account_id, _ in legs)]
+        for stripe in stripes:
+            stripe.acquire()
+        try:
+            if adjust is not None:
+                deltas = adjust(accounts, [delta for _, delta in legs])
+                legs = [(account_id, delta) for (account_id, _), delta in zip(legs, deltas)]
+            if not allow_overdraft:
+                net = {}
+                for account, (account_id, delta) in zip(accounts, legs):
+                    net[account_id] = net.get(account_id, account.balance) + delta
+                for account_id, balance in net.items():
+                    if balance < 0:
+                        raise InsufficientFundsError(f"Insufficient funds in account {account_id}")
+            undo_log = []
+            try:
+                for account, (_, delta) in zip(accounts, legs):
+                    previous = account.balance
+                    account.balance = previous + delta
+                    undo_log.append((account, previous))
+                if on_commit is not None:
+                    # Deduplicated by id: account stores may hand out a fresh proxy per lookup.
+                    touched = {account_id: account for account, (account_id, _) in zip(accounts, legs)}
+                    on_commit(list(touched.values()))
+            except BaseException:
+                for account, balance in reversed(undo_log):
+                    account.balance = balance
+                raise
+        finally:
+            for stripe in reversed(stripes):
+                stripe.release()
+
+    def transfer(self, source_account_id, destination_account_id, amount, on_commit=None):
+        if amount <= 0:
+            raise ValueError("Transfer amount must be positive")
+        self.post([(source_account_id, -amount), (destination_account_id, amount)], on_commit=on_commit)
+
+
+if __name__ == "__main__":
+    import os
+    import time as timer
+    from types import SimpleNamespace
+
+    # Disjoint-account throughput: every worker transfers between its own pair of accounts.
+    transfers = 50_000
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in counts:
+        accounts = {f"ACC{i}": SimpleNamespace(balance=1e12) for i in range(2 * workers)}
+        engine = TransactionEngine(accounts)
+
+        def work(worker):
+            source, destination = f"ACC{2 * worker}", f"ACC{2 * worker + 1}"
+            for _ in range(transfers // workers):
+                engine.transfer(source, destination, 1.0)
+
+        threads = [threading.Thread(target=work, args=(worker,)) for worker in range(workers)]
+        started = timer.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = timer.perf_counter() - started
+        print(f"{workers} worker(s): {transfers / elapsed:,.0f} transfers/s")
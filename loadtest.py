@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+"""Load generator for the example Gradio apps.
+
+Drives an app's handler functions in-process, or its Gradio HTTP API on a
+running server, with a weighted mix of operations. Reports throughput,
+latency percentiles and error rates as JSON.
+
+    python loadtest.py examplecode2 --scenario deposit-heavy --concurrency 32 --rate 500 --requests 10000
+    python loadtest.py examplecode --url http://127.0.0.1:7860 --scenario trade-heavy --max-p99-ms 250
+"""
+import argparse
+import asyncio
+import importlib.util
+import inspect
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.request
+
+SYMBOLS = ["AAPL", "TSLA", "GOOGL"]
+
+# Relative operation weights. Operations an app does not offer are skipped.
+SCENARIOS = {
+    "deposit-heavy": {"deposit": 8, "withdraw": 1, "balance": 1},
+    "trade-heavy": {"buy": 4, "sell": 4, "quote": 1, "transfer": 4, "deposit": 1},
+    "history-browsing": {"history": 6, "holdings": 2, "profit_loss": 2, "balance": 4},
+}
+
+
+def _examplecode_setup(call, accounts):
+    call("create_account", "loadtest", 1_000_000_000)
+    return {}
+
+
+def _examplecode2_setup(call, accounts):
+    account_ids = []
+    for i in range(accounts):
+        account_ids.append(call("create_account", f"load{i}", f"L{i}", "USD")["account_id"])
+        call("deposit", account_ids[-1], 1_000_000.0)
+    return {"account_ids": account_ids}
+
+
+def _examplecode3_setup(call, accounts):
+    account_ids = []
+    for i in range(accounts):
+        message = call("register_customer", "Load", f"Test{i}", "1990-01-01", "1 Test St",
+                       f"load{i}@example.com", json.dumps({"passport": f"LOAD{os.getpid()}{i}"}))
+        customer_id = re.search(r"ID: (\S+)", message).group(1)
+        message = call("create_account", customer_id, "Checking", "USD", 1_000_000.0)
+        account_ids.append(re.search(r"ID: (\S+)", message).group(1))
+    return {"account_ids": account_ids}
+
+
+def _account(rng, context):
+    return rng.choice(context["account_ids"])
+
+
+def _successful(result):
+    # Handlers report most failures as a message ("Deposit Failed", str(exc)) rather than raising.
+    return isinstance(result, str) and "successful" in result.lower()
+
+
+def _found(result):
+    return result is not None
+
+
+# Per app: setup, and operation -> (handler name, batched event?, argument factory,
+# success predicate on the returned value or None to accept anything returned).
+APPS = {
+    "examplecode": {
+        "setup": _examplecode_setup,
+        "handlers": {
+            "create_account": ("create_account", False),
+        },
+        "operations": {
+            "deposit": ("deposit", True, lambda rng, ctx: (round(rng.uniform(1, 100), 2),), _successful),
+            "withdraw": ("withdraw", False, lambda rng, ctx: (round(rng.uniform(1, 50), 2),), _successful),
+            "buy": ("buy_shares", False, lambda rng, ctx: (rng.choice(SYMBOLS), rng.randint(1, 5)), _successful),
+            "sell": ("sell_shares", False, lambda rng, ctx: (rng.choice(SYMBOLS), rng.randint(1, 5)), _successful),
+            "quote": ("check_stock_price", False, lambda rng, ctx: (rng.choice(SYMBOLS),),
+                      lambda result: isinstance(result, str) and result.startswith("Current price")),
+            "holdings": ("get_holdings", False, lambda rng, ctx: (), None),
+            "profit_loss": ("get_profit_loss", False, lambda rng, ctx: (), None),
+            "history": ("get_transactions", False, lambda rng, ctx: (), None),
+        },
+    },
+    "examplecode2": {
+        "setup": _examplecode2_setup,
+        "handlers": {
+            "create_account": ("create_account", False),
+            "deposit": ("perform_deposit", True),
+        },
+        "operations": {
+            "deposit": ("perform_deposit", True,
+                        lambda rng, ctx: (_account(rng, ctx), round(rng.uniform(1, 100), 2)), _successful),
+            "withdraw": ("perform_withdrawal", False,
+                         lambda rng, ctx: (_account(rng, ctx), round(rng.uniform(1, 50), 2)), _successful),
+            "transfer": ("perform_transfer", False,
+                         lambda rng, ctx: (*rng.sample(ctx["account_ids"], 2), round(rng.uniform(1, 50), 2)),
+                         _successful),
+            "balance": ("get_account_details", False, lambda rng, ctx: (_account(rng, ctx),), _found),
+        },
+    },
+    "examplecode3": {
+        "setup": _examplecode3_setup,
+        "handlers": {
+            "register_customer": ("register_customer_interface", False),
+            "create_account": ("create_account_interface", False),
+        },
+        "operations": {
+            "deposit": ("process_deposit_interface", True,
+                        lambda rng, ctx: (_account(rng, ctx), round(rng.uniform(1, 100), 2), "USD"), _successful),
+        },
+    },
+}
+
+
+def build_plan(app, scenario):
+    """Weighted (operation, weight, handler, batched, make_args, succeeded) entries of a scenario an app supports."""
+    operations = APPS[app]["operations"]
+    plan = [(name, weight, *operations[name]) for name, weight in SCENARIOS[scenario].items() if name in operations]
+    if not plan:
+        raise ValueError(f"{app} offers none of the operations in scenario {scenario!r}")
+    return plan
+
+
+class InProcessTarget:
+    """Calls an app's handler functions directly, as Gradio would."""
+
+    def __init__(self, app_dir):
+        sys.path.insert(0, os.path.abspath(app_dir))
+        spec = importlib.util.spec_from_file_location(f"{os.path.basename(app_dir)}_app",
+                                                      os.path.join(app_dir, "app.py"))
+        self.module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.module)
+
+    def call(self, handler, batched, args):
+        function = getattr(self.module, handler)
+        if batched:
+            # Batched events take one list per input and return one list per output.
+            args = [[arg] for arg in args]
+        result = function(*args)
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+        return result[0][0] if batched else result
+
+
+class HttpTarget:
+    """Calls a running Gradio server through its call API (POST, then read the event stream)."""
+
+    def __init__(self, base_url, api_prefix="/gradio_api", timeout=30.0, api_names=None):
+        self.base_url = base_url.rstrip("/") + api_prefix
+        self.timeout = timeout
+        self.api_names = dict(api_names or {})
+
+    def call(self, handler, batched, args):
+        api_name = self.api_names.get(handler, handler)
+        request = urllib.request.Request(f"{self.base_url}/call/{api_name}",
+                                         data=json.dumps({"data": list(args)}).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            event_id = json.load(response)["event_id"]
+        with urllib.request.urlopen(f"{self.base_url}/call/{api_name}/{event_id}", timeout=self.timeout) as stream:
+            event = None
+            for line in stream:
+                line = line.decode("utf-8").strip()
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:") and event in ("complete", "error"):
+                    data = json.loads(line[5:].strip() or "null")
+                    if event == "error":
+                        raise RuntimeError(f"{api_name} failed: {data}")
+                    return data[0] if isinstance(data, list) and len(data) == 1 else data
+        raise RuntimeError(f"{api_name} stream ended without a result")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-fraction * len(sorted_values) // 1)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _latency_summary(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1] if latencies else None,
+        "mean": sum(latencies) / len(latencies) if latencies else None,
+    }
+
+
+def run_load(call, plan, context=None, concurrency=8, rate=None, requests=1000, duration=None, seed=0):
+    """Run a weighted operation mix and measure it.
+
+    Args:
+        call (callable): call(handler, batched, args), raising on failure.
+        plan (list): (operation, weight, handler, batched, make_args, succeeded)
+            entries; make_args(rng, context) returns the handler's arguments,
+            and a call whose result fails succeeded(result) counts as an
+            error just like one that raised (None accepts any result).
+        context (dict): Passed to every make_args (e.g. account ids from setup).
+        concurrency (int): Worker threads issuing requests.
+        rate (float): Target requests per second across all workers; None
+            sends as fast as the workers can. With a rate, latency is measured
+            from each request's scheduled start, so time spent waiting for a
+            free worker counts too.
+        requests (int): Requests to send; None to run for `duration` instead.
+        duration (float): Seconds to run; stops early once `requests` are sent.
+
+    Returns:
+        dict: Throughput, error counts and latency percentiles (ms), overall
+            and per operation.
+    """
+    context = context or {}
+    weights = [entry[1] for entry in plan]
+    lock = threading.Lock()
+    issued = [0]
+    samples = []  # (operation, latency_ms, ok, error)
+    started = time.perf_counter()
+    deadline = None if duration is None else started + duration
+
+    def next_request():
+        with lock:
+            index = issued[0]
+            if requests is not None and index >= requests:
+                return None
+            issued[0] += 1
+        return index
+
+    def worker(number):
+        rng = random.Random(seed * 7919 + number)
+        while True:
+            index = next_request()
+            if index is None:
+                return
+            scheduled = started + index / rate if rate else None
+            now = time.perf_counter()
+            if deadline is not None and (scheduled or now) >= deadline:
+                return
+            if scheduled is not None and scheduled > now:
+                time.sleep(scheduled - now)
+            operation, _, handler, batched, make_args, succeeded = rng.choices(plan, weights)[0]
+            begin = scheduled if scheduled is not None else time.perf_counter()
+            error = None
+            try:
+                result = call(handler, batched, make_args(rng, context))
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            else:
+                if succeeded is not None and not succeeded(result):
+                    error = f"{operation} returned {str(result)[:200]!r}"
+            latency = (time.perf_counter() - begin) * 1000.0
+            with lock:
+                samples.append((operation, latency, error is None, error))
+
+    threads = [threading.Thread(target=worker, args=(number,), daemon=True) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    errors = [sample for sample in samples if not sample[2]]
+    operations = {}
+    for name in sorted({sample[0] for sample in samples}):
+        mine = [sample for sample in samples if sample[0] == name]
+        operations[name] = {
+            "requests": len(mine),
+            "errors": sum(1 for sample in mine if not sample[2]),
+            "latency_ms": _latency_summary([sample[1] for sample in mine]),
+        }
+    return {
+        "concurrency": concurrency,
+        "target_rate": rate,
+        "requests": len(samples),
+        "duration_s": elapsed,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "errors": len(errors),
+        "error_rate": len(errors) / len(samples) if samples else 0.0,
+        "error_examples": sorted({sample[3] for sample in errors})[:5],
+        "latency_ms": _latency_summary([sample[1] for sample in samples]),
+        "operations": operations,
+    }
+
+
+def check_thresholds(report, max_p99_ms=None, max_error_rate=None):
+    """Return a list of threshold violations (empty when the run passes)."""
+    failures = []
+    p99 = report["latency_ms"]["p99"]
+    if max_p99_ms is not None and p99 is not None and p99 > max_p99_ms:
+        failures.append(f"p99 latency {p99:.1f}ms exceeds {max_p99_ms}ms")
+    if max_error_rate is not None and report["error_rate"] > max_error_rate:
+        failures.append(f"error rate {report['error_rate']:.2%} exceeds {max_error_rate:.2%}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test an example Gradio app.")
+    parser.add_argument("app", choices=sorted(APPS))
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="deposit-heavy")
+    parser.add_argument("--url", help="Base URL of a running app; omit to call the handlers in-process")
+    parser.add_argument("--api-prefix", default="/gradio_api", help="Gradio API path prefix ('' for Gradio 4)")
+    parser.add_argument("--api-name", action="append", default=[], metavar="HANDLER=NAME",
+                        help="Endpoint name for a handler, when it differs from the function name")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, help="Target requests per second")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a request count")
+    parser.add_argument("--accounts", type=int, default=20, help="Accounts created before the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    parser.add_argument("--max-p99-ms", type=float, help="Exit non-zero if p99 latency exceeds this")
+    parser.add_argument("--max-error-rate", type=float, help="Exit non-zero if the error rate exceeds this")
+    args = parser.parse_args(argv)
+
+    app = APPS[args.app]
+    if args.url:
+        target = HttpTarget(args.url, args.api_prefix, api_names=dict(item.split("=", 1) for item in args.api_name))
+    else:
+        target = InProcessTarget(os.path.join(os.path.dirname(os.path.abspath(__file__)), args.app))
+    handlers = {**app["handlers"], **{name: (handler, batched) for name, (handler, batched, *_) in
+                                      app["operations"].items()}}
+    context = app["setup"](lambda name, *call_args: target.call(*handlers[name], call_args), args.accounts)
+    report = run_load(target.call, build_plan(args.app, args.scenario), context, concurrency=args.concurrency,
+                      rate=args.rate, requests=None if args.duration else args.requests,
+                      duration=args.duration, seed=args.seed)
+    report = {"app": args.app, "target": args.url or "in-process", "scenario": args.scenario, **report}
+    report["failures"] = check_thresholds(report, args.max_p99_ms, args.max_error_rate)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text)
+    print(text)
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,6 +26,8 @@ The system has access to external APIs for credit scores, exchange rates, and re
 """
 module_name = "banking_core.py"
 class_name = "EnterpriseBankingSystem"
+# Arguments the performance gate cannot guess: calls made without a permitted role only time the PermissionError.
+perf_hints = {"user_role": "admin"}
 
 def run():
     """Run the banking crew."""
@@ -34,6 +36,7 @@ def run():
         'requirements': requirements,
         'module_name' : module_name,
         'class_name' : class_name,
+        'perf_hints' : perf_hints,
     }
 
     # create and run the crew
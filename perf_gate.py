@@ -0,0 +1,399 @@
+#!/usr/bin/env python
+"""Check how the public methods of a generated class scale as its data grows.
+
+    python perf_gate.py output/accounts.py Account --sizes 500 1000 2000 4000
+
+The gate needs no hand-written benchmark. It builds the class, fills it with
+n calls to its own public methods (arguments are synthesised from parameter
+names and annotations, and ids returned by earlier calls are reused), then
+times each method at that state. Repeating this for increasing n gives a
+per-call cost curve, and the slope of log(time) against log(n) estimates each
+method's exponent: about 0 for O(1), 1 for a full scan or copy. A method
+whose exponent is above the limit fails the gate, and the JSON report
+names it. So does a method whose timed calls mostly raise (say a
+PermissionError for the synthesised user_role): its timings only measure
+the error path, so it is reported as unmeasured until hints supply
+arguments it accepts.
+
+The module under test is generated code. With --sandbox IMAGE it is loaded
+and benchmarked in a throwaway Docker container of that image, with no
+network, that sees only the gate, the module and a scratch directory.
+"""
+import argparse
+import collections.abc
+import contextlib
+import copy
+import gc
+import importlib.util
+import inspect
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+import uuid
+
+# Report lines are tagged so anything the module under test prints is ignored.
+_TAG = "\x00perf_gate "
+DEFAULT_SIZES = (500, 1000, 2000, 4000)
+MAX_EXPONENT = 0.5
+MIN_SECONDS = 2e-6  # calls faster than this at the largest size are never flagged
+MAX_IDS = 1000  # returned ids remembered per key
+MAX_ERROR_RATE = 0.5  # a method whose timed calls raise more often than this is unmeasured
+
+# Values for parameters whose name alone says what they hold.
+DEFAULT_HINTS = {
+    "currency": "USD",
+    "symbol": "AAPL",
+    "account_type": "checking",
+    "source": "cash",
+    "destination": "cash",
+}
+
+
+class _Unsupported(Exception):
+    """Raised when an argument cannot be synthesised, e.g. a callback."""
+
+
+def _base_type(annotation):
+    origin = typing.get_origin(annotation)
+    return origin if origin is not None else annotation
+
+
+class _Arguments:
+    """Synthesises call arguments and remembers ids returned by earlier calls."""
+
+    def __init__(self, seed=0, hints=None):
+        self.rng = random.Random(seed)
+        self.hints = {**DEFAULT_HINTS, **(hints or {})}
+        self.ids = {}
+        self.seen = {}
+
+    def harvest(self, value):
+        if isinstance(value, dict):
+            items = value.items()
+        elif hasattr(value, "__dict__") and not inspect.isroutine(value):
+            items = vars(value).items()
+        else:
+            return
+        for key, item in items:
+            if isinstance(key, str) and key.endswith("id") and isinstance(item, (str, int)):
+                # A reservoir sample, so lookups spread over every id seen, not just the first ones.
+                pool = self.ids.setdefault(key, [])
+                self.seen[key] = self.seen.get(key, 0) + 1
+                if len(pool) < MAX_IDS:
+                    pool.append(item)
+                else:
+                    slot = self.rng.randrange(self.seen[key])
+                    if slot < MAX_IDS:
+                        pool[slot] = item
+
+    def _id(self, name):
+        pools = [pool for key, pool in self.ids.items() if name == key or name.endswith("_" + key)]
+        if pools:
+            return self.rng.choice(self.rng.choice(pools))
+        return f"{name}_1"
+
+    def value(self, parameter):
+        name, annotation = parameter.name, parameter.annotation
+        if name in self.hints:
+            hint = self.hints[name]
+            return hint(self.rng) if callable(hint) else hint
+        base = _base_type(annotation)
+        if base in (typing.Callable, collections.abc.Callable) or "callback" in name or name.startswith("on_"):
+            raise _Unsupported(f"cannot synthesise a callable for {name!r}")
+        if name.endswith("_id") or name == "id":
+            return self._id(name)
+        if base in (list, tuple):
+            args = typing.get_args(annotation)
+            item = inspect.Parameter(name.rstrip("s"), inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                                     annotation=args[0] if args else inspect.Parameter.empty)
+            return [self.value(item) for _ in range(3)]
+        if base is bool:
+            return True
+        if base is int or any(word in name for word in ("quantity", "count", "months", "days", "number")):
+            return self.rng.randint(1, 3)
+        if base is float or any(word in name for word in ("amount", "price", "limit", "balance", "deposit")):
+            return round(self.rng.uniform(10.0, 100.0), 2)
+        if base is dict or name.endswith(("_info", "_data")):
+            return {"name": f"{name} {self.rng.randint(1, 1000)}"}
+        if parameter.default is not inspect.Parameter.empty:
+            return parameter.default
+        if base is str or base is inspect.Parameter.empty:
+            return f"{name}_{self.rng.randint(1, 3)}"
+        raise _Unsupported(f"cannot synthesise {annotation!r} for {name!r}")
+
+    def call_args(self, function):
+        parameters = list(inspect.signature(function).parameters.values())[1:]
+        args = []
+        for parameter in parameters:
+            if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                continue
+            if parameter.default is not inspect.Parameter.empty and parameter.name not in self.hints:
+                break
+            args.append(self.value(parameter))
+        return tuple(args)
+
+
+def public_methods(cls, exclude=()):
+    """Public methods of cls whose arguments can be synthesised, plus those that were skipped."""
+    methods, skipped = [], {}
+    probe = _Arguments()
+    for name, function in inspect.getmembers(cls, inspect.isfunction):
+        if name.startswith("_") or name in exclude:
+            continue
+        try:
+            probe.call_args(function)
+        except _Unsupported as exc:
+            skipped[name] = str(exc)
+            continue
+        methods.append(name)
+    return methods, skipped
+
+
+def fit_exponent(sizes, seconds):
+    """Least-squares slope of log(seconds) against log(size)."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1e-12)) for value in seconds]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+
+
+def strip_code_fences(source):
+    """The code inside a markdown ``` fence, for agent output that wraps a module in one."""
+    lines = source.strip().splitlines()
+    if len(lines) >= 2 and lines[0].startswith("```") and lines[-1].strip() == "```":
+        return "\n".join(lines[1:-1]) + "\n"
+    return source
+
+
+def _build(cls, methods, size, seed, hints):
+    arguments = _Arguments(seed, hints)
+    instance = cls(*arguments.call_args(cls.__init__))
+    for index in range(size):
+        name = methods[index % len(methods)]
+        method = getattr(instance, name)
+        try:
+            arguments.harvest(method(*arguments.call_args(getattr(cls, name))))
+        except Exception:
+            pass
+    return instance, arguments
+
+
+def _time_method(cls, instance, arguments, name, calls, batch_seconds=1e-3, repeats=5):
+    # As in timeit, the collector is off while timing: its cost grows with the
+    # heap, which would make every method look like it scales with n.
+    method = getattr(instance, name)
+    batch = [arguments.call_args(getattr(cls, name)) for _ in range(calls)]
+    best, errors, total, example = float("inf"), 0, 0, None
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            done, started = 0, time.perf_counter()
+            while True:
+                for args in batch:
+                    try:
+                        method(*args)
+                    except Exception as exc:
+                        errors += 1
+                        example = example or f"{type(exc).__name__}: {exc}"
+                done += len(batch)
+                elapsed = time.perf_counter() - started
+                if elapsed >= batch_seconds:
+                    break
+            best = min(best, elapsed / done)
+            total += done
+    finally:
+        gc.enable()
+    return best, errors, total, example
+
+
+def benchmark_class(cls, sizes=DEFAULT_SIZES, max_exponent=MAX_EXPONENT, expected=None, exclude=(),
+                    calls=20, min_seconds=MIN_SECONDS, seed=0, hints=None):
+    """Fit a scaling exponent for every public method of cls.
+
+    Args:
+        cls (type): The class under test.
+        sizes (tuple): Calls made to fill a fresh instance before each round of timings.
+        max_exponent (float): Highest exponent allowed for a method's per-call time.
+        expected (dict): Per-method limits overriding max_exponent, e.g. {"export_all": 1.0}.
+        exclude (tuple): Method names not to call, e.g. ones that write files.
+        calls (int): Distinct argument sets per method and size; they are cycled
+            until a batch takes at least a millisecond, and the best of five batches is kept.
+        min_seconds (float): Methods faster than this at the largest size always pass.
+        seed (int): Seed for the synthesised arguments, so runs are repeatable.
+        hints (dict): Argument values (or functions of a random.Random) by parameter name,
+            e.g. {"user_role": "admin"} for a class that checks permissions.
+
+    Returns:
+        dict: passed, the sizes and one record per method with its exponent,
+            limit, seconds_per_call at each size, error and call counts and
+            status (ok, slow, unmeasured or skipped). Slow and unmeasured
+            methods fail the gate.
+    """
+    expected = expected or {}
+    methods, skipped = public_methods(cls, exclude)
+    timings = {name: [float("inf")] * len(sizes) for name in methods}
+    errors = {name: [0, 0, None] for name in methods}
+
+    def is_slow(name):
+        return (fit_exponent(sizes, timings[name]) > expected.get(name, max_exponent)
+                and timings[name][-1] >= min_seconds)
+
+    # Methods that look slow are timed a second time, keeping the faster run at
+    # each size: real scaling shows up both times, a burst of machine noise does not.
+    copyable = True
+    for retry in (False, True):
+        names = [name for name in methods if is_slow(name)] if retry else methods
+        if not names:
+            continue
+        for index, size in enumerate(sizes):
+            # Each method is timed on its own copy of one filled instance, so calls timed for one method
+            # do not grow the state of the next and the instance is filled once per size, not per method.
+            # An instance that cannot be copied (it holds a lock or a file, say) is rebuilt instead.
+            filled = _build(cls, methods, size, seed, hints)
+            for position, name in enumerate(names):
+                state = None
+                if position == len(names) - 1:
+                    state = filled
+                elif copyable:
+                    try:
+                        state = copy.deepcopy(filled)
+                    except Exception:
+                        copyable = False
+                instance, arguments = state or _build(cls, methods, size, seed, hints)
+                seconds, failed, made, example = _time_method(cls, instance, arguments, name, calls)
+                timings[name][index] = min(timings[name][index], seconds)
+                errors[name][0] += failed
+                errors[name][1] += made
+                errors[name][2] = errors[name][2] or example
+    records = []
+    for name in methods:
+        failed, made, example = errors[name]
+        record = {"name": name, "status": "slow" if is_slow(name) else "ok",
+                  "exponent": round(fit_exponent(sizes, timings[name]), 2),
+                  "limit": expected.get(name, max_exponent), "seconds_per_call": timings[name],
+                  "errors": failed, "calls": made, "error_example": example}
+        if failed > made * MAX_ERROR_RATE:
+            record["status"] = "unmeasured"
+            record["reason"] = (f"{failed} of {made} timed calls raised ({example}); "
+                                f"pass hints for arguments the method accepts")
+        records.append(record)
+    for name, reason in skipped.items():
+        records.append({"name": name, "status": "skipped", "reason": reason})
+    return {"class_name": cls.__name__,
+            "passed": not any(r["status"] in ("slow", "unmeasured") for r in records),
+            "sizes": list(sizes), "methods": records}
+
+
+def _load_class(module_path, class_name):
+    module_path = os.path.abspath(module_path)
+    sys.path.insert(0, os.path.dirname(module_path))
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(module_path))[0],
+                                                  module_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)
+
+
+def _command(args, directories, sandbox=None, name=None):
+    # python perf_gate.py args, on the host or in a container named `name` that only sees `directories`.
+    command = [os.path.abspath(__file__), *args]
+    if sandbox is None:
+        return [sys.executable, *command]
+    gate = os.path.dirname(os.path.abspath(__file__))
+    mounts = ["-v", f"{gate}:{gate}:ro"]
+    for directory in dict.fromkeys(directories):
+        if directory != gate:
+            mounts += ["-v", f"{directory}:{directory}"]
+    return ["docker", "run", "--rm", "-i", "--network", "none", "--name", name, *mounts, "-w", directories[-1],
+            sandbox, "python", *command]
+
+
+def check_module(module_path, class_name, timeout=120.0, sandbox=None, **options):
+    """Run the benchmark in a subprocess, so a module that hangs or crashes cannot take the caller down.
+
+    Args:
+        module_path (str): Path to the module that defines the class.
+        class_name (str): Name of the class to benchmark.
+        timeout (float): Seconds allowed for loading and benchmarking.
+        sandbox (str): Docker image to load and benchmark the module in,
+            without network access; None runs it on the host.
+        **options: Passed to benchmark_class (sizes, max_exponent, expected, exclude, hints).
+
+    Returns:
+        dict: The benchmark_class report, or passed=False with a load_error.
+    """
+    name = f"perf-gate-{uuid.uuid4().hex[:12]}"
+    try:
+        # Synthesised calls may write files (e.g. save_snapshot("path_1")), so they land in a scratch directory.
+        with tempfile.TemporaryDirectory() as scratch:
+            command = _command(["--worker", os.path.abspath(module_path), class_name, json.dumps(options)],
+                               [os.path.dirname(os.path.abspath(module_path)), scratch], sandbox, name)
+            process = subprocess.run(command, capture_output=True, text=True, timeout=timeout, cwd=scratch)
+    except subprocess.TimeoutExpired:
+        if sandbox is not None:
+            # Killing the docker client leaves its container running.
+            with contextlib.suppress(OSError):
+                subprocess.run(["docker", "kill", name], capture_output=True, timeout=30)
+        return {"class_name": class_name, "passed": False, "methods": [],
+                "load_error": f"benchmark did not finish within {timeout}s; a method is likely far too slow"}
+    except OSError as exc:
+        return {"class_name": class_name, "passed": False, "methods": [],
+                "load_error": f"could not start the benchmark: {exc}"}
+    for line in process.stdout.splitlines():
+        if line.startswith(_TAG):
+            return json.loads(line[len(_TAG):])
+    return {"class_name": class_name, "passed": False, "methods": [],
+            "load_error": process.stderr.strip()[-2000:] or f"benchmark exited with code {process.returncode}"}
+
+
+def check_source(source, class_name, module_name="module.py", **options):
+    """check_module for source code that is not on disk yet, e.g. an agent's output."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, module_name)
+        with open(path, "w") as handle:
+            handle.write(source)
+        return check_module(path, class_name, **options)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "--worker":
+        protocol = sys.stdout
+        sys.stdout = sys.stderr
+        report = benchmark_class(_load_class(argv[1], argv[2]), **json.loads(argv[3]))
+        protocol.write(_TAG + json.dumps(report) + "\n")
+        return 0
+    parser = argparse.ArgumentParser(description="Fail when a class's public methods scale worse than expected.")
+    parser.add_argument("module_path")
+    parser.add_argument("class_name")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--max-exponent", type=float, default=MAX_EXPONENT)
+    parser.add_argument("--exclude", nargs="*", default=[])
+    parser.add_argument("--hint", action="append", default=[], metavar="NAME=VALUE",
+                        help="value for every parameter called NAME; parsed as JSON when it can be")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--sandbox", metavar="IMAGE", help="benchmark the module in a Docker container of this image")
+    args = parser.parse_args(argv)
+    hints = {}
+    for hint in args.hint:
+        name, _, value = hint.partition("=")
+        try:
+            hints[name] = json.loads(value)
+        except ValueError:
+            hints[name] = value
+    report = check_module(args.module_path, args.class_name, args.timeout, args.sandbox, sizes=args.sizes,
+                          max_exponent=args.max_exponent, exclude=args.exclude, hints=hints)
+    print(json.dumps(report, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
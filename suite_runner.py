@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+"""Run a generated unittest module in parallel worker processes with per-test timeouts.
+
+    python suite_runner.py output/test_banking_core.py --workers 4 --timeout 10
+
+Tests are listed in a subprocess, so a module that hangs or crashes on
+import cannot take the runner down. Workers pull test ids one at a time
+from a shared queue. A test that runs past the timeout gets its worker
+killed and is reported as "timeout"; a fresh worker carries on with the
+rest of the queue. The result is a JSON summary with a status, duration
+and failure message for every test.
+
+The tests are generated code. With --sandbox IMAGE every process runs in a
+throwaway Docker container of that image, with no network, that sees only
+the runner and the test module's directory; without it they run on the
+host.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import unittest
+import uuid
+
+# Protocol lines are tagged so anything the tests themselves print is ignored.
+_TAG = "\x00suite_runner "
+MAX_MESSAGE_CHARS = 2000
+
+
+def _command(args, test_path, sandbox=None, name=None):
+    # python suite_runner.py args, on the host or in a container named `name` that only sees the two directories.
+    command = [os.path.abspath(__file__), *args]
+    if sandbox is None:
+        return [sys.executable, *command]
+    runner, tests = os.path.dirname(os.path.abspath(__file__)), os.path.dirname(os.path.abspath(test_path))
+    mounts = ["-v", f"{tests}:{tests}"] + (["-v", f"{runner}:{runner}:ro"] if runner != tests else [])
+    return ["docker", "run", "--rm", "-i", "--network", "none", "--name", name, *mounts, "-w", tests,
+            sandbox, "python", *command]
+
+
+def _kill_container(name):
+    # Killing the docker client leaves its container running.
+    with contextlib.suppress(OSError):
+        subprocess.run(["docker", "kill", name], capture_output=True, timeout=30)
+
+
+def _emit(stream, record):
+    stream.write(_TAG + json.dumps(record) + "\n")
+    stream.flush()
+
+
+def _flatten(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _flatten(test)
+        else:
+            yield test
+
+
+def _import(test_path):
+    directory, filename = os.path.split(os.path.abspath(test_path))
+    sys.path.insert(0, directory)
+    return importlib.import_module(os.path.splitext(filename)[0])
+
+
+class _OutcomeResult(unittest.TestResult):
+    def __init__(self):
+        super().__init__()
+        self.status = "passed"
+        self.message = ""
+
+    def _record(self, status, test, err):
+        self.status = status
+        self.message = "".join(traceback.format_exception(*err))[-MAX_MESSAGE_CHARS:]
+
+    def addFailure(self, test, err):
+        self._record("failed", test, err)
+
+    def addError(self, test, err):
+        self._record("error", test, err)
+
+    def addSkip(self, test, reason):
+        self.status, self.message = "skipped", reason
+
+    def addUnexpectedSuccess(self, test):
+        self.status, self.message = "failed", "unexpected success"
+
+    def addSubTest(self, test, subtest, err):
+        if err is not None:
+            failure = issubclass(err[0], test.failureException)
+            self._record("failed" if failure else "error", subtest, err)
+
+
+def _list_worker(test_path, protocol):
+    module = _import(test_path)
+    suite = unittest.defaultTestLoader.loadTestsFromModule(module)
+    _emit(protocol, {"event": "tests", "ids": [test.id() for test in _flatten(suite)]})
+
+
+def _run_worker(test_path, protocol):
+    _import(test_path)
+    for line in sys.stdin:
+        test_id = line.strip()
+        result = _OutcomeResult()
+        started = time.perf_counter()
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                unittest.defaultTestLoader.loadTestsFromName(test_id).run(result)
+        except Exception:
+            result._record("error", None, sys.exc_info())
+        _emit(protocol, {"event": "result", "id": test_id, "status": result.status,
+                         "duration_s": time.perf_counter() - started, "message": result.message})
+
+
+class _Worker:
+    def __init__(self, test_path, sandbox=None):
+        self.sandbox = sandbox
+        self.name = f"suite-runner-{uuid.uuid4().hex[:12]}"
+        self.process = subprocess.Popen(
+            _command(["--worker", os.path.abspath(test_path)], test_path, sandbox, self.name),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            cwd=os.path.dirname(os.path.abspath(test_path)) or None)
+        self.records = queue.Queue()
+        self.dead = False
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            if line.startswith(_TAG):
+                self.records.put(json.loads(line[len(_TAG):]))
+        self.records.put(None)
+
+    def run(self, test_id, timeout):
+        """Run one test; returns its record, or None if it ran past the timeout."""
+        try:
+            self.process.stdin.write(test_id + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            pass
+        try:
+            record = self.records.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if record is None:
+            self.dead = True
+            record = {"id": test_id, "status": "error", "duration_s": 0.0,
+                      "message": f"worker process exited with code {self.process.wait()}"}
+        return record
+
+    def kill(self):
+        if self.sandbox is not None:
+            _kill_container(self.name)
+        self.process.kill()
+        self.process.wait()
+
+    def close(self):
+        with contextlib.suppress(OSError):
+            self.process.stdin.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+
+def list_tests(test_path, timeout=60.0, sandbox=None):
+    """Test ids in a unittest module, collected in a separate process."""
+    name = f"suite-runner-{uuid.uuid4().hex[:12]}"
+    try:
+        process = subprocess.run(
+            _command(["--list", os.path.abspath(test_path)], test_path, sandbox, name),
+            capture_output=True, text=True, timeout=timeout,
+            cwd=os.path.dirname(os.path.abspath(test_path)) or None)
+    except subprocess.TimeoutExpired:
+        if sandbox is not None:
+            _kill_container(name)
+        raise
+    for line in process.stdout.splitlines():
+        if line.startswith(_TAG):
+            return json.loads(line[len(_TAG):])["ids"]
+    raise RuntimeError(f"Could not load tests from {test_path}: {process.stderr.strip()[-MAX_MESSAGE_CHARS:]}")
+
+
+def run_suite(test_path, workers=None, timeout=10.0, sandbox=None):
+    """Run every test in a unittest module across worker processes.
+
+    Args:
+        test_path (str): Path to the test module, e.g. output/test_banking_core.py.
+            It runs from its own directory, so it imports the module under
+            test as it would there.
+        workers (int): Worker processes; defaults to the CPU count.
+        timeout (float): Seconds one test may run, including worker start-up
+            for the first test a worker runs.
+        sandbox (str): Docker image to run every process in, without network
+            access; None runs the generated tests on the host.
+
+    Returns:
+        dict: Counts per status, wall time and one record per test with its
+            id, status (passed, failed, error, skipped or timeout),
+            duration_s and message.
+    """
+    started = time.perf_counter()
+    try:
+        test_ids = list_tests(test_path, sandbox=sandbox)
+    except (RuntimeError, OSError, subprocess.TimeoutExpired) as exc:
+        return {"test_path": test_path, "total": 0, "passed": 0, "failed": 0, "error": 1, "skipped": 0,
+                "timeout": 0, "duration_s": time.perf_counter() - started, "load_error": str(exc), "tests": []}
+    pending = queue.Queue()
+    for test_id in test_ids:
+        pending.put(test_id)
+    records = {}
+
+    def shard():
+        worker = None
+        while True:
+            try:
+                test_id = pending.get_nowait()
+            except queue.Empty:
+                break
+            if worker is None:
+                worker = _Worker(test_path, sandbox)
+            test_started = time.perf_counter()
+            record = worker.run(test_id, timeout)
+            if record is None:
+                record = {"id": test_id, "status": "timeout", "duration_s": time.perf_counter() - test_started,
+                          "message": f"exceeded {timeout}s timeout"}
+            if record["status"] == "timeout" or worker.dead:
+                worker.kill()
+                worker = None
+            records[test_id] = record
+        if worker is not None:
+            worker.close()
+
+    threads = [threading.Thread(target=shard) for _ in range(max(1, min(workers or os.cpu_count() or 1,
+                                                                        len(test_ids))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    tests = [{key: value for key, value in records[test_id].items() if key != "event"} for test_id in test_ids]
+    summary = {"test_path": test_path, "total": len(tests)}
+    for status in ("passed", "failed", "error", "skipped", "timeout"):
+        summary[status] = sum(1 for test in tests if test["status"] == status)
+    summary["duration_s"] = time.perf_counter() - started
+    summary["tests"] = tests
+    return summary
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in ("--worker", "--list"):
+        protocol = sys.stdout
+        sys.stdout = sys.stderr
+        (_run_worker if argv[0] == "--worker" else _list_worker)(argv[1], protocol)
+        return 0
+    parser = argparse.ArgumentParser(description="Run a unittest module in parallel with per-test timeouts.")
+    parser.add_argument("test_path")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--sandbox", metavar="IMAGE", help="run the tests in Docker containers of this image")
+    args = parser.parse_args(argv)
+    summary = run_suite(args.test_path, args.workers, args.timeout, args.sandbox)
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["total"] and summary["total"] == summary["passed"] + summary["skipped"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
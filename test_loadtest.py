@@ -0,0 +1,139 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loadtest import APPS, SCENARIOS, HttpTarget, InProcessTarget, build_plan, check_thresholds, percentile, run_load
+
+
+class TestRunLoad(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 0.5), percentile(values, 0.99), percentile(values, 1.0)), (50, 99, 100))
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_build_plan_skips_unsupported_operations(self):
+        self.assertEqual([entry[0] for entry in build_plan("examplecode2", "trade-heavy")], ["transfer", "deposit"])
+        with self.assertRaises(ValueError):
+            build_plan("examplecode3", "history-browsing")
+
+    def test_report(self):
+        calls = []
+
+        def call(handler, batched, args):
+            calls.append((handler, args))
+            if handler == "fail":
+                raise RuntimeError("boom")
+            time.sleep(0.001)
+
+        plan = [("ok", 3, "work", False, lambda rng, ctx: (ctx["value"],), None),
+                ("bad", 1, "fail", False, lambda rng, ctx: (), None)]
+        report = run_load(call, plan, {"value": 7}, concurrency=4, requests=200)
+        self.assertEqual(report["requests"], 200)
+        self.assertEqual(len(calls), 200)
+        self.assertEqual(report["errors"], report["operations"]["bad"]["requests"])
+        self.assertEqual(report["error_examples"], ["RuntimeError: boom"])
+        self.assertGreater(report["operations"]["ok"]["requests"], report["operations"]["bad"]["requests"])
+        self.assertGreaterEqual(report["latency_ms"]["p99"], report["latency_ms"]["p50"])
+        self.assertTrue(all(args == (7,) for handler, args in calls if handler == "work"))
+        self.assertEqual(check_thresholds(report, max_error_rate=1.0), [])
+        self.assertEqual(len(check_thresholds(report, max_p99_ms=0.0, max_error_rate=0.0)), 2)
+
+    def test_failure_messages_count_as_errors(self):
+        plan = [("deposit", 1, "perform_deposit", True, lambda rng, ctx: (rng.random(),),
+                 lambda result: result == "Deposit Successful")]
+        report = run_load(lambda handler, batched, args: "Deposit Successful" if args[0] < 0.5 else "Deposit Failed",
+                          plan, concurrency=2, requests=200)
+        self.assertGreater(report["errors"], 0)
+        self.assertLess(report["errors"], 200)
+        self.assertEqual(report["error_examples"], ["deposit returned 'Deposit Failed'"])
+
+    def test_app_predicates(self):
+        deposit = APPS["examplecode2"]["operations"]["deposit"][3]
+        self.assertTrue(deposit("Deposit Successful"))
+        self.assertFalse(deposit("Deposit Failed"))
+        deposit = APPS["examplecode3"]["operations"]["deposit"][3]
+        self.assertTrue(deposit("Deposit successful. Transaction ID: TRANS1234"))
+        self.assertFalse(deposit("User does not have permission to process deposits"))
+        self.assertFalse(APPS["examplecode"]["operations"]["withdraw"][3]("Withdrawal failed. Amount must be ..."))
+        self.assertFalse(APPS["examplecode2"]["operations"]["balance"][3](None))
+
+    def test_rate_is_respected(self):
+        plan = [("noop", 1, "noop", False, lambda rng, ctx: (), None)]
+        report = run_load(lambda *args: None, plan, concurrency=4, rate=200, requests=40)
+        self.assertGreaterEqual(report["duration_s"], 39 / 200)
+
+
+class TestTargets(unittest.TestCase):
+    def test_in_process_target_unwraps_batched_handlers(self):
+        app_dir = tempfile.mkdtemp()
+        with open(os.path.join(app_dir, "app.py"), "w") as handle:
+            handle.write("def echo(a, b):\n    return a + b\n\n"
+                         "async def batched(values):\n    return [[value * 2 for value in values]]\n")
+        target = InProcessTarget(app_dir)
+        self.assertEqual(target.call("echo", False, (1, 2)), 3)
+        self.assertEqual(target.call("batched", True, (21,)), 42)
+
+    def test_http_target_reads_the_event_stream(self):
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                Handler.received = body
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(json.dumps({"event_id": "e1"}).encode())
+
+            def do_GET(self):
+                self.send_response(200)
+                self.end_headers()
+                if self.path.startswith("/gradio_api/call/broken/"):
+                    self.wfile.write(b"event: error\ndata: null\n\n")
+                else:
+                    self.wfile.write(b"event: generating\ndata: [\"partial\"]\n\n"
+                                     b"event: complete\ndata: [\"Deposit Successful\"]\n\n")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        target = HttpTarget(f"http://127.0.0.1:{server.server_port}", api_names={"perform_deposit": "deposit"})
+        self.assertEqual(target.call("perform_deposit", True, ("acc_1", 5.0)), "Deposit Successful")
+        self.assertEqual(Handler.received, {"data": ["acc_1", 5.0]})
+        with self.assertRaises(RuntimeError):
+            target.call("broken", False, ())
+
+
+@unittest.skipUnless(importlib.util.find_spec("gradio") and importlib.util.find_spec("pandas"),
+                     "the example apps need gradio and pandas")
+class TestExampleApps(unittest.TestCase):
+    def test_every_handler_runs_in_process(self):
+        root = os.path.dirname(os.path.abspath(__file__))
+        for app in APPS:
+            for scenario in SCENARIOS:
+                if not any(name in APPS[app]["operations"] for name in SCENARIOS[scenario]):
+                    continue
+                with self.subTest(app=app, scenario=scenario):
+                    # One process per app: examplecode2 and examplecode3 both have a banking_core module.
+                    output = os.path.join(tempfile.mkdtemp(), "report.json")
+                    completed = subprocess.run(
+                        [sys.executable, os.path.join(root, "loadtest.py"), app, "--scenario", scenario,
+                         "--requests", "200", "--accounts", "5", "--output", output],
+                        cwd=root, capture_output=True, text=True, timeout=300)
+                    self.assertEqual(completed.returncode, 0, completed.stderr[-2000:])
+                    with open(output) as handle:
+                        report = json.load(handle)
+                    self.assertEqual(report["requests"], 200)
+                    # Selling shares the random workload never bought is the only failure the apps should report.
+                    self.assertEqual([example for example in report["error_examples"]
+                                      if "You don't own enough shares" not in example], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
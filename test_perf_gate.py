@@ -0,0 +1,136 @@
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+import perf_gate
+from perf_gate import _command, benchmark_class, check_source, fit_exponent, strip_code_fences
+
+GENERATED = '''
+print("module noise")
+
+
+class Registry:
+    def __init__(self, owner: str):
+        self.owner = owner
+        self.items = []
+        self.by_id = {}
+        self.listeners = []
+
+    def add_item(self, name: str, price: float) -> dict:
+        item = {"item_id": f"item_{len(self.items)}", "name": name, "price": price}
+        self.items.append(item)
+        self.by_id[item["item_id"]] = item
+        return item
+
+    def get_item(self, item_id: str) -> dict:
+        return self.by_id[item_id]
+
+    def find_item(self, item_id: str) -> dict:
+        for item in self.items:
+            if item["item_id"] == item_id:
+                return item
+        raise KeyError(item_id)
+
+    def subscribe(self, callback) -> None:
+        self.listeners.append(callback)
+'''
+
+GUARDED = '''
+class Ledger:
+    def __init__(self):
+        self.total = 0.0
+
+    def post(self, amount: float, user_role: str) -> float:
+        if user_role != "admin":
+            raise PermissionError("User does not have permission to post")
+        self.total += amount
+        return self.total
+'''
+
+
+class TestPerfGate(unittest.TestCase):
+    def test_fit_exponent(self):
+        sizes = [100, 200, 400, 800]
+        self.assertAlmostEqual(fit_exponent(sizes, [1e-6] * 4), 0.0)
+        self.assertAlmostEqual(fit_exponent(sizes, [size * 1e-8 for size in sizes]), 1.0)
+        self.assertAlmostEqual(fit_exponent(sizes, [size ** 2 * 1e-9 for size in sizes]), 2.0)
+
+    def test_linear_scan_is_reported(self):
+        report = check_source(GENERATED, "Registry", sizes=[400, 800, 1600, 3200])
+        self.assertFalse(report["passed"], report)
+        methods = {method["name"]: method for method in report["methods"]}
+        self.assertEqual(methods["find_item"]["status"], "slow")
+        self.assertGreater(methods["find_item"]["exponent"], 0.7)
+        self.assertEqual(methods["get_item"]["status"], "ok")
+        self.assertEqual(methods["get_item"]["errors"], 0)
+        self.assertEqual(methods["subscribe"]["status"], "skipped")
+
+    def test_expected_exponent_overrides_the_limit(self):
+        namespace = {}
+        exec(GENERATED, namespace)
+        report = benchmark_class(namespace["Registry"], sizes=(400, 800, 1600, 3200), expected={"find_item": 1.5})
+        self.assertTrue(report["passed"], report)
+        self.assertEqual([method["name"] for method in report["methods"]],
+                         ["add_item", "find_item", "get_item", "subscribe"])
+
+    def test_methods_that_mostly_raise_are_unmeasured(self):
+        namespace = {}
+        exec(GENERATED, namespace)
+        # With add_item excluded nothing is ever stored, so every lookup raises KeyError.
+        report = benchmark_class(namespace["Registry"], sizes=(100, 200), exclude=("add_item",),
+                                 hints={"item_id": "item_0"})
+        self.assertFalse(report["passed"])
+        methods = {method["name"]: method for method in report["methods"]}
+        self.assertEqual(methods["get_item"]["status"], "unmeasured")
+        self.assertEqual(methods["get_item"]["errors"], methods["get_item"]["calls"])
+        self.assertIn("KeyError", methods["get_item"]["reason"])
+
+    def test_hints_supply_a_permitted_role(self):
+        namespace = {}
+        exec(GUARDED, namespace)
+        report = benchmark_class(namespace["Ledger"], sizes=(100, 200))
+        self.assertEqual(report["methods"][0]["status"], "unmeasured")
+        report = benchmark_class(namespace["Ledger"], sizes=(100, 200), hints={"user_role": "admin"})
+        self.assertTrue(report["passed"], report)
+        self.assertEqual(report["methods"][0]["errors"], 0)
+
+    def test_instance_is_filled_once_per_size(self):
+        namespace = {}
+        exec(GENERATED, namespace)
+        registry = namespace["Registry"]
+
+        class Locked(registry):
+            def __init__(self, owner: str):
+                super().__init__(owner)
+                self.lock = threading.Lock()
+
+        for cls, builds in ((registry, 2), (Locked, 3 * 2)):
+            with patch("perf_gate._build", side_effect=perf_gate._build) as build:
+                benchmark_class(cls, sizes=(100, 200), expected={"find_item": 1.5})
+            self.assertEqual(build.call_count, builds, cls)
+
+    def test_fenced_source_is_unwrapped(self):
+        fenced = "```python\n" + GENERATED.strip() + "\n```"
+        self.assertEqual(strip_code_fences(fenced), GENERATED.strip() + "\n")
+        self.assertEqual(strip_code_fences(GENERATED), GENERATED)
+        report = check_source(strip_code_fences(fenced), "Registry", sizes=[100, 200], expected={"find_item": 1.5})
+        self.assertNotIn("load_error", report)
+
+    def test_sandbox_runs_in_an_isolated_container(self):
+        command = _command(["--worker", "/work/module.py"], ["/work", "/scratch"], sandbox="code-interpreter",
+                           name="gate")
+        self.assertEqual(command[:4], ["docker", "run", "--rm", "-i"])
+        self.assertEqual(command[command.index("--network") + 1], "none")
+        self.assertIn("/work:/work", command)
+        self.assertEqual(command[command.index("-w") + 1], "/scratch")
+        self.assertEqual(command[-2:], ["--worker", "/work/module.py"])
+        self.assertEqual(_command([], ["/work"])[0], sys.executable)
+
+    def test_broken_module_fails_the_gate(self):
+        report = check_source("class Registry(:\n", "Registry")
+        self.assertFalse(report["passed"])
+        self.assertIn("SyntaxError", report["load_error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
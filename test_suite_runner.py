@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from suite_runner import _command, run_suite
+
+GENERATED = '''
+import os
+import time
+import unittest
+from helper import VALUE
+
+
+class TestGenerated(unittest.TestCase):
+    def test_passes(self):
+        print("noise on stdout")
+        self.assertEqual(VALUE, 42)
+
+    def test_fails(self):
+        self.assertEqual(VALUE, 41)
+
+    def test_errors(self):
+        raise KeyError("missing")
+
+    @unittest.skip("not ready")
+    def test_skipped(self):
+        pass
+
+    def test_hangs(self):
+        time.sleep(60)
+
+    def test_crashes_worker(self):
+        os._exit(3)
+
+    def test_after_hang(self):
+        self.assertTrue(True)
+'''
+
+
+class TestRunSuite(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, "helper.py"), "w") as handle:
+            handle.write("VALUE = 42\n")
+        self.test_path = os.path.join(self.directory, "test_generated.py")
+        with open(self.test_path, "w") as handle:
+            handle.write(textwrap.dedent(GENERATED))
+
+    def test_statuses_timeouts_and_crashes(self):
+        summary = run_suite(self.test_path, workers=2, timeout=2.0)
+        statuses = {test["id"].rsplit(".", 1)[1]: test["status"] for test in summary["tests"]}
+        self.assertEqual(statuses, {
+            "test_passes": "passed", "test_fails": "failed", "test_errors": "error", "test_skipped": "skipped",
+            "test_hangs": "timeout", "test_crashes_worker": "error", "test_after_hang": "passed",
+        })
+        self.assertEqual((summary["total"], summary["passed"], summary["timeout"]), (7, 2, 1))
+        failure = next(test for test in summary["tests"] if test["id"].endswith("test_fails"))
+        self.assertIn("AssertionError", failure["message"])
+        self.assertLess(summary["duration_s"], 30)
+
+    def test_import_error_is_reported(self):
+        with open(self.test_path, "w") as handle:
+            handle.write("import does_not_exist\n")
+        summary = run_suite(self.test_path, timeout=2.0)
+        self.assertEqual(summary["total"], 0)
+        self.assertIn("does_not_exist", summary["load_error"])
+
+    def test_sandbox_runs_in_an_isolated_container(self):
+        command = _command(["--worker", self.test_path], self.test_path, sandbox="code-interpreter", name="w1")
+        self.assertEqual(command[:4], ["docker", "run", "--rm", "-i"])
+        self.assertIn("--network", command)
+        self.assertEqual(command[command.index("--network") + 1], "none")
+        self.assertIn(f"{self.directory}:{self.directory}", command)
+        self.assertEqual(command[command.index("code-interpreter") + 1:][-2:], ["--worker", self.test_path])
+        self.assertEqual(_command(["--list", self.test_path], self.test_path)[0], sys.executable)
+
+
+if __name__ == '__main__':
+    unittest.main()